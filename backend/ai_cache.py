@@ -0,0 +1,164 @@
+"""
+AI response cache for the deterministic AI endpoints (job description,
+requirements, benefits, interview questions).
+Admins regenerate the same description several times and identical job
+templates come back every day, so answers are cached on (endpoint, prompt
+version, model, hash of the normalized input). Entries live in the
+`ai_cache` collection, expired by a TTL index, with a per-worker LRU in
+front. `?refresh=true` on an endpoint asks the LLM again and replaces the
+entry.
+
+Each entry records how long the LLM took to produce it and how often it was
+served, so ai_cache_stats() can report the hit ratio and the latency saved.
+"""
+import hashlib
+import json
+import logging
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config import AI_MODEL, AI_PROVIDER
+from metrics import AI_CACHE_SAVED, CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+AI_CACHE_COLLECTION = "ai_cache"
+AI_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+# Entries kept in each worker's memory
+MEMORY_ENTRIES = 512
+
+# Bump an endpoint's version when its prompt in server.py changes, so answers to the old prompt are not served
+PROMPT_VERSIONS = {
+    "enhance-job-description": 1,
+    "suggest-job-requirements": 1,
+    "suggest-job-benefits": 1,
+    "generate-interview-questions": 1,
+}
+
+_memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+def normalize_input(text: str) -> str:
+    """Input as the cache sees it: Unicode-normalized, whitespace collapsed"""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def cache_key(endpoint: str, text: str, model: str = f"{AI_PROVIDER}/{AI_MODEL}") -> str:
+    parts = [endpoint, PROMPT_VERSIONS.get(endpoint, 1), model, normalize_input(text)]
+    return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+
+def _remember(key: str, entry: Dict[str, Any]):
+    _memory[key] = entry
+    _memory.move_to_end(key)
+    while len(_memory) > MEMORY_ENTRIES:
+        _memory.popitem(last=False)
+
+
+def _recall(key: str, now: datetime) -> Optional[Dict[str, Any]]:
+    entry = _memory.get(key)
+    if entry is None:
+        return None
+    if entry["expires_at"] <= now:
+        del _memory[key]
+        return None
+    _memory.move_to_end(key)
+    return entry
+
+
+def clear_memory():
+    _memory.clear()
+
+
+async def _record_hit(db, key: str, endpoint: str, entry: Dict[str, Any]):
+    CACHE_REQUESTS.labels(f"ai:{endpoint}", "hit").inc()
+    AI_CACHE_SAVED.labels(endpoint).inc(entry["latency_ms"] / 1000)
+    try:
+        await db[AI_CACHE_COLLECTION].update_one({"_id": key}, {"$inc": {"hits": 1}})
+    except Exception as e:
+        logger.warning("AI cache hit not recorded: %s", e)
+
+
+async def cached_completion(db, endpoint: str, text: str, generate: Callable[[], Awaitable[str]],
+                            refresh: bool = False) -> str:
+    """The cached answer for (endpoint, text), or generate() and cache its result"""
+    key = cache_key(endpoint, text)
+    now = datetime.now(timezone.utc)
+
+    if not refresh:
+        entry = _recall(key, now)
+        if entry is None:
+            try:
+                # The TTL monitor deletes expired entries only once a minute
+                entry = await db[AI_CACHE_COLLECTION].find_one(
+                    {"_id": key, "created_at": {"$gt": now - timedelta(seconds=AI_CACHE_TTL_SECONDS)}},
+                    {"response": 1, "latency_ms": 1, "created_at": 1}
+                )
+            except Exception as e:
+                logger.warning("AI cache lookup failed: %s", e)
+            if entry is not None:
+                created_at = entry["created_at"]
+                if created_at.tzinfo is None:
+                    created_at = created_at.replace(tzinfo=timezone.utc)
+                entry = {"response": entry["response"], "latency_ms": entry["latency_ms"],
+                         "expires_at": created_at + timedelta(seconds=AI_CACHE_TTL_SECONDS)}
+                _remember(key, entry)
+        if entry is not None:
+            await _record_hit(db, key, endpoint, entry)
+            return entry["response"]
+
+    CACHE_REQUESTS.labels(f"ai:{endpoint}", "refresh" if refresh else "miss").inc()
+    started = time.perf_counter()
+    response = await generate()
+    latency_ms = round((time.perf_counter() - started) * 1000)
+    if not response:
+        return response
+
+    _remember(key, {"response": response, "latency_ms": latency_ms,
+                    "expires_at": now + timedelta(seconds=AI_CACHE_TTL_SECONDS)})
+    try:
+        await db[AI_CACHE_COLLECTION].update_one(
+            {"_id": key},
+            {
+                "$set": {"endpoint": endpoint, "model": f"{AI_PROVIDER}/{AI_MODEL}",
+                         "prompt_version": PROMPT_VERSIONS.get(endpoint, 1), "response": response,
+                         "latency_ms": latency_ms, "created_at": now},
+                "$inc": {"generations": 1},
+                "$setOnInsert": {"hits": 0},
+            },
+            upsert=True
+        )
+    except Exception as e:
+        logger.warning("AI cache write failed: %s", e)
+    return response
+
+
+async def ai_cache_stats(db) -> List[Dict[str, Any]]:
+    """Per endpoint: cached entries, hits, LLM calls, hit ratio and latency saved (all workers)"""
+    rows = await db[AI_CACHE_COLLECTION].aggregate([
+        {"$group": {
+            "_id": "$endpoint",
+            "entries": {"$sum": 1},
+            "hits": {"$sum": "$hits"},
+            "generations": {"$sum": "$generations"},
+            "saved_ms": {"$sum": {"$multiply": ["$hits", "$latency_ms"]}},
+            "avg_latency_ms": {"$avg": "$latency_ms"},
+        }},
+        {"$sort": {"_id": 1}},
+    ]).to_list(length=None)
+    stats = []
+    for row in rows:
+        lookups = row["hits"] + row["generations"]
+        stats.append({
+            "endpoint": row["_id"],
+            "entries": row["entries"],
+            "hits": row["hits"],
+            "llm_calls": row["generations"],
+            "hit_ratio": round(row["hits"] / lookups, 3) if lookups else 0.0,
+            "avg_llm_latency_ms": round(row["avg_latency_ms"] or 0),
+            "saved_seconds": round(row["saved_ms"] / 1000, 1),
+        })
+    return stats
@@ -0,0 +1,195 @@
+"""
+AI gateway: admission control in front of every LLM call.
+- Each endpoint gets a fixed number of concurrent upstream calls and a
+  bounded wait queue; when both are full the request gets 429 at once
+  instead of piling up as coroutines on the worker's event loop.
+- The anonymous /api/chat is also capped per client IP, so one visitor
+  cannot take every slot.
+- Identical prompts already in flight share one upstream call
+  (single-flight); the call is cancelled once nobody waits for it.
+- Every call has a timeout (504) and is cancelled when it expires.
+Limits are per worker.
+"""
+import asyncio
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+from metrics import AI_COALESCED, AI_IN_FLIGHT, AI_REJECTED
+
+
+@dataclass(frozen=True)
+class AILimit:
+    """Concurrent upstream calls, requests allowed to wait for one, seconds per call"""
+    concurrency: int
+    queue: int
+    timeout: float
+    # Concurrent requests per client IP (anonymous endpoints)
+    per_ip: Optional[int] = None
+
+
+DEFAULT_LIMIT = AILimit(concurrency=4, queue=8, timeout=60)
+AI_LIMITS: Dict[str, AILimit] = {
+    "chat": AILimit(concurrency=8, queue=16, timeout=30, per_ip=2),
+    "job-posting-assistant": AILimit(concurrency=4, queue=8, timeout=60),
+    "match-jobs": AILimit(concurrency=2, queue=4, timeout=60),
+    "analyze-resume": AILimit(concurrency=2, queue=4, timeout=60),
+}
+
+# Seconds a rejected client is asked to wait
+RETRY_AFTER = 5
+# Reverse proxies in front of the app that append to X-Forwarded-For (nginx: 1); 0 ignores the header
+TRUSTED_PROXIES = int(os.environ.get("TRUSTED_PROXIES", "1"))
+
+
+def client_ip(request: Request) -> str:
+    """
+    The visitor's address: the X-Forwarded-For hop our nearest trusted proxy
+    saw, counted from the right. Hops to the left of it come from the client
+    and can be anything, so they are never used.
+    """
+    forwarded = request.headers.get("x-forwarded-for") if TRUSTED_PROXIES > 0 else None
+    if forwarded:
+        hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+        if hops:
+            return hops[-min(TRUSTED_PROXIES, len(hops))]
+    return request.client.host if request.client else "unknown"
+
+
+def _busy(endpoint: str, reason: str) -> HTTPException:
+    AI_REJECTED.labels(endpoint, reason).inc()
+    return HTTPException(status_code=429, detail="AI assistant is busy, please try again shortly",
+                         headers={"Retry-After": str(RETRY_AFTER)})
+
+
+class Lease:
+    """One admitted request: a slot for its upstream call, released exactly once"""
+
+    def __init__(self, gate: "_Gate", ip: Optional[str]):
+        self._gate = gate
+        self._ip = ip
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._gate.release(self._ip)
+
+
+class _Gate:
+    """Admission state for one endpoint"""
+
+    def __init__(self, endpoint: str, limit: AILimit):
+        self.endpoint = endpoint
+        self.limit = limit
+        self.semaphore = asyncio.Semaphore(limit.concurrency)
+        # Requests running or waiting for a slot
+        self.admitted = 0
+        self.per_ip: Dict[str, int] = {}
+
+    def admit(self, ip: Optional[str] = None):
+        """Reserve a place (running or queued) or raise 429; synchronous, so bursts are counted exactly"""
+        limit = self.limit
+        per_ip = ip is not None and limit.per_ip is not None
+        if per_ip and self.per_ip.get(ip, 0) >= limit.per_ip:
+            raise _busy(self.endpoint, "per_ip")
+        if self.admitted >= limit.concurrency + limit.queue:
+            raise _busy(self.endpoint, "queue_full")
+        self.admitted += 1
+        if per_ip:
+            self.per_ip[ip] = self.per_ip.get(ip, 0) + 1
+
+    async def wait(self, ip: Optional[str] = None) -> Lease:
+        """Wait for a slot after admit(); 429 if none frees up within the timeout"""
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), timeout=self.limit.timeout)
+        except asyncio.TimeoutError:
+            self._leave(ip)
+            raise _busy(self.endpoint, "queue_timeout")
+        except BaseException:
+            self._leave(ip)
+            raise
+        AI_IN_FLIGHT.labels(self.endpoint).inc()
+        return Lease(self, ip)
+
+    async def acquire(self, ip: Optional[str] = None) -> Lease:
+        self.admit(ip)
+        return await self.wait(ip)
+
+    def _leave(self, ip: Optional[str]):
+        self.admitted -= 1
+        if ip is not None and ip in self.per_ip:
+            self.per_ip[ip] -= 1
+            if not self.per_ip[ip]:
+                del self.per_ip[ip]
+
+    def release(self, ip: Optional[str]):
+        self._leave(ip)
+        self.semaphore.release()
+        AI_IN_FLIGHT.labels(self.endpoint).dec()
+
+
+class _Flight:
+    """One upstream call shared by every request with the same prompt"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class AIGateway:
+    def __init__(self, limits: Dict[str, AILimit] = AI_LIMITS, default: AILimit = DEFAULT_LIMIT):
+        self.limits = limits
+        self.default = default
+        self._gates: Dict[str, _Gate] = {}
+        self._flights: Dict[Tuple[str, str], _Flight] = {}
+
+    def gate(self, endpoint: str) -> _Gate:
+        if endpoint not in self._gates:
+            self._gates[endpoint] = _Gate(endpoint, self.limits.get(endpoint, self.default))
+        return self._gates[endpoint]
+
+    async def call(self, endpoint: str, prompt: str, func: Callable[[], Awaitable[Any]],
+                   ip: Optional[str] = None) -> Any:
+        """
+        Run func() under the endpoint's limits. Requests with the same prompt
+        while one is in flight wait for that call instead of starting their own.
+        """
+        gate = self.gate(endpoint)
+        key = (endpoint, hashlib.sha256(prompt.encode()).hexdigest())
+        flight = self._flights.get(key)
+        if flight is None:
+            gate.admit(ip)
+            # Registered before any await, so identical requests arriving meanwhile join it
+            flight = _Flight(asyncio.ensure_future(self._run(key, gate, ip, func)))
+            self._flights[key] = flight
+        else:
+            AI_COALESCED.labels(endpoint).inc()
+
+        flight.waiters += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(flight.task), timeout=gate.limit.timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="AI service timed out")
+        finally:
+            flight.waiters -= 1
+            # Nobody is waiting any more (timeouts, disconnects): stop the upstream call
+            if not flight.waiters and not flight.task.done():
+                flight.task.cancel()
+
+    async def _run(self, key: Tuple[str, str], gate: _Gate, ip: Optional[str],
+                   func: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            lease = await gate.wait(ip)
+            try:
+                return await func()
+            finally:
+                lease.release()
+        finally:
+            self._flights.pop(key, None)
+
+
+ai_gateway = AIGateway()
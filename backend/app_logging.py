@@ -0,0 +1,189 @@
+"""
+Logging for HealthCare Jobs API.
+print() and a plain StreamHandler write to stdout from the event loop, so a
+slow log shipper stalls every request. setup_logging() puts a QueueHandler
+on the root logger instead: the calling coroutine only enqueues the record,
+and a QueueListener thread formats and writes it (one JSON object per line,
+or plain text with LOG_FORMAT=text). If the queue is full, records are
+dropped rather than blocking.
+
+- Every record carries the request id (the X-Request-ID header, or one
+  generated per request by RequestIdMiddleware, which also returns it).
+- DEBUG output is off unless LOG_LEVEL=DEBUG; debug calls then cost one
+  level check.
+- Each message key (the unformatted message, or extra={"key": ...}) may log
+  RATE_BURST records per RATE_WINDOW seconds. After that one in
+  SAMPLE_EVERY gets through, carrying `suppressed`: how many were dropped
+  since the last one. Log with %-style args, not f-strings, so one call
+  site is one key.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+
+QUEUE_SIZE = 10000
+RATE_BURST = 20
+RATE_WINDOW = 10.0
+SAMPLE_EVERY = 100
+# Message keys tracked by the rate limiter before its table is reset
+MAX_KEYS = 10000
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else on a record came from extra={...}
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp the current request id on the record (runs in the logging coroutine's context)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Per message key: `burst` records per `window` seconds, then one in `sample_every`"""
+
+    def __init__(self, burst: int = RATE_BURST, window: float = RATE_WINDOW, sample_every: int = SAMPLE_EVERY,
+                 clock=time.monotonic):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.sample_every = sample_every
+        self.clock = clock
+        # key -> [window start, records in window, suppressed since the last one let through]
+        self._windows: Dict[Any, List[float]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "key", None) or (record.name, record.levelno, str(record.msg))
+        now = self.clock()
+        state = self._windows.get(key)
+        if state is None or now - state[0] >= self.window:
+            if len(self._windows) >= MAX_KEYS:
+                self._windows.clear()
+            suppressed = state[2] if state else 0
+            state = self._windows[key] = [now, 0, suppressed]
+        state[1] += 1
+        over = state[1] - self.burst
+        if over > 0 and over % self.sample_every:
+            state[2] += 1
+            return False
+        if state[2]:
+            record.suppressed = int(state[2])
+            state[2] = 0
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, msg, request_id and any extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for name, value in record.__dict__.items():
+            if name not in _RECORD_FIELDS and value is not None:
+                entry[name] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the listener falls behind instead of blocking"""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The base class formats here, on the caller's thread, and clears args and exc_info;
+        # pass a copy through untouched so the listener formats it (with the traceback)
+        return copy.copy(record)
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT, stream=None) -> DroppingQueueHandler:
+    """Route the root logger through the queue; calling it again replaces the previous setup"""
+    global _listener
+    shutdown_logging()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"))
+
+    handler = DroppingQueueHandler(queue.Queue(QUEUE_SIZE))
+    handler.addFilter(RequestContextFilter())
+    handler.addFilter(RateLimitFilter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(handler.queue, output)
+    _listener.start()
+    return handler
+
+
+def shutdown_logging():
+    """Write what is queued and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+class RequestIdMiddleware:
+    """Give each request an id (X-Request-ID if the proxy sent one) for its log records and response"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+        token = request_id_var.set(request_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
@@ -1,62 +1,29 @@
 #!/usr/bin/env python3
 """
 Auto-archive expired jobs
-This script checks for jobs that have passed their expiry date and archives them
-Run this as a cron job or scheduled task
+Archives jobs past their application deadline or expiry date with a single
+update_many. The API's background scheduler already runs this every 15
+minutes; this script runs the same job once (cron / manual use).
 """
 
 import asyncio
-import os
-from datetime import datetime, timezone
-from motor.motor_asyncio import AsyncIOMotorClient
 
-# MongoDB connection
-mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-db_name = os.environ.get('DB_NAME', 'jobs')
+from scheduler import run_job_now
 
-async def archive_expired_jobs():
-    """Archive jobs that have passed their expiry date"""
-    try:
-        # Connect to MongoDB
-        client = AsyncIOMotorClient(mongo_url)
-        db = client[db_name]
-        
-        # Current time in UTC
-        now = datetime.now(timezone.utc)
-        
-        # Find jobs that are expired but not archived
-        query = {
-            "expires_at": {"$ne": None, "$lt": now},
-            "is_archived": {"$ne": True},
-            "is_deleted": {"$ne": True}
-        }
-        
-        expired_jobs = await db.jobs.find(query).to_list(length=None)
-        
-        if not expired_jobs:
-            print(f"✅ No expired jobs to archive at {now.isoformat()}")
-            client.close()
-            return
-        
-        # Archive expired jobs
-        job_ids = [job["id"] for job in expired_jobs]
-        result = await db.jobs.update_many(
-            {"id": {"$in": job_ids}},
-            {"$set": {"is_archived": True}}
-        )
-        
-        print(f"✅ Archived {result.modified_count} expired jobs at {now.isoformat()}")
-        for job in expired_jobs:
-            print(f"   - {job.get('title')} (ID: {job.get('id')}, Expired: {job.get('expires_at')})")
-        
-        client.close()
-        
-    except Exception as e:
-        print(f"❌ Error archiving expired jobs: {e}")
 
 async def main():
     """Main entry point"""
-    await archive_expired_jobs()
+    from database import client, db
+    try:
+        report = await run_job_now(db, "archive_expired_jobs", trigger="cli")
+        if report["status"] != "success":
+            print(f"❌ Error archiving expired jobs: {report['error']}")
+            return 1
+        print(f"✅ Archived {report['result']['archived']} expired jobs at {report['started_at'].isoformat()}")
+        return 0
+    finally:
+        client.close()
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    raise SystemExit(asyncio.run(main()))
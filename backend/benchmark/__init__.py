@@ -0,0 +1,10 @@
+# Benchmark package (run with `python -m benchmark`)
+from benchmark.dataset import DatasetGenerator, DatasetSpec, generate_dataset, seed_dataset
+from benchmark.mongod import LocalMongod, LocalReplicaSet
+from benchmark.runner import compare, run_load, summarize
+from benchmark.scenarios import ENDPOINTS, Endpoint, select_endpoints
+
+__all__ = [
+    'DatasetGenerator', 'DatasetSpec', 'generate_dataset', 'seed_dataset', 'LocalMongod', 'LocalReplicaSet',
+    'compare', 'run_load', 'summarize', 'ENDPOINTS', 'Endpoint', 'select_endpoints'
+]
@@ -0,0 +1,194 @@
+"""
+Benchmark the API against a local MongoDB with synthetic data.
+
+Usage (from backend/):
+    python -m benchmark                          # 1k jobs, in-process, 2000 requests
+    python -m benchmark --jobs 100000 --mode both --concurrency 64
+    python -m benchmark --save-baseline          # record benchmark/baseline.json
+    python -m benchmark --mongo-url mongodb://localhost:27017   # use a running server
+
+Starts a throwaway mongod (unless --mongo-url is given), seeds it, applies
+the index manifest, then drives the app in-process (httpx ASGI transport)
+and/or over HTTP (uvicorn subprocess). Results are written as JSON and
+compared with the baseline; the exit code is 1 if anything regressed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from benchmark.dataset import seed_dataset
+from benchmark.mongod import LocalMongod, _free_port
+from benchmark.runner import auth_headers, compare, print_report, run_load
+from benchmark.scenarios import select_endpoints
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+BENCH_SECRET = "benchmark-only-jwt-secret-0123456789abcdef"
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+async def _run_in_process(args, endpoints, fixtures, headers):
+    # server reads its settings at import time
+    import server
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+        result = await run_load(client, endpoints, fixtures, headers, args.requests, args.concurrency, seed=args.seed)
+    server.client.close()
+    return result
+
+
+async def _run_over_http(args, endpoints, fixtures, headers, env):
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60,
+                                     limits=httpx.Limits(max_connections=args.concurrency)) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with {process.returncode}")
+                try:
+                    await client.get("/robots.txt")
+                    break
+                except httpx.HTTPError:
+                    if time.monotonic() > deadline:
+                        raise RuntimeError("uvicorn did not start within 60s")
+                    await asyncio.sleep(0.5)
+            return await run_load(client, endpoints, fixtures, headers, args.requests, args.concurrency,
+                                  seed=args.seed)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+async def run(args) -> int:
+    mongod = None
+    mongo_url = args.mongo_url
+    if not mongo_url:
+        mongod = await LocalMongod(binary=args.mongod).start()
+        mongo_url = mongod.url
+
+    db_name = args.db_name or f"jobslly_bench_{uuid.uuid4().hex[:8]}"
+    env = {**os.environ, "MONGO_URL": mongo_url, "DB_NAME": db_name, "JWT_SECRET": BENCH_SECRET,
+           "DB_PROFILING": os.environ.get("DB_PROFILING", "0")}
+    os.environ.update(env)
+
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[db_name]
+    try:
+        from indexes import ensure_indexes
+
+        started = time.perf_counter()
+        seeded = await seed_dataset(db, jobs=args.jobs, seed=args.seed)
+        await ensure_indexes(db, log=lambda message: None)
+        print(f"🌱 Seeded {seeded['counts']} in {time.perf_counter() - started:.1f}s")
+
+        endpoints = select_endpoints(args.endpoints)
+        headers = auth_headers(BENCH_SECRET)
+        modes = ["in_process", "http"] if args.mode == "both" else [args.mode.replace("-", "_")]
+
+        results = {}
+        for mode in modes:
+            if mode == "in_process":
+                results[mode] = await _run_in_process(args, endpoints, seeded["fixtures"], headers)
+            else:
+                results[mode] = await _run_over_http(args, endpoints, seeded["fixtures"], headers, env)
+            print_report(mode, results[mode])
+    finally:
+        if not args.keep_data:
+            await client.drop_database(db_name)
+        client.close()
+        if mongod:
+            mongod.stop()
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "jobs": args.jobs,
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "counts": seeded["counts"],
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"💾 Results written to {args.output}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2))
+        print(f"💾 Baseline saved to {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print(f"ℹ️ No baseline at {baseline_path} (record one with --save-baseline)")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text())
+    if (baseline["meta"]["jobs"], baseline["meta"]["concurrency"]) != (args.jobs, args.concurrency):
+        print("⚠️ Baseline was recorded with a different --jobs/--concurrency; comparison is indicative only")
+
+    regressed = False
+    for mode, result in results.items():
+        if mode not in baseline["results"]:
+            continue
+        regressions = compare(baseline["results"][mode], result, tolerance=args.tolerance)
+        for line in regressions:
+            print(f"❌ {mode} regression: {line}")
+        regressed = regressed or bool(regressions)
+    if not regressed:
+        print(f"✅ No regressions against baseline {baseline['meta']['commit']} (tolerance {args.tolerance:.0%})")
+    return 1 if regressed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the API against a local MongoDB")
+    parser.add_argument("--jobs", type=int, default=1000, help="Jobs to seed (other collections scale with it)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mode", choices=["in-process", "http", "both"], default="in-process")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers in http mode")
+    parser.add_argument("--endpoints", nargs="*", help="Only these endpoints (see benchmark/scenarios.py)")
+    parser.add_argument("--mongo-url", help="Use this MongoDB instead of starting mongod")
+    parser.add_argument("--mongod", default="mongod", help="mongod binary")
+    parser.add_argument("--db-name", help="Database name (default: random, dropped afterwards)")
+    parser.add_argument("--keep-data", action="store_true", help="Do not drop the benchmark database")
+    parser.add_argument("--output", help="Write the results JSON here")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true", help="Record this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95/throughput regression")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
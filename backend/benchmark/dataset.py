@@ -0,0 +1,461 @@
+"""
+Synthetic dataset generator.
+Produces deterministic datasets at any scale (jobs, users, job_seekers,
+job_leads, applications, blog_posts) and writes them with batched
+insert_many from several concurrent writers.
+
+- Same seed, same documents: every batch has its own RNG derived from
+  (seed, collection, batch start) and ids are hashes of (seed, collection,
+  index), so output does not depend on batch size or writer concurrency.
+- Locations, companies, employers and job popularity (leads/applications
+  per job) are Zipf-distributed; categories follow CATEGORY_DB_MAPPING with
+  both stored spellings and the title-based categories.
+- legacy_dates=0.1 stores 10% of the dates as ISO strings, like documents
+  written before migration 0005.
+
+Used by `python -m benchmark` and the generate_dataset.py CLI.
+"""
+import asyncio
+import base64
+import hashlib
+import random
+import time
+import uuid
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from io import BytesIO
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from PIL import Image
+
+from categories import CATEGORY_DB_MAPPING, TITLE_BASED_CATEGORIES
+from job_cards import build_card
+from slug_allocator import generate_slug
+
+# Every generated user has this password ("benchmark"); hashing per user would dominate seeding
+PASSWORD_HASH = "$2b$12$FB7vivaPJF9h.YI44LqtiuCVM9D94lq0xbhKJXQwufb87aUVXppSG"
+BENCH_PASSWORD = "benchmark"
+
+# Users 0-2 are the accounts the benchmark logs in as
+ADMIN_EMAIL = "admin@bench.jobslly.test"
+EMPLOYER_EMAIL = "employer@bench.jobslly.test"
+JOB_SEEKER_EMAIL = "seeker@bench.jobslly.test"
+FIXED_USERS = [(ADMIN_EMAIL, "admin"), (EMPLOYER_EMAIL, "employer"), (JOB_SEEKER_EMAIL, "job_seeker")]
+# Applications/leads 0..N-1 belong to the benchmark job seeker so its dashboard has data
+SEEKER_APPLICATIONS = 25
+
+# Share of jobs per category page slug
+CATEGORY_MIX = {
+    "nursing": 30, "doctor": 22, "pharmacy": 14, "dentist": 7, "physiotherapy": 6,
+    "clinical-research": 5, "medical-lab-technician": 5, "pharmacovigilance": 4,
+    "medical-science-liaison": 3, "non-clinical-jobs": 4,
+}
+TITLES = {
+    "doctor": ["Medical Officer", "Senior Cardiologist", "Resident Doctor", "Consultant Physician",
+               "General Physician", "Duty Doctor", "Anaesthesiologist"],
+    "nursing": ["Staff Nurse", "ICU Nurse", "GNM Nurse", "Registered Nurse", "Nursing Supervisor", "OT Nurse"],
+    "pharmacy": ["Pharmacist", "Hospital Pharmacist", "Retail Pharmacist", "Clinical Pharmacist"],
+    "dentist": ["Dental Surgeon", "Orthodontist", "Endodontist"],
+    "physiotherapy": ["Physiotherapist", "Sports Physiotherapist", "Neuro Physiotherapist"],
+    # Title-based categories: titles contain the keywords their pages match on
+    **{slug: [f"{keyword.title()} {suffix}" for keyword in keywords for suffix in ("Associate", "Executive")]
+       for slug, keywords in TITLE_BASED_CATEGORIES.items()},
+}
+CITIES = ["Mumbai", "Delhi", "Bangalore", "Chennai", "Hyderabad", "Pune", "Kolkata", "Ahmedabad", "Jaipur",
+          "Lucknow", "Kochi", "Chandigarh", "Indore", "Nagpur", "Bhopal", "Coimbatore", "Visakhapatnam",
+          "Patna", "Surat", "Mysore"]
+LOCATIONS = [f"{city}, India" for city in CITIES] + ["Dubai, UAE", "London, UK", "New York, USA",
+                                                     "Singapore", "Riyadh, Saudi Arabia"]
+COMPANY_NAMES = ["Apollo", "Fortis", "Max", "Manipal", "Narayana", "Medanta", "Aster", "Columbia Asia",
+                 "Kokilaben", "Ruby Hall", "Sakra", "Cloudnine", "Rainbow", "Motherhood", "KIMS", "Yashoda",
+                 "Care", "Global", "Sunshine", "Lilavati"]
+COMPANY_SUFFIXES = ["Hospitals", "Healthcare", "Clinic", "Diagnostics", "Pharma", "Medical Centre"]
+COMPANIES = [f"{name} {suffix}" for suffix in COMPANY_SUFFIXES for name in COMPANY_NAMES]
+SALARIES = ["Negotiable", "Competitive", "25000", "40,000", "60000", "1,20,000", "800000", "1500000"]
+JOB_TYPES = ["full_time", "part_time", "contract"]
+JOB_TYPE_WEIGHTS = [75, 15, 10]
+BLOG_CATEGORIES = ["healthcare", "careers", "nursing", "pharmacy", "news"]
+TAGS = ["nursing", "doctors", "pharmacy", "careers", "salary", "interview", "abroad", "exams"]
+
+
+class Zipf:
+    """Sample a population with weight 1/rank^s (rank 1 is the most frequent)"""
+
+    def __init__(self, population: List[Any], s: float = 1.1):
+        self.population = population
+        self.cum_weights = list(accumulate(1 / (rank ** s) for rank in range(1, len(population) + 1)))
+        self.total = self.cum_weights[-1]
+
+    def sample(self, rng: random.Random, k: int) -> List[Any]:
+        return rng.choices(self.population, cum_weights=self.cum_weights, k=k)
+
+    def index(self, rng: random.Random) -> int:
+        return bisect_left(self.cum_weights, rng.random() * self.total)
+
+
+@dataclass
+class DatasetSpec:
+    """Document counts per collection and generation options"""
+    jobs: int = 1000
+    users: Optional[int] = None
+    job_seekers: Optional[int] = None
+    leads: Optional[int] = None
+    applications: Optional[int] = None
+    blog_posts: Optional[int] = None
+    seed: int = 42
+    # Fraction of documents whose dates are stored as ISO strings
+    legacy_dates: float = 0.0
+    now: datetime = field(default_factory=lambda: datetime(2025, 1, 1, tzinfo=timezone.utc))
+
+    def __post_init__(self):
+        # Defaults scale with the number of jobs
+        self.users = self.users if self.users is not None else max(10, self.jobs // 2)
+        self.job_seekers = self.job_seekers if self.job_seekers is not None else self.users
+        self.leads = self.leads if self.leads is not None else self.jobs * 2
+        self.applications = self.applications if self.applications is not None else self.jobs * 2
+        self.blog_posts = self.blog_posts if self.blog_posts is not None else max(20, self.jobs // 100)
+        self.users = max(self.users, len(FIXED_USERS))
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "users": self.users, "jobs": self.jobs, "blog_posts": self.blog_posts,
+            "job_seekers": self.job_seekers, "applications": self.applications, "job_leads": self.leads,
+        }
+
+
+def doc_id(seed: int, collection: str, index: int) -> str:
+    """Stable uuid4-formatted id of the index-th document of a collection"""
+    digest = hashlib.blake2b(f"{seed}:{collection}:{index}".encode(), digest_size=16).digest()
+    return str(uuid.UUID(bytes=digest, version=4))
+
+
+def _batch_rng(seed: int, collection: str, start: int) -> random.Random:
+    return random.Random(f"{seed}:{collection}:{start}")
+
+
+def user_role(index: int) -> str:
+    if index < len(FIXED_USERS):
+        return FIXED_USERS[index][1]
+    return "employer" if index % 12 == 1 else "job_seeker"
+
+
+def user_email(index: int) -> str:
+    return FIXED_USERS[index][0] if index < len(FIXED_USERS) else f"user{index}@bench.jobslly.test"
+
+
+@lru_cache(maxsize=None)
+def _slug_prefix(title: str, company: str, location: str) -> str:
+    return generate_slug(title, company, location)
+
+
+@lru_cache(maxsize=8)
+def _featured_images(seed: int) -> List[str]:
+    """Small JPEG data URLs, like the images the admin blog editor uploads"""
+    rng = random.Random(seed)
+    images = []
+    for _ in range(5):
+        image = Image.new("RGB", (320, 180), tuple(rng.randrange(256) for _ in range(3)))
+        buffer = BytesIO()
+        image.save(buffer, format="JPEG", quality=70)
+        images.append(f"data:image/jpeg;base64,{base64.b64encode(buffer.getvalue()).decode()}")
+    return images
+
+
+class DatasetGenerator:
+    """Batches of documents per collection; a batch depends only on the spec and its start index"""
+
+    def __init__(self, spec: DatasetSpec):
+        self.spec = spec
+        self._locations = Zipf(LOCATIONS, s=1.0)
+        self._companies = Zipf(COMPANIES, s=1.1)
+        self._category_slugs = list(CATEGORY_MIX)
+        self._category_cum = list(accumulate(CATEGORY_MIX.values()))
+        employer_indexes = [i for i in range(spec.users) if user_role(i) == "employer"]
+        self._employers = Zipf([doc_id(spec.seed, "users", i) for i in employer_indexes], s=1.2)
+        self._seeker_indexes = [i for i in range(spec.users) if user_role(i) == "job_seeker"]
+        # Job seeker profile of the benchmark job seeker (user 2)
+        self._benchmark_seeker = self._seeker_indexes.index(2)
+        # A few jobs get most of the leads and applications
+        self._popular_jobs = Zipf(list(range(spec.jobs)), s=0.8) if spec.jobs else None
+
+    def _date(self, value: Optional[datetime], legacy: bool):
+        return value.isoformat() if legacy and value is not None else value
+
+    def jobs(self, start: int, count: int) -> List[Dict[str, Any]]:
+        spec = self.spec
+        rng = _batch_rng(spec.seed, "jobs", start)
+        slugs = rng.choices(self._category_slugs, cum_weights=self._category_cum, k=count)
+        locations = self._locations.sample(rng, count)
+        companies = self._companies.sample(rng, count)
+        employers = self._employers.sample(rng, count)
+        job_types = rng.choices(JOB_TYPES, weights=JOB_TYPE_WEIGHTS, k=count)
+        docs = []
+        for offset in range(count):
+            index = start + offset
+            job_id = doc_id(spec.seed, "jobs", index)
+            slug, location, company = slugs[offset], locations[offset], companies[offset]
+            title = rng.choice(TITLES[slug])
+            categories = [rng.choice(CATEGORY_DB_MAPPING[slug])]
+            if rng.random() < 0.2:
+                extra = rng.choice(CATEGORY_DB_MAPPING[rng.choice(self._category_slugs)])
+                if extra not in categories:
+                    categories.append(extra)
+            created_at = spec.now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+            deadline = created_at + timedelta(days=rng.randrange(7, 90)) if rng.random() < 0.6 else None
+            expires_at = created_at + timedelta(days=90) if rng.random() < 0.2 else None
+            legacy = rng.random() < spec.legacy_dates
+            job = {
+                "id": job_id,
+                "title": title,
+                "slug": f"{_slug_prefix(title, company, location)}-{job_id[:8]}",
+                "description": f"{company} is hiring a {title} in {location}. " * rng.randrange(3, 12),
+                "company": company,
+                "location": location,
+                "salary_min": rng.choice(SALARIES),
+                "salary_max": rng.choice(SALARIES),
+                "currency": "USD" if location.endswith("USA") else "INR",
+                "job_type": job_types[offset],
+                "categories": categories,
+                "requirements": ["Valid registration", f"{rng.randrange(0, 10)}+ years experience"],
+                "benefits": ["Health Insurance", "Paid Leave"],
+                "employer_id": employers[offset],
+                "is_approved": rng.random() < 0.9,
+                "is_deleted": rng.random() < 0.02,
+                "is_archived": bool(deadline and deadline < spec.now),
+                "is_external": rng.random() < 0.2,
+                "external_url": None,
+                "application_deadline": self._date(deadline, legacy),
+                "view_count": int(rng.paretovariate(1.5) * 10),
+                "application_count": rng.randrange(20),
+                "created_at": self._date(created_at, legacy),
+                "expires_at": self._date(expires_at, legacy),
+            }
+            # Legacy (pre-migration) documents have no list card yet
+            if not legacy:
+                job["card"] = build_card(job)
+            docs.append(job)
+        return docs
+
+    def users(self, start: int, count: int) -> List[Dict[str, Any]]:
+        spec = self.spec
+        rng = _batch_rng(spec.seed, "users", start)
+        docs = []
+        for index in range(start, start + count):
+            email = user_email(index)
+            legacy = rng.random() < spec.legacy_dates
+            docs.append({
+                "id": doc_id(spec.seed, "users", index),
+                "email": email,
+                "full_name": email.split("@")[0].replace(".", " ").title(),
+                "role": user_role(index),
+                "is_active": True,
+                "hashed_password": PASSWORD_HASH,
+                "created_at": self._date(spec.now - timedelta(seconds=rng.randrange(365 * 24 * 3600)), legacy),
+                "profile_data": {},
+            })
+        return docs
+
+    def _seeker_email(self, position: int) -> str:
+        """Email of the position-th job seeker profile (registered users first, then leads-only)"""
+        if position < len(self._seeker_indexes):
+            return user_email(self._seeker_indexes[position])
+        return f"lead{position}@bench.jobslly.test"
+
+    def job_seekers(self, start: int, count: int) -> List[Dict[str, Any]]:
+        spec = self.spec
+        rng = _batch_rng(spec.seed, "job_seekers", start)
+        docs = []
+        for position in range(start, start + count):
+            registered = position < len(self._seeker_indexes)
+            created_at = spec.now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+            legacy = rng.random() < spec.legacy_dates
+            docs.append({
+                "id": doc_id(spec.seed, "job_seekers", position),
+                "email": self._seeker_email(position),
+                "name": self._seeker_email(position).split("@")[0].title(),
+                "user_id": doc_id(spec.seed, "users", self._seeker_indexes[position]) if registered else None,
+                "location": self._locations.sample(rng, 1)[0],
+                "total_applications": rng.randrange(10),
+                "jobs_applied": [],
+                "first_source": rng.choice(["direct", "job_application", "lead_collection", "registration"]),
+                "is_registered": registered,
+                "status": "registered" if registered else "lead",
+                "profile_completion": rng.randrange(0, 101, 10),
+                "created_at": self._date(created_at, legacy),
+                "acquisition_date": self._date(created_at, legacy),
+                "last_activity": self._date(created_at + timedelta(days=rng.randrange(60)), legacy),
+            })
+        return docs
+
+    def _popular_job_id(self, rng: random.Random) -> str:
+        return doc_id(self.spec.seed, "jobs", self._popular_jobs.index(rng))
+
+    def applications(self, start: int, count: int) -> List[Dict[str, Any]]:
+        spec = self.spec
+        rng = _batch_rng(spec.seed, "applications", start)
+        docs = []
+        for index in range(start, start + count):
+            applicant = 2 if index < SEEKER_APPLICATIONS else rng.choice(self._seeker_indexes)
+            legacy = rng.random() < spec.legacy_dates
+            docs.append({
+                "id": doc_id(spec.seed, "applications", index),
+                "job_id": self._popular_job_id(rng),
+                "applicant_id": doc_id(spec.seed, "users", applicant),
+                "status": rng.choice(["pending", "pending", "reviewed", "accepted", "rejected"]),
+                "created_at": self._date(spec.now - timedelta(seconds=rng.randrange(180 * 24 * 3600)), legacy),
+            })
+        return docs
+
+    def leads(self, start: int, count: int) -> List[Dict[str, Any]]:
+        spec = self.spec
+        rng = _batch_rng(spec.seed, "job_leads", start)
+        seekers = max(1, spec.job_seekers)
+        docs = []
+        for index in range(start, start + count):
+            position = self._benchmark_seeker if index < SEEKER_APPLICATIONS else rng.randrange(seekers)
+            email = self._seeker_email(position)
+            legacy = rng.random() < spec.legacy_dates
+            docs.append({
+                "id": doc_id(spec.seed, "job_leads", index),
+                "job_id": self._popular_job_id(rng),
+                "job_seeker_id": doc_id(spec.seed, "job_seekers", position),
+                "name": email.split("@")[0].title(),
+                "email": email,
+                "phone": f"9{rng.randrange(10 ** 9):09d}",
+                "source": rng.choice(["job_application", "job_application", "chatbot", "newsletter"]),
+                "status": rng.choice(["new", "new", "contacted", "converted", "closed"]),
+                "created_at": self._date(spec.now - timedelta(seconds=rng.randrange(180 * 24 * 3600)), legacy),
+            })
+        return docs
+
+    def blog_posts(self, start: int, count: int) -> List[Dict[str, Any]]:
+        spec = self.spec
+        rng = _batch_rng(spec.seed, "blog_posts", start)
+        images = _featured_images(spec.seed)
+        docs = []
+        for index in range(start, start + count):
+            category = rng.choice(BLOG_CATEGORIES)
+            created_at = spec.now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+            published = rng.random() < 0.85
+            legacy = rng.random() < spec.legacy_dates
+            docs.append({
+                "id": doc_id(spec.seed, "blog_posts", index),
+                "title": f"{category.title()} career guide part {index}",
+                "slug": f"{category}-career-guide-part-{index}",
+                "excerpt": f"Everything you need to know about {category} jobs in {rng.choice(CITIES)}.",
+                "content": "<p>" + " ".join(["Healthcare careers are growing fast."] * rng.randrange(50, 300)) + "</p>",
+                "featured_image": rng.choice(images),
+                "author_id": doc_id(spec.seed, "users", 0),
+                "category": category,
+                "tags": rng.sample(TAGS, 3),
+                "is_published": published,
+                "is_featured": rng.random() < 0.1,
+                "seo_keywords": [category, "healthcare jobs"],
+                "faqs": [],
+                "created_at": self._date(created_at, legacy),
+                "published_at": self._date(created_at, legacy) if published else None,
+            })
+        return docs
+
+    def batches(self, collection: str, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        build: Callable[[int, int], List[Dict[str, Any]]] = {
+            "users": self.users, "jobs": self.jobs, "blog_posts": self.blog_posts,
+            "job_seekers": self.job_seekers, "applications": self.applications, "job_leads": self.leads,
+        }[collection]
+        total = self.spec.counts()[collection]
+        for start in range(0, total, batch_size):
+            yield build(start, min(batch_size, total - start))
+
+
+async def write_batches(collection, batches: Iterator[List[Dict[str, Any]]], concurrency: int = 4) -> int:
+    """insert_many each batch, keeping up to `concurrency` inserts (pooled connections) in flight"""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    written = 0
+
+    async def writer():
+        nonlocal written
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                return
+            await collection.insert_many(batch, ordered=False, bypass_document_validation=True)
+            written += len(batch)
+
+    writers = [asyncio.create_task(writer()) for _ in range(concurrency)]
+
+    async def put(item):
+        """queue.put, raised out of as soon as a writer fails (dead writers would never drain the queue)"""
+        if not queue.full():
+            queue.put_nowait(item)
+        else:
+            putting = asyncio.ensure_future(queue.put(item))
+            await asyncio.wait([putting, *writers], return_when=asyncio.FIRST_COMPLETED)
+            if not putting.done():
+                putting.cancel()
+        for task in writers:
+            if task.done() and task.exception() is not None:
+                raise task.exception()
+
+    try:
+        for batch in batches:
+            # Generation is CPU-bound; put() yields to the writers whenever the queue is full
+            await put(batch)
+        for _ in writers:
+            await put(None)
+        await asyncio.gather(*writers)
+    finally:
+        for task in writers:
+            task.cancel()
+    return written
+
+
+async def generate_dataset(
+    db,
+    spec: DatasetSpec,
+    batch_size: int = 1000,
+    concurrency: int = 4,
+    collections: Optional[List[str]] = None,
+    log: Callable[[str], None] = print
+) -> Dict[str, Dict[str, float]]:
+    """Write the dataset; returns documents and docs/s per collection"""
+    generator = DatasetGenerator(spec)
+    report = {}
+    for name, count in spec.counts().items():
+        if collections and name not in collections or not count:
+            continue
+        started = time.perf_counter()
+        written = await write_batches(db[name], generator.batches(name, batch_size), concurrency)
+        elapsed = time.perf_counter() - started
+        report[name] = {"documents": written, "seconds": round(elapsed, 2),
+                        "docs_per_second": round(written / elapsed) if elapsed else 0}
+        log(f"✅ {name}: {written:,} documents in {elapsed:.1f}s ({report[name]['docs_per_second']:,} docs/s)")
+    return report
+
+
+async def seed_dataset(db, jobs: int = 1000, seed: int = 42, batch_size: int = 1000,
+                       concurrency: int = 4) -> Dict[str, Any]:
+    """
+    Seed all benchmark collections. Returns the document counts and the
+    fixtures (slugs, ids, search terms) the benchmark endpoints are filled from.
+    """
+    spec = DatasetSpec(jobs=jobs, seed=seed)
+    await generate_dataset(db, spec, batch_size=batch_size, concurrency=concurrency, log=lambda message: None)
+
+    visible = await db.jobs.find(
+        {"is_approved": True, "is_deleted": False}, {"_id": 0, "slug": 1, "id": 1}
+    ).limit(500).to_list(length=None)
+    blog_slugs = await db.blog_posts.distinct("slug", {"is_published": True})
+    fixtures = {
+        "job_slug": [job["slug"] for job in visible],
+        "job_id": [job["id"] for job in visible],
+        # A saved-jobs page worth of ids for /api/jobs/batch
+        "job_ids": [",".join(job["id"] for job in visible[i:i + 20]) for i in range(0, len(visible), 20)],
+        "blog_slug": sorted(blog_slugs)[:200],
+        "category": ["doctors", "nurses", "pharmacists"],
+        "category_slug": ["doctor", "nursing", "pharmacy", "clinical-research"],
+        "search_term": ["nurse", "pharmacist", "mumbai", "apollo", "cardiologist"],
+    }
+    return {"counts": spec.counts(), "fixtures": fixtures}
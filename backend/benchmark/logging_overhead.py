@@ -0,0 +1,135 @@
+"""
+Request throughput with print() versus the queued logging of app_logging.py
+when stdout is read by a slow consumer (a log shipper behind a pipe).
+
+Usage (from backend/):
+    python -m benchmark.logging_overhead
+    python -m benchmark.logging_overhead --requests 5000 --concurrency 100 --sink-kbps 256
+
+Each mode serves the same endpoint, which logs what get_jobs and
+apply_for_job used to print per request (two debug lines and an info line
+with the application), through an in-process ASGI client:
+- print:       print() to stdout, as before
+- stream:      stdlib logging with a StreamHandler on stdout, DEBUG enabled
+- queue:       setup_logging() at INFO (debug gated, JSON, off-loop writes)
+- queue-debug: setup_logging() at DEBUG (everything queued, rate limited)
+stdout is a pipe drained at --sink-kbps; results go to stderr.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI
+
+import app_logging
+
+MODES = ("print", "stream", "queue", "queue-debug")
+
+
+def redirect_stdout_to_slow_sink(kbps: float):
+    """Point fd 1 at a pipe that a thread drains at `kbps` (writes block once the pipe is full)"""
+    read_fd, write_fd = os.pipe()
+    os.dup2(write_fd, 1)
+    os.close(write_fd)
+    sys.stdout = os.fdopen(1, "w", buffering=1)
+
+    def drain():
+        while True:
+            chunk = os.read(read_fd, 16384)
+            if not chunk:
+                return
+            time.sleep(len(chunk) / (kbps * 1024))
+
+    threading.Thread(target=drain, daemon=True).start()
+
+
+def make_app(mode: str) -> FastAPI:
+    app = FastAPI()
+    logger = logging.getLogger("benchmark.endpoint")
+
+    @app.get("/jobs")
+    async def jobs():
+        await asyncio.sleep(0)
+        application = {"id": str(uuid.uuid4()), "job_id": "job-1", "applicant_id": "user-1", "status": "pending",
+                       "cover_letter": "I have five years of ICU experience " * 4}
+        if mode == "print":
+            print("[DEBUG] Found 20 jobs from database")
+            print("[DEBUG] Successfully serialized 20 jobs")
+            print(f"💾 Saving application to database: {application}")
+        else:
+            logger.debug("get_jobs: %d jobs from database", 20)
+            logger.debug("get_jobs: serialized %d jobs", 20)
+            logger.info("Application saved", extra={"application_id": application["id"], "job_id": "job-1"})
+        return {"jobs": []}
+
+    if mode.startswith("queue"):
+        app.add_middleware(app_logging.RequestIdMiddleware)
+    return app
+
+
+def configure(mode: str):
+    app_logging.shutdown_logging()
+    root = logging.getLogger()
+    if mode == "stream":
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+        root.handlers = [handler]
+        root.setLevel(logging.DEBUG)
+    elif mode.startswith("queue"):
+        app_logging.setup_logging(level="DEBUG" if mode == "queue-debug" else "INFO", fmt="json", stream=sys.stdout)
+    else:
+        root.handlers = []
+
+
+async def run_mode(mode: str, requests: int, concurrency: int):
+    configure(mode)
+    app = make_app(mode)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get("/jobs")
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*[one() for _ in range(min(200, requests))])
+        latencies.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*[one() for _ in range(requests)])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return requests / elapsed, statistics.median(latencies) * 1000, latencies[int(len(latencies) * 0.99) - 1] * 1000
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Request throughput: print() vs queued structured logging")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--sink-kbps", type=float, default=512, help="how fast the log consumer reads stdout")
+    parser.add_argument("--modes", default=",".join(MODES))
+    args = parser.parse_args(argv)
+
+    report = os.fdopen(os.dup(2), "w", buffering=1)
+    redirect_stdout_to_slow_sink(args.sink_kbps)
+    report.write(f"{args.requests} requests, concurrency {args.concurrency}, stdout read at {args.sink_kbps:g} KB/s\n")
+    report.write(f"{'mode':<12} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}\n")
+    for mode in args.modes.split(","):
+        throughput, p50, p99 = asyncio.run(run_mode(mode, args.requests, args.concurrency))
+        report.write(f"{mode:<12} {throughput:>9.0f} {p50:>9.2f} {p99:>9.2f}\n")
+    app_logging.shutdown_logging()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
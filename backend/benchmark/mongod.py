@@ -0,0 +1,144 @@
+"""
+Throwaway mongod for benchmarks: own dbpath in a temp dir, random port,
+removed on stop so every run starts from the same empty server.
+LocalReplicaSet starts several of them as one replica set (read routing tests).
+"""
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+from typing import List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LocalMongod:
+    """async with LocalMongod() as mongod: ... mongod.url"""
+
+    def __init__(self, binary: str = "mongod", port: Optional[int] = None, cache_size_gb: float = 1.0,
+                 repl_set: Optional[str] = None):
+        self.binary = shutil.which(binary) or binary
+        self.port = port or _free_port()
+        self.cache_size_gb = cache_size_gb
+        self.repl_set = repl_set
+        self.dbpath: Optional[str] = None
+        self.process: Optional[subprocess.Popen] = None
+
+    @property
+    def url(self) -> str:
+        return f"mongodb://127.0.0.1:{self.port}"
+
+    async def start(self, timeout: float = 30):
+        if not shutil.which(self.binary):
+            raise RuntimeError(f"{self.binary} not found - install MongoDB or pass --mongo-url")
+
+        self.dbpath = tempfile.mkdtemp(prefix="jobslly_bench_")
+        command = [
+            self.binary, "--dbpath", self.dbpath, "--port", str(self.port),
+            "--bind_ip", "127.0.0.1", "--wiredTigerCacheSizeGB", str(self.cache_size_gb),
+            "--logpath", os.path.join(self.dbpath, "mongod.log"), "--quiet"
+        ]
+        if self.repl_set:
+            command += ["--replSet", self.repl_set]
+        self.process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+
+        # directConnection: a replica set member is not selectable until the set is initiated
+        client = AsyncIOMotorClient(self.url, serverSelectionTimeoutMS=500, directConnection=True)
+        try:
+            deadline = asyncio.get_running_loop().time() + timeout
+            while True:
+                if self.process.poll() is not None:
+                    raise RuntimeError(f"mongod exited with {self.process.returncode} (log in {self.dbpath})")
+                try:
+                    await client.admin.command("ping")
+                    break
+                except Exception:
+                    if asyncio.get_running_loop().time() > deadline:
+                        raise RuntimeError(f"mongod did not start within {timeout}s")
+                    await asyncio.sleep(0.2)
+        finally:
+            client.close()
+        print(f"🍃 mongod running on {self.url} (dbpath {self.dbpath})")
+        return self
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        if self.dbpath:
+            shutil.rmtree(self.dbpath, ignore_errors=True)
+        self.process, self.dbpath = None, None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        self.stop()
+
+
+class LocalReplicaSet:
+    """async with LocalReplicaSet(members=3) as rs: ... rs.url (primary is the first member)"""
+
+    def __init__(self, members: int = 3, name: str = "rs0", binary: str = "mongod", cache_size_gb: float = 0.25):
+        self.name = name
+        self.members: List[LocalMongod] = [
+            LocalMongod(binary=binary, cache_size_gb=cache_size_gb, repl_set=name) for _ in range(members)
+        ]
+
+    @property
+    def url(self) -> str:
+        hosts = ",".join(f"127.0.0.1:{member.port}" for member in self.members)
+        return f"mongodb://{hosts}/?replicaSet={self.name}"
+
+    async def start(self, timeout: float = 60):
+        try:
+            await asyncio.gather(*[member.start() for member in self.members])
+            config = {
+                "_id": self.name,
+                "members": [
+                    # The first member always wins the election so tests know where writes go
+                    {"_id": i, "host": f"127.0.0.1:{member.port}", "priority": 2 if i == 0 else 1}
+                    for i, member in enumerate(self.members)
+                ]
+            }
+            client = AsyncIOMotorClient(self.members[0].url, directConnection=True)
+            try:
+                await client.admin.command("replSetInitiate", config)
+                deadline = asyncio.get_running_loop().time() + timeout
+                while True:
+                    status = await client.admin.command("replSetGetStatus")
+                    states = [member["stateStr"] for member in status["members"]]
+                    if states[0] == "PRIMARY" and all(state == "SECONDARY" for state in states[1:]):
+                        break
+                    if asyncio.get_running_loop().time() > deadline:
+                        raise RuntimeError(f"replica set not ready within {timeout}s: {states}")
+                    await asyncio.sleep(0.5)
+            finally:
+                client.close()
+        except Exception:
+            self.stop()
+            raise
+        print(f"🍃 replica set {self.name} running on {self.url}")
+        return self
+
+    def stop(self):
+        for member in self.members:
+            member.stop()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        self.stop()
@@ -0,0 +1,114 @@
+"""
+Recall and latency of the job vector index (job_vectors.py) on synthetic data.
+
+Usage (from backend/):
+    python -m benchmark.retrieval                       # 20k jobs, 500 profiles
+    python -m benchmark.retrieval --jobs 100000 --dim 2048 --min-recall 0.95
+
+Builds the hashed index from DatasetGenerator jobs (no MongoDB needed) and
+asks it for the top 10 jobs of synthetic candidate profiles. The reference
+is exact TF-IDF cosine over the same words without hashing; a returned job
+counts as relevant if its exact score reaches the exact 10th best, so ties
+in the repetitive synthetic text are not counted as misses. Exits 1 if mean
+recall@10 is below --min-recall.
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from benchmark.dataset import DatasetGenerator, DatasetSpec
+from job_vectors import JobVectorIndex, job_fields, term_weights
+
+K = 10
+EXPERIENCE = ["ICU", "emergency", "OT", "clinical", "pharmacy", "patient care", "research", "surgery",
+              "paediatric", "cardiology", "hospital", "laboratory"]
+
+
+def make_profile(rng: random.Random, job: Dict) -> str:
+    """A short candidate profile aimed at the kind of job `job` is"""
+    city = job["location"].split(",")[0]
+    return (f"{job['title']} with {rng.randrange(1, 15)} years of {rng.choice(EXPERIENCE)} experience, "
+            f"looking for a position in {city}")
+
+
+class ExactTfidf:
+    """Unhashed TF-IDF cosine with the same weighting, as the reference"""
+
+    def __init__(self, jobs: List[Dict]):
+        self.ids = [job["id"] for job in jobs]
+        docs = [term_weights(job_fields(job)) for job in jobs]
+        self.vocab = {word: i for i, word in enumerate(sorted({word for doc in docs for word in doc}))}
+        matrix = np.zeros((len(docs), len(self.vocab)), dtype=np.float32)
+        for row, doc in enumerate(docs):
+            for word, weight in doc.items():
+                matrix[row, self.vocab[word]] = weight
+        df = (matrix != 0).sum(axis=0)
+        self.idf = (np.log((1 + len(docs)) / (1 + df)) + 1).astype(np.float32)
+        matrix *= self.idf
+        norms = np.linalg.norm(matrix, axis=1)
+        norms[norms == 0] = 1
+        self.matrix = matrix / norms[:, None]
+        self.row_of = {job_id: row for row, job_id in enumerate(self.ids)}
+
+    def scores(self, text: str) -> np.ndarray:
+        query = np.zeros(len(self.vocab), dtype=np.float32)
+        for word, weight in term_weights({"description": text}).items():
+            if word in self.vocab:
+                query[self.vocab[word]] = weight
+        query *= self.idf
+        norm = np.linalg.norm(query)
+        return self.matrix @ (query / norm) if norm else np.zeros(len(self.ids), dtype=np.float32)
+
+
+def recall_at_k(exact_scores: np.ndarray, row_of: Dict[str, int], returned: List[str], k: int = K) -> float:
+    threshold = np.partition(exact_scores, -k)[-k] - 1e-6
+    relevant = sum(1 for job_id in returned[:k] if exact_scores[row_of[job_id]] >= threshold)
+    return relevant / k
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recall@10 and latency of the job vector index")
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=None, help="hashed dimensions (default: job_vectors.DIM)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--min-recall", type=float, default=0.85)
+    args = parser.parse_args(argv)
+
+    jobs = DatasetGenerator(DatasetSpec(jobs=args.jobs, seed=args.seed)).jobs(0, args.jobs)
+    jobs = [job for job in jobs if job["is_approved"] and not job["is_deleted"]]
+    rng = random.Random(args.seed)
+    profiles = [make_profile(rng, rng.choice(jobs)) for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = JobVectorIndex(directory, **({"dim": args.dim} if args.dim else {}))
+        started = time.perf_counter()
+        index.build(jobs)
+        build_seconds = time.perf_counter() - started
+        index.search("warm up")
+        size_mb = len(jobs) * index.dim * 4 / 1e6
+
+        exact = ExactTfidf(jobs)
+        timings, recalls = [], []
+        for profile in profiles:
+            started = time.perf_counter()
+            returned = [job_id for job_id, _ in index.search(profile, k=K)]
+            timings.append((time.perf_counter() - started) * 1000)
+            recalls.append(recall_at_k(exact.scores(profile), exact.row_of, returned))
+
+    timings.sort()
+    recall = statistics.mean(recalls)
+    print(f"Jobs indexed:  {len(jobs):,} ({index.dim} dims, {size_mb:.1f} MB float32, built in {build_seconds:.1f}s)")
+    print(f"Query latency: p50 {statistics.median(timings):.2f} ms, p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms")
+    print(f"Recall@{K}:     {recall:.3f} over {len(profiles)} profiles (min {args.min_recall})")
+    return 0 if recall >= args.min_recall else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
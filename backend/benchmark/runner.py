@@ -0,0 +1,134 @@
+"""
+Closed-loop load generator: `concurrency` clients each send the next request
+from a seeded, weighted plan as soon as their previous one completes.
+Reports throughput and latency percentiles per endpoint, and compares a run
+with a saved baseline.
+"""
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import httpx
+import jwt
+
+from benchmark.scenarios import AUTH_USERS, Endpoint
+
+
+def auth_headers(secret: str) -> Dict[str, Dict[str, str]]:
+    """Bearer headers per role, signed like server.create_access_token"""
+    expires = datetime.now(timezone.utc) + timedelta(hours=12)
+    return {
+        role: {"Authorization": f"Bearer {jwt.encode({'sub': email, 'exp': expires}, secret, algorithm='HS256')}"}
+        for role, email in AUTH_USERS.items()
+    }
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index] * 1000, 2)
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2) if ordered else 0,
+        "p50_ms": _percentile(ordered, 50),
+        "p95_ms": _percentile(ordered, 95),
+        "p99_ms": _percentile(ordered, 99),
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0,
+    }
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    endpoints: List[Endpoint],
+    fixtures: Dict[str, List[str]],
+    headers: Dict[str, Dict[str, str]],
+    requests: int = 2000,
+    concurrency: int = 16,
+    warmup: int = 3,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """Warm every endpoint, then send `requests` requests from `concurrency` clients"""
+    rng = random.Random(seed)
+    weights = [endpoint.weight for endpoint in endpoints]
+    plan = [
+        (endpoint, endpoint.render(rng, fixtures))
+        for endpoint in rng.choices(endpoints, weights=weights, k=requests)
+    ]
+
+    # Warm caches and connection pools; a failing endpoint is reported before the timed run
+    for endpoint in endpoints:
+        for _ in range(warmup):
+            response = await client.get(endpoint.render(rng, fixtures), headers=headers.get(endpoint.auth, {}))
+            if response.status_code >= 400:
+                print(f"⚠️ Warmup {endpoint.name}: HTTP {response.status_code} {response.text[:200]}")
+                break
+
+    latencies: Dict[str, List[float]] = {endpoint.name: [] for endpoint in endpoints}
+    errors: Dict[str, int] = {endpoint.name: 0 for endpoint in endpoints}
+    queue = iter(plan)
+
+    async def worker():
+        for endpoint, path in queue:
+            started = time.perf_counter()
+            try:
+                response = await client.get(path, headers=headers.get(endpoint.auth, {}))
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies[endpoint.name].append(time.perf_counter() - started)
+            if not ok:
+                errors[endpoint.name] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [latency for values in latencies.values() for latency in values]
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "total": summarize(all_latencies, sum(errors.values()), elapsed),
+        "endpoints": {
+            name: summarize(values, errors[name], elapsed)
+            for name, values in latencies.items() if values
+        },
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """
+    Regressions of `current` against `baseline` (same mode): p95 more than
+    `tolerance` slower, throughput more than `tolerance` lower, or new errors.
+    """
+    regressions = []
+    rows = [("total", baseline.get("total"), current.get("total"))] + [
+        (name, baseline.get("endpoints", {}).get(name), stats)
+        for name, stats in current.get("endpoints", {}).items()
+    ]
+    for name, before, after in rows:
+        if not before or not after:
+            continue
+        if before["p95_ms"] and after["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {after['p95_ms']}ms")
+        if name == "total" and after["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['rps']} -> {after['rps']} req/s")
+        if after["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {after['errors']}")
+    return regressions
+
+
+def print_report(mode: str, result: Dict[str, Any]):
+    print(f"\n📊 {mode}: {result['total']['requests']} requests in {result['elapsed_s']}s "
+          f"({result['total']['rps']} req/s, {result['total']['errors']} errors)")
+    print(f"{'endpoint':<26}{'reqs':>7}{'err':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in sorted(result["endpoints"].items(), key=lambda item: -item[1]["p95_ms"]):
+        print(f"{name:<26}{stats['requests']:>7}{stats['errors']:>6}"
+              f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}")
@@ -0,0 +1,60 @@
+"""
+Endpoints the benchmark drives, weighted roughly like production traffic
+(listings and job pages dominate, dashboards and admin pages are rare).
+Paths are filled from the dataset fixtures, e.g. {job_slug}.
+"""
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from benchmark.dataset import ADMIN_EMAIL, EMPLOYER_EMAIL, JOB_SEEKER_EMAIL
+
+
+@dataclass
+class Endpoint:
+    name: str
+    path: str
+    weight: int = 1
+    # Role whose token is sent (None for public endpoints)
+    auth: Optional[str] = None
+
+    def render(self, rng: random.Random, fixtures: Dict[str, List[str]]) -> str:
+        values = {key: rng.choice(options) for key, options in fixtures.items() if f"{{{key}}}" in self.path}
+        return self.path.format(**values)
+
+
+ENDPOINTS: List[Endpoint] = [
+    Endpoint("jobs", "/api/jobs?limit=20", weight=10),
+    Endpoint("jobs_summary", "/api/jobs?limit=20&summary=true", weight=5),
+    Endpoint("jobs_by_category", "/api/jobs?category={category}&limit=20", weight=4),
+    Endpoint("jobs_search", "/api/jobs/search?q={search_term}", weight=4),
+    Endpoint("job_detail", "/api/jobs/{job_slug}", weight=10),
+    Endpoint("jobs_batch", "/api/jobs/batch?ids={job_ids}", weight=2),
+    Endpoint("categories", "/api/categories", weight=2),
+    Endpoint("category_page", "/api/categories/{category_slug}", weight=4),
+    Endpoint("blog", "/api/blog", weight=3),
+    Endpoint("blog_post", "/api/blog/{blog_slug}", weight=3),
+    Endpoint("sitemap", "/sitemap.xml", weight=1),
+    Endpoint("job_seeker_dashboard", "/api/job-seeker/dashboard", weight=1, auth="job_seeker"),
+    Endpoint("job_seeker_applications", "/api/job-seeker/applications", weight=1, auth="job_seeker"),
+    Endpoint("employer_dashboard", "/api/employer/dashboard", weight=1, auth="employer"),
+    Endpoint("admin_stats", "/api/admin/stats", weight=1, auth="admin"),
+    Endpoint("admin_jobs", "/api/admin/jobs/all", weight=1, auth="admin"),
+    Endpoint("admin_blog", "/api/admin/blog", weight=1, auth="admin"),
+]
+
+# Which benchmark user each auth role logs in as
+AUTH_USERS = {
+    "admin": ADMIN_EMAIL,
+    "employer": EMPLOYER_EMAIL,
+    "job_seeker": JOB_SEEKER_EMAIL,
+}
+
+
+def select_endpoints(names: Optional[List[str]] = None) -> List[Endpoint]:
+    if not names:
+        return ENDPOINTS
+    unknown = set(names) - {endpoint.name for endpoint in ENDPOINTS}
+    if unknown:
+        raise ValueError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+    return [endpoint for endpoint in ENDPOINTS if endpoint.name in names]
@@ -0,0 +1,194 @@
+"""
+Blog search for HealthCare Jobs API.
+Weighted text index over title, excerpt and tags with relevance ordering,
+tag facets and highlighted excerpts. The page of posts and the counts are
+two aggregations run concurrently, so the page can be sorted and limited on
+an index while the facets count every match.
+"""
+import asyncio
+import html
+import re
+from typing import Any, Dict, List, Optional
+
+# Weighted text index declared in the index manifest (indexes.py)
+BLOG_SEARCH_INDEX_NAME = "blog_search_index"
+
+# Accepted values of the listing's sort parameter
+BLOG_SORTS = ("relevance", "recent")
+
+# Title matches matter most, then tags, then the excerpt body
+BLOG_SEARCH_WEIGHTS = {
+    "title": 10,
+    "tags": 5,
+    "excerpt": 2,
+}
+
+# Fields returned for blog listings (content and heavy images are left out)
+BLOG_SUMMARY_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "title": 1,
+    "slug": 1,
+    "excerpt": 1,
+    "author_id": 1,
+    "category": 1,
+    "tags": 1,
+    "is_published": 1,
+    "is_featured": 1,
+    "created_at": 1,
+    "published_at": 1,
+    "featured_image_thumbnail": 1,
+    # conditionally fetch featured_image only if thumbnail is missing
+    "featured_image": {
+        "$cond": {
+            "if": {
+                "$and": [
+                    {"$ne": ["$featured_image_thumbnail", None]},
+                    {"$ne": ["$featured_image_thumbnail", ""]}
+                ]
+            },
+            "then": "$$REMOVE",
+            "else": "$featured_image"
+        }
+    }
+}
+
+
+def _blog_match(query: Dict[str, Any], q: Optional[str]) -> Dict[str, Any]:
+    match = dict(query)
+    if q:
+        match["$text"] = {"$search": q}
+    return match
+
+
+def build_blog_search_pipeline(
+    query: Dict[str, Any],
+    q: Optional[str] = None,
+    sort: str = "relevance",
+    skip: int = 0,
+    limit: int = 10
+) -> List[Dict[str, Any]]:
+    """
+    Build the aggregation for one page of posts. Sort, skip and limit come right
+    after the match, so a listing walks the blog_posts_published index in order
+    and stops after the page. When q is given the match uses the $text index and
+    results are ranked by score (sort="relevance") or by date (sort="recent").
+    """
+    if sort not in BLOG_SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(BLOG_SORTS)}")
+    projection = dict(BLOG_SUMMARY_PROJECTION)
+
+    if q and sort == "relevance":
+        projection["score"] = {"$meta": "textScore"}
+        sort_stage = {"score": {"$meta": "textScore"}, "published_at": -1}
+    else:
+        sort_stage = {"published_at": -1}
+
+    return [
+        {"$match": _blog_match(query, q)},
+        {"$sort": sort_stage},
+        {"$skip": skip},
+        {"$limit": limit},
+        {"$project": projection}
+    ]
+
+
+def build_blog_facets_pipeline(
+    query: Dict[str, Any],
+    q: Optional[str] = None,
+    facet_limit: int = 20
+) -> List[Dict[str, Any]]:
+    """Build the aggregation for the total count and tag facets of every matching post"""
+    return [
+        {"$match": _blog_match(query, q)},
+        {"$facet": {
+            "total": [
+                {"$count": "count"}
+            ],
+            "tags": [
+                {"$unwind": "$tags"},
+                {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+                {"$limit": facet_limit}
+            ]
+        }}
+    ]
+
+
+async def search_blog_posts(
+    db,
+    query: Dict[str, Any],
+    q: Optional[str] = None,
+    sort: str = "relevance",
+    skip: int = 0,
+    limit: int = 10
+) -> Dict[str, Any]:
+    """
+    Run the page and facet aggregations concurrently.
+    Returns { "posts": [...], "total": int, "tags": [{"tag": str, "count": int}] }
+    """
+    pipeline = build_blog_search_pipeline(query, q=q, sort=sort, skip=skip, limit=limit)
+    posts, result = await asyncio.gather(
+        db.blog_posts.aggregate(pipeline).to_list(length=None),
+        db.blog_posts.aggregate(build_blog_facets_pipeline(query, q=q)).to_list(length=1)
+    )
+    facets = result[0] if result else {}
+
+    total = facets["total"][0]["count"] if facets.get("total") else 0
+    tags = [{"tag": t["_id"], "count": t["count"]} for t in facets.get("tags", [])]
+
+    if q:
+        terms = search_terms(q)
+        for post in posts:
+            post["highlight"] = highlight_excerpt(post.get("excerpt", ""), terms)
+
+    return {"posts": posts, "total": total, "tags": tags}
+
+
+def search_terms(q: str) -> List[str]:
+    """Split a search string into terms, ignoring $text negations and quotes"""
+    terms = []
+    for token in re.findall(r'-?"[^"]+"|\S+', q):
+        if token.startswith("-"):
+            continue
+        token = token.strip('"').strip()
+        if token:
+            terms.append(token)
+    return terms
+
+
+def highlight_excerpt(text: str, terms: List[str], max_length: int = 200) -> str:
+    """
+    Return an HTML-escaped snippet of text around the first match with every
+    search term wrapped in <mark>. Matching is prefix based so that stemmed
+    text-index hits such as "nursing" for "nurse" are still highlighted.
+    """
+    if not text:
+        return ""
+
+    stems = [re.escape(term[:-1] if len(term) > 4 else term) for term in terms]
+    if not stems:
+        return html.escape(text[:max_length])
+    pattern = re.compile(r"\b(" + "|".join(stems) + r")\w*", re.IGNORECASE)
+
+    # Center the snippet on the first match
+    first = pattern.search(text)
+    start = 0
+    if first and len(text) > max_length:
+        start = max(0, first.start() - max_length // 4)
+    snippet = text[start:start + max_length]
+
+    parts = []
+    last = 0
+    for match in pattern.finditer(snippet):
+        parts.append(html.escape(snippet[last:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group(0))}</mark>")
+        last = match.end()
+    parts.append(html.escape(snippet[last:]))
+
+    highlighted = "".join(parts)
+    if start > 0:
+        highlighted = "…" + highlighted
+    if start + max_length < len(text):
+        highlighted += "…"
+    return highlighted
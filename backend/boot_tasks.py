@@ -0,0 +1,117 @@
+"""
+Run-once boot tasks for HealthCare Jobs API.
+Work that should happen once per deploy rather than in every uvicorn worker
+(checking the index manifest, rebuilding caches whose format may have
+changed). The first worker to claim a task for the current BOOT_VERSION runs
+it; the others skip it. Tasks run in the background after startup, so a
+worker accepts requests without waiting for MongoDB.
+"""
+import hashlib
+import logging
+import os
+import socket
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict
+
+from pymongo.errors import DuplicateKeyError
+
+from indexes import missing_indexes
+from job_dedup import index_missing
+from scheduler import request_run
+
+logger = logging.getLogger(__name__)
+
+BOOT_TASKS_COLLECTION = "boot_tasks"
+# Not part of the release: virtualenvs and caches next to the sources
+_SKIP_DIRS = {"venv", ".venv", "env", "__pycache__", "node_modules"}
+
+
+def _code_version() -> str:
+    """Hash of the backend sources: the same on every host running the same code"""
+    backend = Path(__file__).resolve().parent
+    digest = hashlib.sha256()
+    for path in sorted(backend.rglob("*.py")):
+        relative = path.relative_to(backend)
+        if any(part in _SKIP_DIRS or part.startswith(".") for part in relative.parts[:-1]):
+            continue
+        digest.update(relative.as_posix().encode() + b"\0" + path.read_bytes() + b"\0")
+    return digest.hexdigest()[:16]
+
+
+# deploy-to-aws.sh sets DEPLOY_ID to the git commit; the source hash covers copies without git
+BOOT_VERSION = os.environ.get("DEPLOY_ID") or _code_version()
+
+BOOT_TASKS: Dict[str, Callable[[Any], Awaitable[Any]]] = {}
+
+
+def boot_task(name: str):
+    """Register an async func(db) that runs once per deploy"""
+    def decorator(func):
+        BOOT_TASKS[name] = func
+        return func
+    return decorator
+
+
+async def _claim(db, name: str, owner: str, version: str) -> bool:
+    """True if this worker is the first to start `name` for `version`"""
+    try:
+        await db[BOOT_TASKS_COLLECTION].update_one(
+            {"_id": name, "version": {"$ne": version}},
+            {"$set": {"version": version, "owner": owner, "status": "running",
+                      "started_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        # The document exists with this version: another worker claimed it
+        return False
+
+
+async def run_boot_tasks(db, version: str = BOOT_VERSION) -> Dict[str, str]:
+    """Run the registered tasks this worker claims; failures are logged, not raised"""
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    results = {}
+    for name, func in BOOT_TASKS.items():
+        try:
+            if not await _claim(db, name, owner, version):
+                results[name] = "skipped"
+                continue
+            result = await func(db)
+            status, error = "success", None
+            logger.info("Boot task %s: %s", name, result)
+        except Exception as e:
+            status, error = "failed", str(e)
+            logger.warning("Boot task %s failed: %s", name, e)
+        results[name] = status
+        try:
+            await db[BOOT_TASKS_COLLECTION].update_one(
+                {"_id": name, "owner": owner},
+                {"$set": {"status": status, "error": error, "finished_at": datetime.now(timezone.utc)}}
+            )
+        except Exception as e:
+            logger.warning("Could not record boot task %s: %s", name, e)
+    return results
+
+
+@boot_task("check_indexes")
+async def check_indexes(db):
+    """Warn if the index manifest has not been applied (`python migrate.py indexes`)"""
+    missing = await missing_indexes(db)
+    if missing:
+        logger.warning("%d indexes missing or outdated, run `python migrate.py indexes`: %s",
+                       len(missing), ", ".join(missing))
+    return {"missing": len(missing)}
+
+
+@boot_task("refresh_sitemap")
+async def refresh_sitemap_on_deploy(db):
+    """Ask the scheduler to rebuild the cached sitemap (new code may change its content)"""
+    await request_run(db, "sitemap")
+    return {"requested": "sitemap"}
+
+
+@boot_task("index_job_signatures")
+async def index_job_signatures(db):
+    """MinHash signatures for jobs posted before the duplicate index (job_dedup.py)"""
+    return await index_missing(db)
@@ -0,0 +1,42 @@
+"""
+Job categories for HealthCare Jobs API.
+URL slugs of the category pages and the values stored in jobs.categories
+(shared by the API and the dataset generator).
+"""
+
+# Map URL slugs to database category values
+CATEGORY_DB_MAPPING = {
+    "doctor": ["doctors", "doctor"],  # DB has "doctors" (plural)
+    "nursing": ["nurses", "nursing"],  # DB has "nurses" (plural)
+    "pharmacy": ["pharmacy", "pharmacists"],
+    "dentist": ["dentist", "dentists"],
+    "physiotherapy": ["physiotherapy", "physiotherapists"],
+    "medical-lab-technician": ["medical-lab-technician"],
+    "medical-science-liaison": ["medical-science-liaison"],
+    "pharmacovigilance": ["pharmacovigilance"],
+    "clinical-research": ["clinical-research"],
+    "non-clinical-jobs": ["non-clinical-jobs", "all"]
+}
+
+# Categories that should filter by job title instead of category field
+TITLE_BASED_CATEGORIES = {
+    "medical-lab-technician": ["medical lab technician", "mlt", "lab technician"],
+    "medical-science-liaison": ["medical science liaison", "msl"],
+    "pharmacovigilance": ["pharmacovigilance", "drug safety", "pv specialist", "pv associate"],
+    "clinical-research": ["clinical research", "clinical trial", "cra", "crc", "clinical data"],
+    "non-clinical-jobs": ["non clinical", "admin", "hr", "manager", "operations", "marketing"]
+}
+
+
+def job_category_slugs(title: str, categories) -> set:
+    """Category page slugs a job is listed under (same rules as the category pages)"""
+    title = (title or "").lower()
+    categories = set(categories or [])
+    slugs = set()
+    for slug, db_values in CATEGORY_DB_MAPPING.items():
+        if slug in TITLE_BASED_CATEGORIES:
+            if any(keyword in title for keyword in TITLE_BASED_CATEGORIES[slug]):
+                slugs.add(slug)
+        elif categories.intersection(db_values):
+            slugs.add(slug)
+    return slugs
@@ -0,0 +1,171 @@
+"""
+Chat log writer for HealthCare Jobs API.
+/api/chat used to insert_one each message before answering. Messages are
+now buffered per worker and written with one insert_many every
+FLUSH_MESSAGES messages or FLUSH_INTERVAL seconds, whichever comes first
+(and on shutdown). Each flush also upserts one `chat_sessions` document per
+conversation (message and character counts, first/last message, topics),
+so the admin side reads the rollup instead of scanning raw messages.
+Raw messages expire after CHAT_LOG_TTL_SECONDS, rollups after
+CHAT_SESSION_TTL_SECONDS (TTL indexes in indexes.py).
+"""
+import asyncio
+import logging
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from categories import CATEGORY_DB_MAPPING, TITLE_BASED_CATEGORIES
+from metrics import CHAT_LOG_MESSAGES
+
+logger = logging.getLogger(__name__)
+
+CHAT_MESSAGES_COLLECTION = "chat_messages"
+CHAT_SESSIONS_COLLECTION = "chat_sessions"
+CHAT_LOG_TTL_SECONDS = 30 * 24 * 60 * 60
+CHAT_SESSION_TTL_SECONDS = 365 * 24 * 60 * 60
+
+FLUSH_MESSAGES = 100
+FLUSH_INTERVAL = 0.5
+# Messages kept while MongoDB is unavailable; older ones are dropped beyond this
+MAX_PENDING = 10000
+# How long stop() waits for a flush in progress before cancelling it (its batch is kept)
+STOP_TIMEOUT = 10.0
+# Characters of the first/last message kept on the session rollup
+PREVIEW_CHARS = 200
+
+_WORD = re.compile(r"[a-z]+")
+# Category slug -> words or phrases that put a conversation under it
+TOPIC_KEYWORDS = {
+    slug: {slug.replace("-", " "), *TITLE_BASED_CATEGORIES.get(slug, [])}
+    | {word for value in values if value != "all" for word in (value.replace("-", " "), value.rstrip("s"))}
+    for slug, values in CATEGORY_DB_MAPPING.items()
+}
+
+
+def message_topics(text: str) -> List[str]:
+    words = f" {' '.join(_WORD.findall((text or '').lower()))} "
+    return sorted(slug for slug, keywords in TOPIC_KEYWORDS.items() if any(f" {k} " in words for k in keywords))
+
+
+def session_rollups(messages: List[Dict[str, Any]]) -> List[UpdateOne]:
+    """One upsert per conversation in a flushed batch"""
+    sessions: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for message in messages:
+        sessions[message["session_id"]].append(message)
+    updates = []
+    for session_id, batch in sessions.items():
+        first, last = batch[0], batch[-1]
+        topics = sorted({topic for message in batch for topic in message_topics(message["message"])})
+        update: Dict[str, Any] = {
+            "$setOnInsert": {"started_at": first["created_at"], "first_message": first["message"][:PREVIEW_CHARS]},
+            "$max": {"last_message_at": last["created_at"]},
+            "$set": {"last_message": last["message"][:PREVIEW_CHARS]},
+            "$inc": {
+                "messages": len(batch),
+                "user_chars": sum(len(message["message"]) for message in batch),
+                "response_chars": sum(len(message["response"]) for message in batch),
+            },
+        }
+        if topics:
+            update["$addToSet"] = {"topics": {"$each": topics}}
+        user_id = next((message["user_id"] for message in batch if message.get("user_id")), None)
+        if user_id:
+            update["$set"]["user_id"] = user_id
+        updates.append(UpdateOne({"_id": session_id}, update, upsert=True))
+    return updates
+
+
+class ChatLogWriter:
+    """Per-worker buffer of chat messages, written in batches by a background task"""
+
+    def __init__(self, flush_messages: int = FLUSH_MESSAGES, flush_interval: float = FLUSH_INTERVAL,
+                 max_pending: int = MAX_PENDING):
+        self.flush_messages = flush_messages
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending: List[Dict[str, Any]] = []
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.db = None
+
+    def __len__(self):
+        return len(self.pending)
+
+    def log(self, message: Dict[str, Any]):
+        """Queue a message (a ChatMessage dict with a datetime created_at); returns at once"""
+        self.pending.append(message)
+        if len(self.pending) > self.max_pending:
+            dropped = len(self.pending) - self.max_pending
+            del self.pending[:dropped]
+            CHAT_LOG_MESSAGES.labels("dropped").inc(dropped)
+        if len(self.pending) >= self.flush_messages:
+            self._wake.set()
+
+    async def flush(self, db) -> int:
+        """Write the buffered messages and their session rollups, returning how many were written"""
+        if not self.pending:
+            return 0
+        # Swap the buffer first so messages arriving during the write wait for the next flush
+        batch, self.pending = self.pending, []
+        try:
+            await db[CHAT_MESSAGES_COLLECTION].insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate ids were written by an earlier attempt; retry only the other failures
+            failed = {error["index"] for error in (e.details or {}).get("writeErrors", []) if error.get("code") != 11000}
+            if failed:
+                self.pending[:0] = [batch[index] for index in sorted(failed)]
+                CHAT_LOG_MESSAGES.labels("retried").inc(len(failed))
+            batch = [message for index, message in enumerate(batch) if index not in failed]
+        except BaseException:
+            # Includes cancellation: the batch goes back to the buffer, not lost
+            self.pending[:0] = batch
+            CHAT_LOG_MESSAGES.labels("retried").inc(len(batch))
+            raise
+        CHAT_LOG_MESSAGES.labels("written").inc(len(batch))
+        if batch:
+            await db[CHAT_SESSIONS_COLLECTION].bulk_write(session_rollups(batch), ordered=False)
+        return len(batch)
+
+    def start(self, db):
+        self.db = db
+        self._stopping = False
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """Let a flush in progress finish, stop the background task and write what is left"""
+        if self._task:
+            self._stopping = True
+            self._wake.set()
+            await asyncio.wait({self._task}, timeout=STOP_TIMEOUT)
+            if not self._task.done():
+                self._task.cancel()
+                await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.db is not None:
+            try:
+                await self.flush(self.db)
+            except Exception as e:
+                logger.error("Chat log: %d messages not written on shutdown: %s", len(self.pending), e)
+
+    async def _loop(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self._stopping:
+                return
+            try:
+                await self.flush(self.db)
+            except Exception as e:
+                logger.warning("Chat log flush failed, %d messages kept for retry: %s", len(self.pending), e)
+                await asyncio.sleep(self.flush_interval)
+
+
+chat_log = ChatLogWriter()
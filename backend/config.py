@@ -32,10 +32,13 @@ MONGO_SETTINGS = {
     'retryReads': True
 }
 
-# AI Integration
-AI_ENABLED = False
-try:
-    from emergentintegrations.llm.chat import LlmChat, UserMessage
-    AI_ENABLED = True
-except ImportError:
-    print("AI integration not available")
+# Staleness bound for reads routed to secondaries (see database.py)
+READ_MAX_STALENESS_SECONDS = int(os.environ.get('READ_MAX_STALENESS_SECONDS', '90'))
+
+# LLM behind the AI endpoints (also part of the AI cache key, see ai_cache.py)
+AI_PROVIDER = "openai"
+AI_MODEL = "gpt-4o-mini"
+
+# What admin job posting does with a near-duplicate of a live job (job_dedup.py):
+# warn (post it, flagged with duplicate_of), merge (return the existing job) or allow
+DUPLICATE_JOB_POLICY = os.environ.get('DUPLICATE_JOB_POLICY', 'warn')
@@ -0,0 +1,58 @@
+"""
+Buffered counters for HealthCare Jobs API.
+Hot-path increments (job views) are accumulated in memory and written with
+one unordered bulk_write per flush instead of one update_one per request.
+Each worker flushes its own buffer from the scheduler and on shutdown.
+"""
+from collections import Counter
+from typing import Dict
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+
+class CounterBuffer:
+    """In-memory increments of one numeric field, keyed by document `id`"""
+
+    def __init__(self, collection: str, field: str):
+        self.collection = collection
+        self.field = field
+        self.pending: Counter = Counter()
+
+    def incr(self, doc_id: str, amount: int = 1):
+        self.pending[doc_id] += amount
+
+    async def flush(self, db) -> int:
+        """Write pending increments, returning how many were applied"""
+        if not self.pending:
+            return 0
+        # Swap the buffer first so increments arriving during the write are kept
+        pending, self.pending = self.pending, Counter()
+        items = list(pending.items())
+        ops = [UpdateOne({"id": doc_id}, {"$inc": {self.field: amount}}) for doc_id, amount in items]
+        try:
+            await db[self.collection].bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            # Only the failed increments are retried, the rest were applied
+            failed = [error["index"] for error in (e.details or {}).get("writeErrors", [])]
+            for index in failed:
+                self.pending[items[index][0]] += items[index][1]
+            raise
+        except Exception:
+            # Put the increments back so the next flush retries them
+            self.pending.update(pending)
+            raise
+        return sum(pending.values())
+
+
+job_views = CounterBuffer("jobs", "view_count")
+
+COUNTERS = [job_views]
+
+
+async def flush_counters(db) -> Dict[str, int]:
+    """Flush every counter buffer of this worker"""
+    flushed = {}
+    for counter in COUNTERS:
+        flushed[f"{counter.collection}.{counter.field}"] = await counter.flush(db)
+    return flushed
@@ -1,12 +1,50 @@
 """
 Database module for HealthCare Jobs API.
-Manages MongoDB connection and database instance.
+The one MongoDB client per process: the API, scheduler jobs and the CLI
+scripts all import it from here, so a process has one set of connection
+pools (and one TLS handshake per server) however many modules use it.
+
+Two logical handles share the client:
+    db       primary reads and all writes (admin, auth, anything that must
+             read its own writes)
+    read_db  secondaryPreferred with bounded staleness, for public listing,
+             search and sitemap reads that can be a little behind
+On a standalone server both handles read from the same node.
 """
 from motor.motor_asyncio import AsyncIOMotorClient
-from config import MONGO_URL, DB_NAME, MONGO_SETTINGS
+from pymongo.read_preferences import SecondaryPreferred
+
+from config import DB_NAME, MONGO_SETTINGS, MONGO_URL, READ_MAX_STALENESS_SECONDS
+from db_profiler import PROFILING_ENABLED, profiler
+from metrics import pool_metrics
+from tracing import TRACING_ENABLED, tracing_listener
+
+# Secondaries further behind the primary than this are not used for reads
+# (MongoDB requires at least 90 seconds)
+SECONDARY_READS = SecondaryPreferred(max_staleness=READ_MAX_STALENESS_SECONDS)
+
+
+def create_client(url: str = MONGO_URL, **overrides) -> AsyncIOMotorClient:
+    """Client with the shared pool settings and monitoring listeners"""
+    settings = {
+        **MONGO_SETTINGS,
+        # Pool metrics (see metrics.py, /metrics), per-request command timing (db_profiler.py, /api/admin/perf)
+        # and command spans (tracing.py)
+        "event_listeners": [pool_metrics] + ([profiler] if PROFILING_ENABLED else [])
+                           + ([tracing_listener] if TRACING_ENABLED else []),
+        **overrides
+    }
+    return AsyncIOMotorClient(url, **settings)
+
+
+def secondary(database):
+    """The same database read with SECONDARY_READS (shares the client's pools)"""
+    return database.client.get_database(database.name, read_preference=SECONDARY_READS)
+
 
 # Create MongoDB client with optimized settings
-client = AsyncIOMotorClient(MONGO_URL, **MONGO_SETTINGS)
+client = create_client()
 
-# Database instance
+# Database handles
 db = client[DB_NAME]
+read_db = secondary(db)
@@ -0,0 +1,243 @@
+"""
+MongoDB command profiling for HealthCare Jobs API.
+A pymongo CommandListener attributes every command to the request that issued
+it (through a contextvar that Motor copies into its executor threads), keeps
+per-route aggregates and a bounded log of slow commands, and the middleware
+reports each request's DB time in a Server-Timing header.
+
+Set DB_PROFILING=0 to turn it off and SLOW_QUERY_MS to change the slow log
+threshold (default 100ms).
+"""
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import bson
+from pymongo import monitoring
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+PROFILING_ENABLED = os.environ.get("DB_PROFILING", "1") != "0"
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "100"))
+SLOW_LOG_SIZE = 200
+# Per-route samples kept for percentiles
+ROUTE_SAMPLES = 1000
+
+# Command arguments that hold the query shape (values are redacted)
+_SHAPE_FIELDS = ("filter", "query", "q", "sort", "projection", "pipeline", "updates", "deletes", "u")
+
+
+@dataclass
+class RequestProfile:
+    """DB activity of one request"""
+    route: str
+    queries: int = 0
+    db_ms: float = 0.0
+    docs: int = 0
+    bytes: int = 0
+
+
+_current_request: ContextVar[Optional[RequestProfile]] = ContextVar("db_profile_request", default=None)
+
+
+def _redact(value: Any, depth: int = 0) -> Any:
+    """Keep keys and operators, replace literal values with their type"""
+    if depth > 6:
+        return "..."
+    if isinstance(value, dict):
+        return {k: _redact(v, depth + 1) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        # Operator lists ($or, $and, pipelines) keep their structure, value lists collapse
+        if value and all(isinstance(item, dict) for item in value):
+            return [_redact(item, depth + 1) for item in value[:10]]
+        return "[?]"
+    return "?"
+
+
+def command_shape(command_name: str, command: Dict[str, Any]) -> Dict[str, Any]:
+    """Command name, collection and redacted query arguments"""
+    shape: Dict[str, Any] = {"command": command_name, "collection": command.get(command_name)}
+    for field in _SHAPE_FIELDS:
+        if field in command:
+            shape[field] = _redact(command[field])
+    return shape
+
+
+def _reply_docs(reply: Dict[str, Any]) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or [])
+    value = reply.get("value")
+    if value is not None:
+        return 1
+    n = reply.get("n")
+    return n if isinstance(n, int) else 0
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 2)
+
+
+class _RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.db_ms = 0.0
+        self.db_samples = deque(maxlen=ROUTE_SAMPLES)
+        self.total_samples = deque(maxlen=ROUTE_SAMPLES)
+
+    def summary(self) -> Dict[str, Any]:
+        db_samples = list(self.db_samples)
+        total_samples = list(self.total_samples)
+        return {
+            "requests": self.requests,
+            "queries": self.queries,
+            "queries_per_request": round(self.queries / self.requests, 2) if self.requests else 0,
+            "max_queries": self.max_queries,
+            "db_ms": round(self.db_ms, 2),
+            "db_ms_p50": _percentile(db_samples, 50),
+            "db_ms_p95": _percentile(db_samples, 95),
+            "db_ms_p99": _percentile(db_samples, 99),
+            "total_ms_p50": _percentile(total_samples, 50),
+            "total_ms_p95": _percentile(total_samples, 95),
+            "total_ms_p99": _percentile(total_samples, 99),
+        }
+
+
+class CommandProfiler(monitoring.CommandListener):
+    """Times every command and attributes it to the current request"""
+
+    def __init__(self, slow_query_ms: float = SLOW_QUERY_MS, slow_log_size: int = SLOW_LOG_SIZE):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        # Started commands waiting for their reply, keyed by (connection, request id)
+        self._pending: Dict[Any, Any] = {}
+        self._routes: Dict[str, _RouteStats] = {}
+        self._slow = deque(maxlen=slow_log_size)
+        self._background = {"queries": 0, "db_ms": 0.0}
+        self._since = datetime.now(timezone.utc)
+
+    # pymongo listener callbacks (run in Motor's executor threads)
+
+    def started(self, event):
+        self._pending[(event.connection_id, event.request_id)] = (
+            _current_request.get(), event.command_name, event.command
+        )
+
+    def succeeded(self, event):
+        self._finish(event, event.reply, failed=False)
+
+    def failed(self, event):
+        self._finish(event, {}, failed=True)
+
+    def _finish(self, event, reply, failed: bool):
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        profile, command_name, command = pending
+        duration_ms = event.duration_micros / 1000
+        docs = _reply_docs(reply)
+        size = len(bson.encode(reply)) if reply else 0
+
+        with self._lock:
+            if profile is not None:
+                profile.queries += 1
+                profile.db_ms += duration_ms
+                profile.docs += docs
+                profile.bytes += size
+            else:
+                self._background["queries"] += 1
+                self._background["db_ms"] += duration_ms
+
+            if duration_ms >= self.slow_query_ms or failed:
+                self._slow.append({
+                    "at": datetime.now(timezone.utc),
+                    "route": profile.route if profile else "background",
+                    "duration_ms": round(duration_ms, 2),
+                    "docs": docs,
+                    "bytes": size,
+                    "failed": failed,
+                    "shape": command_shape(command_name, command),
+                })
+
+    # Request lifecycle (used by ProfilingMiddleware)
+
+    def begin_request(self, route: str) -> RequestProfile:
+        profile = RequestProfile(route=route)
+        _current_request.set(profile)
+        return profile
+
+    def end_request(self, profile: RequestProfile, route: str, total_ms: float):
+        with self._lock:
+            stats = self._routes.setdefault(route, _RouteStats())
+            stats.requests += 1
+            stats.queries += profile.queries
+            stats.max_queries = max(stats.max_queries, profile.queries)
+            stats.db_ms += profile.db_ms
+            stats.db_samples.append(profile.db_ms)
+            stats.total_samples.append(total_ms)
+
+    def snapshot(self, slow: int = 50) -> Dict[str, Any]:
+        """Per-route aggregates (by DB time) and the most recent slow commands"""
+        with self._lock:
+            routes = {route: stats.summary() for route, stats in self._routes.items()}
+            slow_queries = list(self._slow)[-slow:][::-1] if slow > 0 else []
+            background = {**self._background, "db_ms": round(self._background["db_ms"], 2)}
+        return {
+            "enabled": PROFILING_ENABLED,
+            "since": self._since,
+            "slow_query_ms": self.slow_query_ms,
+            "routes": dict(sorted(routes.items(), key=lambda item: item[1]["db_ms"], reverse=True)),
+            "background": background,
+            "slow_queries": slow_queries,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self._slow.clear()
+            self._background = {"queries": 0, "db_ms": 0.0}
+            self._since = datetime.now(timezone.utc)
+
+
+profiler = CommandProfiler()
+
+
+def _route_name(request: Request) -> str:
+    """Route template (e.g. GET /api/jobs/{job_id}) so aggregates don't split per id"""
+    route = request.scope.get("route")
+    path = getattr(route, "path", None) or "unmatched"
+    return f"{request.method} {path}"
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Attributes DB commands to the request and adds a Server-Timing header:
+    db;dur=<ms>;desc="<n> queries", app;dur=<ms>
+    """
+    async def dispatch(self, request: Request, call_next):
+        if not PROFILING_ENABLED:
+            return await call_next(request)
+
+        started = time.perf_counter()
+        profile = profiler.begin_request(f"{request.method} {request.url.path}")
+        response = await call_next(request)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        route = _route_name(request)
+        profile.route = route
+        profiler.end_request(profile, route, total_ms)
+        response.headers["Server-Timing"] = (
+            f'db;dur={profile.db_ms:.1f};desc="{profile.queries} queries", app;dur={total_ms:.1f}'
+        )
+        return response
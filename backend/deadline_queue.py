@@ -0,0 +1,161 @@
+"""
+Deadline queue for HealthCare Jobs API.
+Keeps an in-memory min-heap of upcoming job expiries (the earlier of
+application_deadline and expires_at) and archives each job within seconds of
+its deadline, publishing a job.archived event for cache/sitemap invalidation.
+
+The heap is filled from two sides:
+- reload(): the scheduler leader loads every live job due within the next
+  RELOAD_HORIZON from the deadline indexes (this also catches up on jobs that
+  expired while no worker was running, so restarts stay correct)
+- track(): the job write paths push new and changed deadlines in the worker
+  that handled the request
+Archiving is a conditional update, so an entry that went stale (deadline
+moved, job deleted, another worker got there first) is a no-op.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from events import JOB_ARCHIVED, publish
+
+logger = logging.getLogger(__name__)
+
+# The leader reloads the window more often than this, so every deadline is queued in time
+RELOAD_HORIZON = timedelta(minutes=10)
+
+# Upper bound on jobs loaded per reload (a large backlog is left to the periodic sweep)
+RELOAD_LIMIT = 10000
+
+DEADLINE_FIELDS = ("application_deadline", "expires_at")
+
+
+def _as_utc(value) -> Optional[datetime]:
+    if isinstance(value, str) and value:
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        # MongoDB returns naive UTC datetimes
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def job_deadline(job: Dict[str, Any]) -> Optional[datetime]:
+    """Earliest of a job's application_deadline and expires_at, or None"""
+    deadlines = [d for d in (_as_utc(job.get(field)) for field in DEADLINE_FIELDS) if d]
+    return min(deadlines) if deadlines else None
+
+
+def expired_jobs_query(now: datetime) -> Dict[str, Any]:
+    """Live jobs whose application deadline or expiry date is at or before now"""
+    return {
+        "$or": [{field: {"$lte": now}} for field in DEADLINE_FIELDS],
+        "is_archived": {"$ne": True},
+        "is_deleted": {"$ne": True}
+    }
+
+
+class DeadlineQueue:
+    """Min-heap of (deadline, job id) served by one background task per worker"""
+
+    def __init__(self):
+        self.heap: List[Tuple[datetime, int, str]] = []
+        # Current deadline per job; heap entries that disagree are stale and skipped
+        self.deadlines: Dict[str, datetime] = {}
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.db = None
+        self.archived = 0
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def track(self, job: Dict[str, Any]):
+        """Queue (or re-queue) a job after a write; archived/deleted jobs are dropped"""
+        job_id = job.get("id")
+        if not job_id:
+            return
+        deadline = None if job.get("is_archived") or job.get("is_deleted") else job_deadline(job)
+        if deadline is None:
+            self.deadlines.pop(job_id, None)
+            return
+        if self.deadlines.get(job_id) == deadline:
+            return
+        self.deadlines[job_id] = deadline
+        heapq.heappush(self.heap, (deadline, next(self._seq), job_id))
+        if self.heap[0][2] == job_id:
+            # New earliest deadline: wake the loop so it does not oversleep
+            self._wake.set()
+
+    async def reload(self, db) -> Dict[str, int]:
+        """Queue every live job due before now + RELOAD_HORIZON (indexed on both deadline fields)"""
+        horizon = datetime.now(timezone.utc) + RELOAD_HORIZON
+        projection = {"_id": 0, "id": 1, **{field: 1 for field in DEADLINE_FIELDS}}
+        loaded = 0
+        async for job in db.jobs.find(expired_jobs_query(horizon), projection).limit(RELOAD_LIMIT):
+            self.track(job)
+            loaded += 1
+        return {"loaded": loaded, "queued": len(self.deadlines)}
+
+    def start(self, db):
+        self.db = db
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _pop_due(self, now: datetime) -> List[str]:
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            deadline, _, job_id = heapq.heappop(self.heap)
+            if self.deadlines.get(job_id) == deadline:
+                del self.deadlines[job_id]
+                due.append(job_id)
+        return due
+
+    async def _archive(self, job_id: str, now: datetime):
+        job = await self.db.jobs.find_one_and_update(
+            {"id": job_id, **expired_jobs_query(now)},
+            {"$set": {"is_archived": True, "archived_at": now}},
+            projection={"_id": 0, "id": 1, "slug": 1}
+        )
+        if job:
+            self.archived += 1
+            logger.info("Archived job %s at its deadline", job_id)
+            await publish(self.db, JOB_ARCHIVED, {"job_id": job_id, "slug": job.get("slug"), "reason": "deadline"})
+
+    async def _loop(self):
+        while True:
+            try:
+                self._wake.clear()
+                now = datetime.now(timezone.utc)
+                due = self._pop_due(now)
+                for job_id in due:
+                    await self._archive(job_id, now)
+                if due:
+                    continue
+
+                timeout = (self.heap[0][0] - now).total_seconds() if self.heap else None
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error archiving expired jobs: %s", e)
+                await asyncio.sleep(5)
+
+
+deadline_queue = DeadlineQueue()
@@ -0,0 +1,40 @@
+"""
+Invalidation events for HealthCare Jobs API.
+publish() calls the handlers subscribed in this worker and records the event
+in the `events` collection (kept for 7 days by a TTL index) so other workers
+and tools can see what changed and when.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+EVENTS_COLLECTION = "events"
+EVENT_RETENTION_SECONDS = 7 * 24 * 60 * 60
+
+# Event types
+JOB_ARCHIVED = "job.archived"
+JOBS_ARCHIVED = "jobs.archived"
+
+_subscribers: Dict[str, List[Callable[[Dict[str, Any]], Awaitable[None]]]] = {}
+
+
+def subscribe(event_type: str, handler: Callable[[Dict[str, Any]], Awaitable[None]]):
+    """Register an async handler(payload) for an event type in this worker"""
+    _subscribers.setdefault(event_type, []).append(handler)
+
+
+async def publish(db, event_type: str, payload: Dict[str, Any]):
+    """Record an event and notify local subscribers (handler errors are logged, not raised)"""
+    await db[EVENTS_COLLECTION].insert_one({
+        "type": event_type,
+        "payload": payload,
+        "created_at": datetime.now(timezone.utc)
+    })
+    handlers = _subscribers.get(event_type, [])
+    results = await asyncio.gather(*(handler(payload) for handler in handlers), return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error("%s handler failed: %s", event_type, result, exc_info=result)
@@ -5,13 +5,8 @@ Renames actual files and updates database references
 """
 import asyncio
 import os
-from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
 
-load_dotenv()
-
-MONGO_URL = os.environ.get('MONGO_URL')
-DB_NAME = os.environ.get('DB_NAME')
+from database import client, db
 
 def sanitize_filename(filename):
     """Remove/replace characters that cause issues in URLs"""
@@ -35,9 +30,6 @@ def sanitize_filename(filename):
 
 async def fix_image_filenames():
     """Fix all blog post image filenames that contain spaces"""
-    client = AsyncIOMotorClient(MONGO_URL, tlsAllowInvalidCertificates=True)
-    db = client[DB_NAME]
-    
     updated_count = 0
     error_count = 0
     
@@ -99,8 +91,6 @@ async def fix_image_filenames():
                 )
                 error_count += 1
     
-    client.close()
-    
     print(f"\n✓ Migration complete!")
     print(f"  Updated: {updated_count}")
     print(f"  Errors: {error_count}")
@@ -108,5 +98,8 @@ async def fix_image_filenames():
     return updated_count
 
 if __name__ == "__main__":
-    count = asyncio.run(fix_image_filenames())
+    try:
+        count = asyncio.run(fix_image_filenames())
+    finally:
+        client.close()
     print(f"\n✓ Fixed {count} image filenames")
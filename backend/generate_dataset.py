@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset CLI
+Writes a deterministic, seeded dataset (jobs, users, job_seekers, job_leads,
+applications, blog_posts) into the database configured by MONGO_URL / DB_NAME
+(backend/.env), with batched insert_many from several concurrent writers.
+For development and load-test data at scale; the hand-written demo content
+(create_*.py in the repo root, posted through the API) is not reproduced.
+
+Usage:
+    python generate_dataset.py --jobs 10000
+    python generate_dataset.py --jobs 1000000 --concurrency 8 --batch-size 2000 --drop
+    python generate_dataset.py --jobs 5000 --legacy-dates 0.2    # exercise migration 0005
+    python generate_dataset.py --jobs 0 --blog-posts 500 --only blog_posts
+    python generate_dataset.py --jobs 100000 --dry-run           # generate without writing (CPU cost)
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from benchmark.dataset import DatasetGenerator, DatasetSpec, generate_dataset
+
+COLLECTIONS = ["users", "jobs", "blog_posts", "job_seekers", "applications", "job_leads"]
+
+
+async def generate(db, args) -> int:
+    spec = DatasetSpec(
+        jobs=args.jobs, users=args.users, job_seekers=args.job_seekers, leads=args.leads,
+        applications=args.applications, blog_posts=args.blog_posts, seed=args.seed,
+        legacy_dates=args.legacy_dates
+    )
+    collections = args.only or COLLECTIONS
+    counts = {name: count for name, count in spec.counts().items() if name in collections}
+    print(f"🌱 Generating {sum(counts.values()):,} documents (seed {spec.seed}): "
+          + ", ".join(f"{name}={count:,}" for name, count in counts.items()))
+
+    if args.dry_run:
+        generator = DatasetGenerator(spec)
+        started = time.perf_counter()
+        total = sum(len(batch) for name in counts for batch in generator.batches(name, args.batch_size))
+        elapsed = time.perf_counter() - started
+        print(f"🔍 Generated {total:,} documents in {elapsed:.1f}s ({total / elapsed:,.0f} docs/s), nothing written")
+        return 0
+
+    # Refuse to mix generated data into existing data unless asked to
+    for name in counts:
+        if args.drop:
+            await db[name].drop()
+        elif not args.append and await db[name].estimated_document_count():
+            print(f"❌ {name} already has documents; use --drop to replace them or --append to add to them")
+            return 1
+
+    started = time.perf_counter()
+    report = await generate_dataset(db, spec, batch_size=args.batch_size, concurrency=args.concurrency,
+                                    collections=list(counts))
+    elapsed = time.perf_counter() - started
+    total = sum(row["documents"] for row in report.values())
+    print(f"✅ {total:,} documents in {elapsed:.1f}s ({total / elapsed:,.0f} docs/s)")
+
+    if args.indexes:
+        from indexes import ensure_indexes
+        await ensure_indexes(db)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset")
+    parser.add_argument("--jobs", type=int, default=1000, help="Jobs (other collections scale with it)")
+    parser.add_argument("--users", type=int, help="Default: jobs / 2")
+    parser.add_argument("--job-seekers", type=int, help="Default: users")
+    parser.add_argument("--leads", type=int, help="Default: jobs * 2")
+    parser.add_argument("--applications", type=int, help="Default: jobs * 2")
+    parser.add_argument("--blog-posts", type=int, help="Default: jobs / 100")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--legacy-dates", type=float, default=0.0,
+                        help="Fraction of documents with ISO string dates (pre-migration format)")
+    parser.add_argument("--only", nargs="+", choices=COLLECTIONS, help="Only these collections")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per insert_many")
+    parser.add_argument("--concurrency", type=int, default=4, help="insert_many batches in flight")
+    parser.add_argument("--drop", action="store_true", help="Drop the target collections first")
+    parser.add_argument("--append", action="store_true", help="Add to collections that already have documents")
+    parser.add_argument("--indexes", action="store_true", help="Apply the index manifest afterwards")
+    parser.add_argument("--dry-run", action="store_true", help="Generate documents without writing them")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        return asyncio.run(generate(None, args))
+
+    from database import client, db
+    try:
+        return asyncio.run(generate(db, args))
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
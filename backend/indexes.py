@@ -0,0 +1,329 @@
+"""
+Index manifest for HealthCare Jobs API.
+Every index the application relies on, declared in one place and applied by
+a single idempotent ensure_indexes() that runs once per deploy
+(`python migrate.py indexes`) instead of on every worker boot.
+
+Compound indexes follow the equality -> sort -> range rule so the hot
+listing queries ({"is_approved": True, "is_deleted": {"$ne": True}} sorted by
+created_at desc, archived last) are answered in index order without an
+in-memory SORT. test_query_plans.py explains every query shape the endpoints
+issue and fails on COLLSCAN or SORT stages.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ai_cache import AI_CACHE_COLLECTION, AI_CACHE_TTL_SECONDS
+from blog_search import BLOG_SEARCH_INDEX_NAME, BLOG_SEARCH_WEIGHTS
+from chat_log import (
+    CHAT_LOG_TTL_SECONDS, CHAT_MESSAGES_COLLECTION, CHAT_SESSION_TTL_SECONDS, CHAT_SESSIONS_COLLECTION
+)
+from events import EVENTS_COLLECTION, EVENT_RETENTION_SECONDS
+from job_dedup import SIGNATURES_COLLECTION as JOB_SIGNATURES_COLLECTION
+from job_alerts import OUTBOX_COLLECTION, OUTBOX_RETENTION_SECONDS, SAVED_SEARCHES_COLLECTION
+from metrics import WORKERS_COLLECTION, WORKER_TTL_SECONDS
+from scheduler.core import RUNS_COLLECTION, RUN_HISTORY_SECONDS
+
+
+def _normalize(keys) -> List[Tuple[str, Any]]:
+    """Key lists compare equal whether directions come back as 1, 1.0 or 'text'"""
+    return [(k, v if isinstance(v, str) else int(v)) for k, v in keys]
+
+
+@dataclass
+class IndexSpec:
+    """One index: keys in order, plus the options that define it"""
+    name: str
+    keys: List[Tuple[str, Any]]
+    unique: bool = False
+    sparse: bool = False
+    expire_after_seconds: Optional[int] = None
+    weights: Optional[Dict[str, int]] = None
+    # What the index is for (shown by `migrate.py indexes --dry-run`)
+    purpose: str = ""
+
+    @property
+    def is_text(self) -> bool:
+        return any(kind == "text" for _, kind in self.keys)
+
+    def options(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {"name": self.name}
+        if self.unique:
+            options["unique"] = True
+        if self.sparse:
+            options["sparse"] = True
+        if self.expire_after_seconds is not None:
+            options["expireAfterSeconds"] = self.expire_after_seconds
+        if self.weights:
+            options["weights"] = self.weights
+        return options
+
+    def matches(self, info: Dict[str, Any]) -> bool:
+        """True if an existing index (from index_information) has this definition"""
+        if self.is_text:
+            if not any(kind == "text" for _, kind in info.get("key", [])):
+                return False
+            weights = info.get("weights") or {}
+            return {k: int(v) for k, v in weights.items()} == (self.weights or {k: 1 for k, _ in self.keys})
+        if _normalize(info.get("key", [])) != _normalize(self.keys):
+            return False
+        return (
+            bool(info.get("unique")) == self.unique
+            and bool(info.get("sparse")) == self.sparse
+            and info.get("expireAfterSeconds") == self.expire_after_seconds
+        )
+
+    def same_keys(self, info: Dict[str, Any]) -> bool:
+        """True if an index covers the same keys (MongoDB allows only one such index)"""
+        if self.is_text:
+            return any(kind == "text" for _, kind in info.get("key", []))
+        return _normalize(info.get("key", [])) == _normalize(self.keys)
+
+
+INDEX_MANIFEST: Dict[str, List[IndexSpec]] = {
+    "jobs": [
+        IndexSpec("jobs_id", [("id", 1)], unique=True,
+                  purpose="find/update by id (details, admin edits, counter flush)"),
+        IndexSpec("slug_1", [("slug", 1)], unique=True, sparse=True,
+                  purpose="details page by slug; slug allocation retries on it"),
+        IndexSpec("jobs_listing",
+                  [("is_approved", 1), ("created_at", -1), ("is_archived", 1), ("is_deleted", 1)],
+                  purpose="public listings/search/sitemap: approved, newest first, archived last"),
+        IndexSpec("jobs_category_listing",
+                  [("is_approved", 1), ("categories", 1), ("created_at", -1), ("is_archived", 1), ("is_deleted", 1)],
+                  purpose="category pages and counts ($in merges the per-category scans)"),
+        IndexSpec("created_at_-1_is_archived_1", [("created_at", -1), ("is_archived", 1)],
+                  purpose="admin job list (all approval states), newest first"),
+        IndexSpec("jobs_employer", [("employer_id", 1), ("created_at", -1)],
+                  purpose="employer dashboard"),
+        IndexSpec("jobs_application_deadline",
+                  [("application_deadline", 1), ("is_archived", 1), ("is_deleted", 1)],
+                  purpose="archive sweep / deadline queue ($or branch 1, filters on index keys)"),
+        IndexSpec("jobs_expires_at",
+                  [("expires_at", 1), ("is_archived", 1), ("is_deleted", 1)],
+                  purpose="archive sweep / deadline queue ($or branch 2, filters on index keys)"),
+    ],
+    "blog_posts": [
+        IndexSpec("blog_posts_id", [("id", 1)], unique=True,
+                  purpose="find/update/delete by id"),
+        IndexSpec("slug_1", [("slug", 1)], unique=True, sparse=True,
+                  purpose="post page by slug; slug allocation retries on it"),
+        IndexSpec(BLOG_SEARCH_INDEX_NAME, [(f, "text") for f in BLOG_SEARCH_WEIGHTS],
+                  weights=BLOG_SEARCH_WEIGHTS, purpose="weighted blog search"),
+        IndexSpec("blog_posts_published", [("is_published", 1), ("published_at", -1)],
+                  purpose="public blog listing and sitemap"),
+        IndexSpec("blog_posts_created_at", [("created_at", -1)],
+                  purpose="admin blog list"),
+    ],
+    "users": [
+        IndexSpec("users_email", [("email", 1)], unique=True,
+                  purpose="login and token user lookup"),
+    ],
+    "user_profiles": [
+        IndexSpec("user_profiles_user_id", [("user_id", 1)],
+                  purpose="profile by user"),
+    ],
+    "job_seekers": [
+        IndexSpec("job_seekers_email", [("email", 1)],
+                  purpose="profile upsert by email"),
+        IndexSpec("job_seekers_created_at", [("created_at", -1)],
+                  purpose="admin job seeker list"),
+        IndexSpec("job_seekers_is_registered", [("is_registered", 1)],
+                  purpose="admin job seeker stats"),
+    ],
+    "applications": [
+        IndexSpec("applications_job_applicant", [("job_id", 1), ("applicant_id", 1)],
+                  purpose="duplicate application check, employer dashboard"),
+        IndexSpec("applications_applicant", [("applicant_id", 1)],
+                  purpose="job seeker dashboard"),
+    ],
+    "job_leads": [
+        IndexSpec("job_leads_email_job", [("email", 1), ("job_id", 1)],
+                  purpose="leads by email (dashboard, login merge, has_applied)"),
+        IndexSpec("job_leads_job", [("job_id", 1)],
+                  purpose="employer dashboard"),
+        IndexSpec("job_leads_created_at", [("created_at", -1)],
+                  purpose="admin lead list"),
+    ],
+    "saved_jobs": [
+        IndexSpec("saved_jobs_user", [("user_id", 1)],
+                  purpose="job seeker dashboard"),
+    ],
+    SAVED_SEARCHES_COLLECTION: [
+        IndexSpec("saved_searches_anchor", [("anchor", 1)],
+                  purpose="job alert percolator: candidate searches for a job's terms"),
+        IndexSpec("saved_searches_id", [("id", 1)], unique=True,
+                  purpose="delete a job alert"),
+        IndexSpec("saved_searches_user", [("user_id", 1), ("created_at", -1)],
+                  purpose="a job seeker's alerts"),
+    ],
+    OUTBOX_COLLECTION: [
+        IndexSpec("alert_outbox_ready", [("status", 1), ("window_end", 1)],
+                  purpose="close finished digests; mailer picks up ready ones"),
+        IndexSpec("alert_outbox_ttl", [("window_end", 1)], expire_after_seconds=OUTBOX_RETENTION_SECONDS,
+                  purpose="expire old digests"),
+    ],
+    "seo_settings": [
+        IndexSpec("seo_settings_page_type", [("page_type", 1)],
+                  purpose="SEO settings by page type"),
+    ],
+    RUNS_COLLECTION: [
+        IndexSpec("scheduler_runs_ttl", [("started_at", 1)], expire_after_seconds=RUN_HISTORY_SECONDS,
+                  purpose="expire old scheduler run history"),
+        IndexSpec("scheduler_runs_job", [("job", 1), ("started_at", -1)],
+                  purpose="recent runs per job"),
+    ],
+    AI_CACHE_COLLECTION: [
+        IndexSpec("ai_cache_ttl", [("created_at", 1)], expire_after_seconds=AI_CACHE_TTL_SECONDS,
+                  purpose="expire cached AI answers"),
+    ],
+    CHAT_MESSAGES_COLLECTION: [
+        IndexSpec("chat_messages_ttl", [("created_at", 1)], expire_after_seconds=CHAT_LOG_TTL_SECONDS,
+                  purpose="expire raw chat messages"),
+        IndexSpec("chat_messages_session", [("session_id", 1), ("created_at", 1)],
+                  purpose="admin: one conversation in order"),
+    ],
+    CHAT_SESSIONS_COLLECTION: [
+        IndexSpec("chat_sessions_ttl", [("last_message_at", 1)], expire_after_seconds=CHAT_SESSION_TTL_SECONDS,
+                  purpose="expire conversation rollups; admin: latest conversations"),
+        IndexSpec("chat_sessions_topic", [("topics", 1), ("last_message_at", -1)],
+                  purpose="admin: latest conversations about a topic"),
+    ],
+    JOB_SIGNATURES_COLLECTION: [
+        IndexSpec("job_minhash_indexed_at", [("indexed_at", 1)],
+                  purpose="duplicate index reload: signatures written since the last one"),
+    ],
+    EVENTS_COLLECTION: [
+        IndexSpec("events_ttl", [("created_at", 1)], expire_after_seconds=EVENT_RETENTION_SECONDS,
+                  purpose="expire old invalidation events"),
+    ],
+    WORKERS_COLLECTION: [
+        IndexSpec("metrics_workers_ttl", [("updated_at", 1)], expire_after_seconds=WORKER_TTL_SECONDS,
+                  purpose="expire snapshots of stopped workers; live-worker lookup in /metrics"),
+    ],
+}
+
+
+def _restore_args(name: str, info: Dict[str, Any]) -> Tuple[List[Tuple[str, Any]], Dict[str, Any]]:
+    """create_index arguments that rebuild an index from its index_information() entry"""
+    keys = list(info["key"])
+    if any(kind == "text" for _, kind in keys):
+        keys = [(field, "text") for field in info.get("weights", {})]
+    return keys, {**{k: v for k, v in info.items() if k not in ("key", "v", "ns")}, "name": name}
+
+
+async def find_duplicate_key(collection, spec: IndexSpec) -> Optional[Dict[str, Any]]:
+    """A key value held by more than one document (so a unique index on spec.keys can't be built), or None"""
+    fields = [field for field, _ in spec.keys]
+    pipeline: List[Dict[str, Any]] = []
+    if spec.sparse:
+        pipeline.append({"$match": {"$or": [{field: {"$exists": True}} for field in fields]}})
+    pipeline += [
+        {"$group": {"_id": {field.replace(".", "_"): f"${field}" for field in fields}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": 1},
+    ]
+    found = await collection.aggregate(pipeline, allowDiskUse=True).to_list(length=1)
+    return found[0] if found else None
+
+
+async def missing_indexes(db) -> List[str]:
+    """collection.index names from the manifest that are absent or defined differently"""
+    missing = []
+    for collection, specs in INDEX_MANIFEST.items():
+        existing = await db[collection].index_information()
+        for spec in specs:
+            if not (spec.name in existing and spec.matches(existing[spec.name])):
+                missing.append(f"{collection}.{spec.name}")
+    return missing
+
+
+async def ensure_indexes(
+    db,
+    prune: bool = False,
+    dry_run: bool = False,
+    log: Callable[[str], None] = print
+) -> Dict[str, List[str]]:
+    """
+    Make the database match INDEX_MANIFEST. Safe to run repeatedly: indexes
+    that already match are left alone, ones with the same name or keys but a
+    different definition are replaced. With prune, indexes that are not in
+    the manifest are dropped. A failing index (e.g. duplicate values under a
+    new unique index) is reported and the rest are still applied.
+
+    MongoDB keeps one index per key pattern (and name), so a replacement
+    can't be built next to the index it replaces. Instead, nothing is
+    dropped for a unique replacement until the data is checked for
+    duplicate keys, and if the new index still fails to build, the dropped
+    ones are recreated from their old definitions.
+    """
+    report: Dict[str, List[str]] = {"created": [], "replaced": [], "dropped": [], "unchanged": [], "errors": []}
+
+    for collection_name, specs in INDEX_MANIFEST.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+
+        for spec in specs:
+            label = f"{collection_name}.{spec.name}"
+            if spec.name in existing and spec.matches(existing[spec.name]):
+                report["unchanged"].append(label)
+                continue
+
+            # Same name with another definition, or same keys under another name
+            conflicts = [
+                name for name, info in existing.items()
+                if name != "_id_" and (name == spec.name or spec.same_keys(info))
+            ]
+            action = "replaced" if conflicts else "created"
+            log(f"{'🔍' if dry_run else '🔧'} {label}: {action}"
+                f"{' (drops ' + ', '.join(conflicts) + ')' if conflicts else ''} - {spec.purpose}")
+            if dry_run:
+                report[action].append(label)
+                continue
+
+            dropped: Dict[str, Dict[str, Any]] = {}
+            try:
+                if conflicts and spec.unique:
+                    duplicate = await find_duplicate_key(collection, spec)
+                    if duplicate is not None:
+                        raise ValueError(f"not replacing {', '.join(conflicts)}: {duplicate['count']} documents "
+                                         f"share the key {duplicate['_id']}")
+                for name in conflicts:
+                    await collection.drop_index(name)
+                    dropped[name] = existing.pop(name)
+                await collection.create_index(spec.keys, **spec.options())
+                existing[spec.name] = {"key": spec.keys}
+                report[action].append(label)
+            except Exception as e:
+                log(f"❌ {label}: {e}")
+                report["errors"].append(f"{label}: {e}")
+                for name, info in dropped.items():
+                    try:
+                        keys, options = _restore_args(name, info)
+                        await collection.create_index(keys, **options)
+                        existing[name] = info
+                        log(f"↩️  {collection_name}.{name}: restored")
+                    except Exception as restore_error:
+                        log(f"❌ {collection_name}.{name}: could not be restored: {restore_error}")
+                        report["errors"].append(f"{collection_name}.{name}: not restored: {restore_error}")
+
+        if prune:
+            wanted = {spec.name for spec in specs}
+            for name in list(existing):
+                if name == "_id_" or name in wanted:
+                    continue
+                label = f"{collection_name}.{name}"
+                log(f"{'🔍' if dry_run else '🗑️ '} {label}: dropped (not in manifest)")
+                if not dry_run:
+                    try:
+                        await collection.drop_index(name)
+                    except Exception as e:
+                        log(f"❌ {label}: {e}")
+                        report["errors"].append(f"{label}: {e}")
+                        continue
+                report["dropped"].append(label)
+
+    log(f"✅ Indexes: {len(report['created'])} created, {len(report['replaced'])} replaced, "
+        f"{len(report['dropped'])} dropped, {len(report['unchanged'])} unchanged, {len(report['errors'])} errors"
+        f"{' (dry run)' if dry_run else ''}")
+    return report
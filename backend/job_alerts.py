@@ -0,0 +1,252 @@
+"""
+Job alerts: saved searches matched against new jobs (a percolator).
+Instead of running every saved search against the jobs collection, each
+saved search is indexed under one "anchor": its two most selective required
+terms (keyword, location word, category, job type), or its only one. A new
+or approved job produces its terms and every pair of them; candidates are
+the searches anchored on one of those (one indexed $in query per batch of
+jobs), and only those are checked in full. Anchoring on pairs keeps the
+candidate lists short even when a million searches share a few popular
+keywords. Matches are collected into one digest per user per DIGEST_WINDOW in
+the `alert_outbox` collection, where a mailer picks up the ready ones.
+
+Matching rules for a saved search (all given conditions must hold):
+    keywords   every word appears in the job title, company or categories
+    location   every word appears in the job location
+    category   the job is listed on that category page
+    job_type   equal
+    salary_min the job's highest numeric salary is at least this (jobs
+               without a numeric salary, e.g. "Negotiable", still match)
+"""
+import re
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from pymongo import UpdateOne
+
+from categories import job_category_slugs
+
+SAVED_SEARCHES_COLLECTION = "saved_searches"
+QUEUE_COLLECTION = "job_alert_queue"
+OUTBOX_COLLECTION = "alert_outbox"
+
+MAX_SEARCHES_PER_USER = 20
+# Matches for a user are collected into one digest per window
+DIGEST_WINDOW = timedelta(hours=1)
+OUTBOX_RETENTION_SECONDS = 30 * 24 * 60 * 60
+# Jobs percolated per candidate query
+BATCH_SIZE = 200
+
+# Anchor for searches with no required term (only a salary floor)
+ANY = "*"
+# Joins the two terms of a pair anchor
+PAIR = "&"
+
+_WORD = re.compile(r"[a-z0-9]+")
+_NUMBER = re.compile(r"\d[\d,]*")
+
+SEARCH_PROJECTION = {"_id": 0, "id": 1, "user_id": 1, "email": 1, "keywords": 1, "location": 1,
+                     "category": 1, "job_type": 1, "salary_min": 1}
+JOB_PROJECTION = {"_id": 0, "id": 1, "slug": 1, "title": 1, "company": 1, "location": 1, "categories": 1,
+                  "job_type": 1, "salary_min": 1, "salary_max": 1, "is_approved": 1, "is_deleted": 1}
+
+
+def words(text: Optional[str]) -> List[str]:
+    return _WORD.findall((text or "").lower())
+
+
+def _salary_value(value: Any) -> Optional[int]:
+    """Numeric part of a salary field ("30000", "₹3,00,000", 45000); None for text like "Negotiable" """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    match = _NUMBER.search(str(value or ""))
+    return int(match.group().replace(",", "")) if match else None
+
+
+def normalize_search(keywords: Optional[str] = None, location: Optional[str] = None, category: Optional[str] = None,
+                     job_type: Optional[str] = None, salary_min: Optional[int] = None) -> Dict[str, Any]:
+    """Stored form of a saved search, with its anchor term"""
+    search = {
+        "keywords": sorted(set(words(keywords))),
+        "location": sorted(set(words(location))),
+        "category": category or None,
+        "job_type": job_type or None,
+        "salary_min": salary_min or None,
+    }
+    # Most selective terms first (longer words are rarer); a keyword paired with a location word
+    # narrows more than two words of the same job title
+    keywords = [f"kw:{word}" for word in sorted(search["keywords"], key=lambda word: (-len(word), word))]
+    location = [f"loc:{word}" for word in sorted(search["location"], key=lambda word: (-len(word), word))]
+    ranked = keywords[:1] + location[:1] + keywords[1:] + location[1:]
+    if search["category"]:
+        ranked.append(f"cat:{search['category']}")
+    if search["job_type"]:
+        ranked.append(f"type:{search['job_type']}")
+    search["anchor"] = PAIR.join(sorted(ranked[:2])) if ranked else ANY
+    return search
+
+
+class JobTerms:
+    """A job's matchable terms, computed once per job"""
+    __slots__ = ("job", "keywords", "location", "categories", "job_type", "salary", "terms")
+
+    def __init__(self, job: Dict[str, Any]):
+        self.job = job
+        self.keywords = set(words(job.get("title"))) | set(words(job.get("company")))
+        for category in job.get("categories") or []:
+            self.keywords.update(words(category))
+        self.location = set(words(job.get("location")))
+        self.categories = job_category_slugs(job.get("title"), job.get("categories"))
+        self.job_type = job.get("job_type")
+        salaries = [_salary_value(job.get(field)) for field in ("salary_min", "salary_max")]
+        salaries = [value for value in salaries if value is not None]
+        self.salary = max(salaries) if salaries else None
+        single = {f"type:{self.job_type}"}
+        single.update(f"kw:{word}" for word in self.keywords)
+        single.update(f"loc:{word}" for word in self.location)
+        single.update(f"cat:{slug}" for slug in self.categories)
+        # Every anchor this job can satisfy: each term, each pair of terms, and ANY
+        self.terms: Set[str] = single | {PAIR.join(pair) for pair in combinations(sorted(single), 2)}
+        self.terms.add(ANY)
+
+    def matches(self, search: Dict[str, Any]) -> bool:
+        if search.get("job_type") and search["job_type"] != self.job_type:
+            return False
+        if search.get("category") and search["category"] not in self.categories:
+            return False
+        if not self.keywords.issuperset(search.get("keywords") or ()):
+            return False
+        if not self.location.issuperset(search.get("location") or ()):
+            return False
+        floor = search.get("salary_min")
+        return not (floor and self.salary is not None and self.salary < floor)
+
+
+async def save_search(db, user_id: str, email: str, **criteria) -> Dict[str, Any]:
+    search = normalize_search(**criteria)
+    if search["anchor"] == ANY and not search["salary_min"]:
+        raise ValueError("A job alert needs at least one condition")
+    if await db[SAVED_SEARCHES_COLLECTION].count_documents({"user_id": user_id}) >= MAX_SEARCHES_PER_USER:
+        raise ValueError(f"At most {MAX_SEARCHES_PER_USER} job alerts per user")
+    doc = {"id": str(uuid.uuid4()), "user_id": user_id, "email": email, **search,
+           "query": {key: value for key, value in criteria.items() if value},
+           "created_at": datetime.now(timezone.utc)}
+    await db[SAVED_SEARCHES_COLLECTION].insert_one(doc)
+    doc.pop("_id", None)
+    return doc
+
+
+async def enqueue_job(db, job_id: str):
+    """Queue a newly visible job for alert matching (idempotent)"""
+    await db[QUEUE_COLLECTION].update_one(
+        {"_id": job_id},
+        {"$setOnInsert": {"queued_at": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+
+
+async def match_jobs(db, jobs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Percolate a batch of jobs: {user_id: {"email", "job_ids", "search_ids"}}.
+    One candidate query for the whole batch, then a full check per job.
+    """
+    terms = [JobTerms(job) for job in jobs]
+    anchors = set().union(*(t.terms for t in terms)) if terms else set()
+    if not anchors:
+        return {}
+
+    candidates: Dict[str, List[Dict[str, Any]]] = {}
+    cursor = db[SAVED_SEARCHES_COLLECTION].find({"anchor": {"$in": sorted(anchors)}},
+                                                {**SEARCH_PROJECTION, "anchor": 1})
+    async for search in cursor:
+        candidates.setdefault(search["anchor"], []).append(search)
+
+    matches: Dict[str, Dict[str, Any]] = {}
+    for job_terms in terms:
+        job_id = job_terms.job["id"]
+        for term in job_terms.terms:
+            for search in candidates.get(term, ()):
+                if job_terms.matches(search):
+                    match = matches.setdefault(search["user_id"], {
+                        "email": search.get("email"), "job_ids": [], "search_ids": set()
+                    })
+                    if job_id not in match["job_ids"]:
+                        match["job_ids"].append(job_id)
+                    match["search_ids"].add(search["id"])
+    return matches
+
+
+def digest_window(now: datetime):
+    window = int(DIGEST_WINDOW.total_seconds())
+    start = datetime.fromtimestamp(int(now.timestamp()) // window * window, tz=timezone.utc)
+    return start, start + DIGEST_WINDOW
+
+
+async def write_digests(db, matches: Dict[str, Dict[str, Any]], now: Optional[datetime] = None) -> int:
+    """Add matches to each user's digest for the current window (one bulk write)"""
+    if not matches:
+        return 0
+    now = now or datetime.now(timezone.utc)
+    start, end = digest_window(now)
+    requests = [
+        UpdateOne(
+            # One digest per user and window; the id makes concurrent upserts converge
+            {"_id": f"{user_id}:{start.strftime('%Y%m%dT%H%M')}"},
+            {
+                "$addToSet": {"job_ids": {"$each": match["job_ids"]},
+                              "search_ids": {"$each": sorted(match["search_ids"])}},
+                "$set": {"updated_at": now},
+                "$setOnInsert": {"user_id": user_id, "email": match["email"], "status": "pending",
+                                 "window_start": start, "window_end": end},
+            },
+            upsert=True
+        )
+        for user_id, match in matches.items()
+    ]
+    await db[OUTBOX_COLLECTION].bulk_write(requests, ordered=False)
+    return len(requests)
+
+
+async def process_alert_queue(db, batch_size: int = BATCH_SIZE) -> Dict[str, Any]:
+    """Match queued jobs against saved searches and write digests"""
+    processed = notified = 0
+    match_seconds = 0.0
+    while True:
+        queued = await db[QUEUE_COLLECTION].find({}, {"_id": 1}).limit(batch_size).to_list(length=batch_size)
+        if not queued:
+            break
+        job_ids = [item["_id"] for item in queued]
+        jobs = await db.jobs.find(
+            {"id": {"$in": job_ids}, "is_approved": True, "is_deleted": {"$ne": True}}, JOB_PROJECTION
+        ).to_list(length=None)
+
+        started = time.perf_counter()
+        matches = await match_jobs(db, jobs)
+        match_seconds += time.perf_counter() - started
+
+        notified += await write_digests(db, matches)
+        await db[QUEUE_COLLECTION].delete_many({"_id": {"$in": job_ids}})
+        processed += len(job_ids)
+    result = {"jobs": processed, "digests_updated": notified}
+    if processed:
+        result["match_ms_per_job"] = round(match_seconds * 1000 / processed, 2)
+    return result
+
+
+async def close_digests(db, now: Optional[datetime] = None) -> int:
+    """Mark digests whose window has ended as ready for the mailer"""
+    now = now or datetime.now(timezone.utc)
+    result = await db[OUTBOX_COLLECTION].update_many(
+        {"status": "pending", "window_end": {"$lte": now}},
+        {"$set": {"status": "ready", "ready_at": now}}
+    )
+    return result.modified_count
+
+
+def brute_force_matches(job: Dict[str, Any], searches: Iterable[Dict[str, Any]]) -> Set[str]:
+    """Ids of the searches matching a job, checking every search (for tests)"""
+    job_terms = JobTerms(job)
+    return {search["id"] for search in searches if job_terms.matches(search)}
@@ -0,0 +1,175 @@
+"""
+Job cards: the compact form of a job that list pages render.
+The parts derived from heavy fields (a plain-text snippet of the HTML
+description, the salary display string, the first few requirements) are
+stored on each job as `card` and rebuilt whenever those fields are written,
+so listing queries never read descriptions.
+
+Also sparse fieldsets (`?fields=title,company,salary`): the requested names
+become a find() projection, with the card-derived ones read from `card`.
+"""
+import html
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+SNIPPET_CHARS = 200
+CARD_REQUIREMENTS = 4
+
+# Fields the stored card is derived from; writes touching any of them rebuild it
+CARD_SOURCE_FIELDS = ("description", "requirements", "salary_min", "salary_max", "currency")
+
+# Card-derived fields that can be requested with ?fields=
+CARD_FIELDS = ("snippet", "salary", "requirements_count")
+
+# Most ids/slugs /jobs/batch resolves in one request
+MAX_BATCH_IDS = 200
+
+# What listing queries read: the card plus the small top-level fields
+CARD_PROJECTION = {
+    "_id": 0, "id": 1, "slug": 1, "title": 1, "company": 1, "location": 1, "job_type": 1,
+    "categories": 1, "created_at": 1, "is_archived": 1, "card": 1
+}
+
+_TAG = re.compile(r"<[^>]+>")
+_SPACE = re.compile(r"\s+")
+
+
+def plain_text(value: Optional[str]) -> str:
+    """HTML description as one line of text"""
+    return _SPACE.sub(" ", html.unescape(_TAG.sub(" ", value or ""))).strip()
+
+
+def snippet(value: Optional[str], limit: int = SNIPPET_CHARS) -> str:
+    """First `limit` characters of the plain text, cut at a word boundary"""
+    text = plain_text(value)
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0] or text[:limit]
+    return f"{cut.rstrip(',.;:')}…"
+
+
+def _salary_part(value: Any, currency: str) -> str:
+    value = str(value).strip() if value is not None else ""
+    # Figures get a currency symbol; text such as "Negotiable" is shown as-is
+    if value and any(c.isdigit() for c in value):
+        return f"{'$' if currency == 'USD' else '₹'}{value}"
+    return value
+
+
+def salary_display(salary_min: Any, salary_max: Any, currency: str = "INR") -> Optional[str]:
+    """Display string such as `₹30000 - ₹50000` or `Negotiable` (the format list pages used to build)"""
+    low, high = _salary_part(salary_min, currency), _salary_part(salary_max, currency)
+    if not low:
+        return None
+    return f"{low} - {high}" if high else low
+
+
+def build_card(job: Dict[str, Any]) -> Dict[str, Any]:
+    """The stored `card` sub-document for a job"""
+    requirements: List[str] = job.get("requirements") or []
+    return {
+        "snippet": snippet(job.get("description")),
+        "salary": salary_display(job.get("salary_min"), job.get("salary_max"), job.get("currency") or "INR"),
+        "requirements": requirements[:CARD_REQUIREMENTS],
+        "requirements_count": len(requirements),
+    }
+
+
+def to_card(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a job read with CARD_PROJECTION into the JobCard shape"""
+    card = job.pop("card", None) or build_card(job)
+    for field in CARD_SOURCE_FIELDS:
+        job.pop(field, None)
+    return {**job, **card}
+
+
+async def _fill_missing_cards(collection, jobs: List[Dict[str, Any]]):
+    """Build cards for jobs written before cards existed (until migration 0008 has run)"""
+    missing = [job["id"] for job in jobs if "card" not in job and job.get("id")]
+    if not missing:
+        return
+    # One extra query for the page's old jobs
+    source = {field: 1 for field in CARD_SOURCE_FIELDS}
+    cursor = collection.find({"id": {"$in": missing}}, {"_id": 0, "id": 1, **source})
+    built = {job["id"]: build_card(job) async for job in cursor}
+    for job in jobs:
+        if job.get("id") in built:
+            job["card"] = built[job["id"]]
+
+
+async def find_cards(collection, query: Dict[str, Any], sort, skip: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+    """One page of job cards"""
+    jobs = await collection.find(query, CARD_PROJECTION).sort(sort).skip(skip).limit(limit).to_list(length=None)
+    await _fill_missing_cards(collection, jobs)
+    return [to_card(job) for job in jobs]
+
+
+async def find_cards_by_ids(collection, ids: List[str], query: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Cards for `ids` in that order, in one $in query; ids no longer matching `query` are skipped"""
+    if not ids:
+        return []
+    jobs = await collection.find({"id": {"$in": ids}, **query}, CARD_PROJECTION).to_list(length=None)
+    by_id = {job["id"]: job for job in jobs}
+    jobs = [by_id[job_id] for job_id in ids if job_id in by_id][:limit]
+    await _fill_missing_cards(collection, jobs)
+    return [to_card(job) for job in jobs]
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """`title,company` as ["id", "title", "company"]; None if not given, ValueError for unknown names"""
+    if not fields:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    allowed = set(allowed)
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return ["id"] + [name for name in names if name != "id"]
+
+
+def fields_projection(fields: List[str]) -> Dict[str, Any]:
+    projection = {"_id": 0}
+    for name in fields:
+        projection[f"card.{name}" if name in CARD_FIELDS else name] = 1
+    return projection
+
+
+async def _select_fields(collection, jobs: List[Dict[str, Any]], fields: List[str]) -> List[Dict[str, Any]]:
+    if any(name in CARD_FIELDS for name in fields):
+        await _fill_missing_cards(collection, jobs)
+    selected = []
+    for job in jobs:
+        card = job.get("card") or {}
+        selected.append({name: card.get(name) if name in CARD_FIELDS else job.get(name) for name in fields})
+    return selected
+
+
+async def find_job_fields(collection, query: Dict[str, Any], sort, skip: int, limit: int,
+                          fields: List[str]) -> List[Dict[str, Any]]:
+    """One page of jobs with only the requested fields"""
+    jobs = await collection.find(query, fields_projection(fields)).sort(sort).skip(skip).limit(limit).to_list(length=None)
+    return await _select_fields(collection, jobs, fields)
+
+
+async def find_jobs_by_keys(collection, keys: List[str], fields: Optional[List[str]] = None):
+    """
+    Jobs for a list of ids or slugs in one $in query, in the order asked for.
+    Returns (jobs, keys not found); jobs are cards unless fields are given.
+    """
+    query = {"$or": [{"id": {"$in": keys}}, {"slug": {"$in": keys}}], "is_deleted": {"$ne": True}}
+    projection = fields_projection(fields + ["slug"]) if fields else CARD_PROJECTION
+    jobs = await collection.find(query, projection).to_list(length=None)
+
+    by_key = {}
+    for job in jobs:
+        by_key[job.get("slug")] = job
+        by_key[job["id"]] = job
+    found = [by_key[key] for key in keys if key in by_key]
+    missing = [key for key in keys if key not in by_key]
+
+    # The same job asked for by id and by slug is returned once
+    found = list({id(job): job for job in found}.values())
+    if fields:
+        return await _select_fields(collection, found, fields), missing
+    await _fill_missing_cards(collection, found)
+    return [to_card(dict(job)) for job in found], missing
@@ -0,0 +1,255 @@
+"""
+Near-duplicate job detection (MinHash + LSH).
+Scraped jobs are often posted several times with small differences
+("Staff Nurse – Apollo – Chennai" from three sources). Each job's
+title, company, location and description are split into word 3-grams
+(shingles), and the shingles are reduced to a 128-value MinHash signature;
+the share of equal values estimates the Jaccard similarity of two jobs.
+The signature is cut into 32 bands of 4 values: jobs sharing any band are
+candidates, which finds pairs above ~0.6 similarity almost always while
+comparing a new job with a handful of others instead of all of them.
+
+Signatures are persisted in `job_minhash` (one document per job) and held
+in memory by every worker; reload() picks up what other workers indexed.
+A new job is checked against memory only (well under a millisecond), then
+the best candidate still live (approved, not deleted or archived) is read
+to confirm it. What happens next is
+the posting policy: warn (post it, flagged with duplicate_of), merge
+(admins: don't post, return the existing job) or allow.
+scan_duplicates() is the batch mode for jobs posted before the index.
+"""
+import hashlib
+import re
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from pymongo import UpdateOne
+
+from job_cards import plain_text
+from job_vectors import ACTIVE_JOBS
+
+SIGNATURES_COLLECTION = "job_minhash"
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+# Estimated Jaccard similarity from which two jobs count as duplicates
+DUPLICATE_THRESHOLD = 0.7
+
+DUPLICATE_POLICIES = ("warn", "merge", "allow")
+
+# reload() re-reads this much before its last run (writes from other workers still in flight)
+RELOAD_OVERLAP = timedelta(minutes=1)
+TEXT_PROJECTION = {"_id": 0, "id": 1, "title": 1, "company": 1, "location": 1, "description": 1}
+BATCH = 1000
+
+_WORD = re.compile(r"[a-z0-9]+")
+_PRIME = (1 << 61) - 1
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def _coefficients(name: str) -> np.ndarray:
+    """Fixed hash permutation parameters (from sha256, so stored signatures stay valid across versions)"""
+    return np.array([
+        int.from_bytes(hashlib.sha256(f"{name}{i}".encode()).digest()[:8], "big") % (_PRIME - 1) + 1
+        for i in range(NUM_PERM)
+    ], dtype=np.uint64)
+
+
+_A = _coefficients("a")
+_B = _coefficients("b")
+
+
+def shingles(job: Dict[str, Any]) -> Set[str]:
+    text = " ".join([job.get("title") or "", job.get("company") or "", job.get("location") or "",
+                     plain_text(job.get("description"))])
+    words = _WORD.findall(text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash(job: Dict[str, Any]) -> np.ndarray:
+    hashes = np.fromiter((zlib.crc32(shingle.encode()) for shingle in shingles(job)), dtype=np.uint64)
+    if not len(hashes):
+        return np.full(NUM_PERM, 0xFFFFFFFF, dtype=np.uint32)
+    # (a * x + b) mod p per permutation; uint64 overflow wraps the same way everywhere
+    values = (np.outer(_A, hashes) + _B[:, None]) % np.uint64(_PRIME) & _MAX_HASH
+    return values.min(axis=1).astype(np.uint32)
+
+
+def band_keys(signature: np.ndarray) -> List[int]:
+    """One bucket key per band (band number in the high bits)"""
+    return [(band << 32) | zlib.crc32(signature[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the two jobs' shingles"""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+class DedupIndex:
+    def __init__(self):
+        self._buckets: Dict[int, Set[str]] = defaultdict(set)
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._loaded_until: Optional[datetime] = None
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, job_id: str):
+        return job_id in self._signatures
+
+    def add(self, job_id: str, signature: np.ndarray):
+        self.remove(job_id)
+        self._signatures[job_id] = signature
+        for key in band_keys(signature):
+            self._buckets[key].add(job_id)
+
+    def remove(self, job_id: str):
+        signature = self._signatures.pop(job_id, None)
+        if signature is None:
+            return
+        for key in band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(job_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def candidates(self, signature: np.ndarray, exclude: Optional[str] = None,
+                   threshold: float = DUPLICATE_THRESHOLD) -> List[Tuple[str, float]]:
+        """Indexed jobs at least `threshold` similar, most similar first (memory only)"""
+        seen: Set[str] = set()
+        for key in band_keys(signature):
+            seen.update(self._buckets.get(key, ()))
+        seen.discard(exclude)
+        found = [(job_id, similarity(signature, self._signatures[job_id])) for job_id in seen]
+        return sorted((match for match in found if match[1] >= threshold), key=lambda match: -match[1])
+
+    async def index_job(self, db, job: Dict[str, Any]) -> np.ndarray:
+        """(Re)index a posted or edited job here and in `job_minhash`"""
+        signature = minhash(job)
+        self.add(job["id"], signature)
+        await db[SIGNATURES_COLLECTION].update_one(
+            {"_id": job["id"]},
+            {"$set": {"minhash": signature.tobytes(), "bands": band_keys(signature),
+                      "indexed_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        return signature
+
+    async def reload(self, db) -> Dict[str, int]:
+        """Load signatures indexed since the last reload (all of them the first time)"""
+        started = datetime.now(timezone.utc)
+        query = {"indexed_at": {"$gte": self._loaded_until - RELOAD_OVERLAP}} if self._loaded_until else {}
+        loaded = 0
+        async for doc in db[SIGNATURES_COLLECTION].find(query, {"minhash": 1}):
+            self.add(doc["_id"], np.frombuffer(doc["minhash"], dtype=np.uint32))
+            loaded += 1
+        self._loaded_until = started
+        return {"loaded": loaded, "jobs": len(self)}
+
+    def pairs(self, job_ids: Set[str], threshold: float = DUPLICATE_THRESHOLD) -> Iterable[Tuple[str, str]]:
+        """Pairs of `job_ids` sharing a band and at least `threshold` similar"""
+        checked: Set[Tuple[str, str]] = set()
+        for bucket in self._buckets.values():
+            members = sorted(job_id for job_id in bucket if job_id in job_ids)
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    if (a, b) not in checked:
+                        checked.add((a, b))
+                        if similarity(self._signatures[a], self._signatures[b]) >= threshold:
+                            yield a, b
+
+
+job_dedup = DedupIndex()
+
+
+async def find_duplicate(db, job: Dict[str, Any], index: DedupIndex = job_dedup) -> Optional[Dict[str, Any]]:
+    """The most similar live job already posted, or None"""
+    found = index.candidates(minhash(job), exclude=job.get("id"))
+    if not found:
+        return None
+    ids = [job_id for job_id, _ in found]
+    # Archived and expired jobs are not live: re-posting one posts it again
+    live = await db.jobs.find({"id": {"$in": ids}, **ACTIVE_JOBS}, {"_id": 0}).to_list(length=None)
+    by_id = {existing["id"]: existing for existing in live}
+    for job_id, score in found:
+        if job_id in by_id:
+            return {**by_id[job_id], "similarity": score}
+    return None
+
+
+async def index_missing(db, index: DedupIndex = job_dedup) -> Dict[str, int]:
+    """Index jobs that have no signature yet (posted before the index existed)"""
+    await index.reload(db)
+    missing = [job["id"] async for job in db.jobs.find({"is_deleted": {"$ne": True}}, {"_id": 0, "id": 1})
+               if job["id"] not in index]
+    now = datetime.now(timezone.utc)
+    for start in range(0, len(missing), BATCH):
+        requests = []
+        async for job in db.jobs.find({"id": {"$in": missing[start:start + BATCH]}}, TEXT_PROJECTION):
+            signature = minhash(job)
+            index.add(job["id"], signature)
+            requests.append(UpdateOne(
+                {"_id": job["id"]},
+                {"$set": {"minhash": signature.tobytes(), "bands": band_keys(signature), "indexed_at": now}},
+                upsert=True
+            ))
+        if requests:
+            await db[SIGNATURES_COLLECTION].bulk_write(requests, ordered=False)
+    return {"indexed": len(missing), "jobs": len(index)}
+
+
+async def scan_duplicates(db, apply: bool = False, index: DedupIndex = job_dedup) -> Dict[str, Any]:
+    """
+    Batch mode: group the live jobs into clusters of near-duplicates. The
+    oldest job of a cluster is kept; with apply=True the others are soft
+    deleted with duplicate_of set (restorable from the admin panel).
+    """
+    indexed = await index_missing(db, index)
+    created = {job["id"]: str(job.get("created_at") or "")
+               async for job in db.jobs.find({"is_deleted": {"$ne": True}}, {"_id": 0, "id": 1, "created_at": 1})}
+
+    # Union-find over the duplicate pairs
+    parent: Dict[str, str] = {}
+
+    def root(job_id: str) -> str:
+        while parent[job_id] != job_id:
+            parent[job_id] = parent[parent[job_id]]
+            job_id = parent[job_id]
+        return job_id
+
+    for a, b in index.pairs(set(created)):
+        parent.setdefault(a, a)
+        parent.setdefault(b, b)
+        parent[root(a)] = root(b)
+
+    clusters: Dict[str, List[str]] = defaultdict(list)
+    for job_id in list(parent):
+        clusters[root(job_id)].append(job_id)
+    clusters = {key: sorted(members, key=lambda job_id: (created[job_id], job_id))
+                for key, members in clusters.items() if len(members) > 1}
+
+    duplicates = 0
+    now = datetime.now(timezone.utc).isoformat()
+    for members in clusters.values():
+        keep, copies = members[0], members[1:]
+        duplicates += len(copies)
+        if apply:
+            await db.jobs.update_many(
+                {"id": {"$in": copies}},
+                {"$set": {"is_deleted": True, "deleted_at": now, "duplicate_of": keep}}
+            )
+    return {
+        **indexed,
+        "clusters": len(clusters),
+        "duplicates": duplicates,
+        "applied": apply,
+        "examples": [{"keep": members[0], "duplicates": members[1:]} for members in list(clusters.values())[:20]],
+    }
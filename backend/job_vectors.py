@@ -0,0 +1,342 @@
+"""
+Job vectors: local retrieval that picks the jobs /ai/match-jobs shows the LLM.
+Every active job is a hashed TF-IDF vector: the words of its title,
+company, categories, location, description and requirements (weighted per
+field) are hashed into `dim` signed buckets. The vectors are rows of a
+float32 .npy file that every worker on a host memory-maps. A candidate
+profile is hashed the same way and scored against all rows with one
+matrix-vector product (cosine on IDF-weighted vectors), so the top 10 of
+tens of thousands of jobs take about a millisecond, with no external
+service.
+
+sync() updates the file incrementally: one scan of the active jobs'
+(id, updated_at/created_at) finds new, edited and removed jobs, and only
+those are read and hashed. Rows referenced by the published metadata are
+never overwritten; changed jobs go to free rows and the metadata (row to
+job id, document frequencies) is replaced atomically, so readers see the
+old index or the new one. One worker per host writes (file lock); the
+others reload when the metadata file changes. Every worker syncs, so the
+hashing and file work run in a thread; only the MongoDB reads stay on the
+loop. search(), signatures() and neighbors() load the index on first use
+after a change, so async callers run them in a thread too.
+"""
+import asyncio
+import fcntl
+import json
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from job_cards import plain_text
+
+DIM = 1024
+
+# How much a word counts in each field
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "categories": 2.0,
+    "company": 1.0,
+    "location": 1.0,
+    "description": 1.0,
+    "requirements": 1.0,
+}
+
+ACTIVE_JOBS = {"is_approved": True, "is_deleted": {"$ne": True}, "is_archived": {"$ne": True}}
+SIGNATURE_PROJECTION = {"_id": 0, "id": 1, "updated_at": 1, "created_at": 1}
+TEXT_PROJECTION = {"_id": 0, "id": 1, "updated_at": 1, "created_at": 1,
+                   **{field: 1 for field in FIELD_WEIGHTS}}
+
+META_FILE = "meta.json"
+LOCK_FILE = "sync.lock"
+# Jobs read per $in query while syncing
+READ_BATCH = 1000
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our the to we with will you your this "
+    "that who all can job jobs role work".split()
+)
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokens(text: Optional[str]) -> List[str]:
+    return [word for word in _WORD.findall((text or "").lower()) if len(word) > 1 and word not in STOPWORDS]
+
+
+@lru_cache(maxsize=200_000)
+def _bucket(token: str, dim: int) -> Tuple[int, float]:
+    """Stable bucket and sign of a word (crc32, so every process agrees)"""
+    value = zlib.crc32(token.encode())
+    return value % dim, (1.0 if value & 0x80000000 else -1.0)
+
+
+def job_fields(job: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        "title": job.get("title") or "",
+        "categories": " ".join(job.get("categories") or []),
+        "company": job.get("company") or "",
+        "location": job.get("location") or "",
+        "description": plain_text(job.get("description")),
+        "requirements": " ".join(job.get("requirements") or []),
+    }
+
+
+def term_weights(fields: Dict[str, str]) -> Dict[str, float]:
+    """Word -> sublinear field-weighted term frequency"""
+    counts: Counter = Counter()
+    for field, text in fields.items():
+        weight = FIELD_WEIGHTS.get(field, 1.0)
+        for word in tokens(text):
+            counts[word] += weight
+    return {word: 1 + math.log(count) if count >= 1 else count for word, count in counts.items()}
+
+
+def hash_vector(weights: Dict[str, float], dim: int = DIM) -> np.ndarray:
+    vector = np.zeros(dim, dtype=np.float32)
+    for word, weight in weights.items():
+        bucket, sign = _bucket(word, dim)
+        vector[bucket] += sign * weight
+    return vector
+
+
+def job_signature(job: Dict[str, Any]) -> str:
+    """Changes whenever the job is edited (updated_at) or recreated"""
+    return str(job.get("updated_at") or job.get("created_at") or "")
+
+
+def _idf(df: np.ndarray, docs: int) -> np.ndarray:
+    return (np.log((1 + docs) / (1 + df)) + 1).astype(np.float32)
+
+
+class JobVectorIndex:
+    def __init__(self, directory, dim: int = DIM):
+        self.directory = Path(directory)
+        self.dim = dim
+        self._meta_mtime: Optional[int] = None
+        self._ids: List[Optional[str]] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._idf2: Optional[np.ndarray] = None
+        self._idf: Optional[np.ndarray] = None
+        self._norms: Optional[np.ndarray] = None
+        self._row_of: Dict[str, int] = {}
+        self._signatures: Dict[str, str] = {}
+        # Readers in threads reload the mapped index; hold this to reload or to read it consistently
+        self._lock = threading.Lock()
+
+    # Reading (every worker)
+
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.directory / META_FILE) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self) -> bool:
+        """Map the current published index; False if there is none (hold _lock)"""
+        try:
+            mtime = (self.directory / META_FILE).stat().st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._meta_mtime:
+            return self._matrix is not None
+        meta = self._read_meta()
+        if not meta or meta["dim"] != self.dim:
+            return False
+        matrix = np.load(self.directory / meta["file"], mmap_mode="r")
+        idf = _idf(np.asarray(meta["df"], dtype=np.float32), meta["docs"])
+        ids = meta["ids"]
+        norms = np.zeros(len(ids), dtype=np.float32)
+        live = np.array([job_id is not None for job_id in ids], dtype=bool)
+        # Norms of the IDF-weighted rows, in chunks so no full weighted copy is made
+        for start in range(0, len(ids), 4096):
+            block = matrix[start:start + 4096] * idf
+            norms[start:start + 4096] = np.sqrt(np.einsum("ij,ij->i", block, block))
+        norms[~live] = np.inf
+        norms[norms == 0] = np.inf
+        self._ids, self._matrix, self._idf, self._idf2, self._norms = ids, matrix, idf, idf * idf, norms
+        self._row_of = {job_id: row for row, job_id in enumerate(ids) if job_id is not None}
+        self._signatures = meta["signatures"]
+        self._meta_mtime = mtime
+        return True
+
+    def search(self, text: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-k (job id, cosine similarity) for a free-text profile; [] if the index is not built"""
+        with self._lock:
+            if not self._refresh():
+                return []
+            ids, matrix, idf, idf2, norms = self._ids, self._matrix, self._idf, self._idf2, self._norms
+        query = hash_vector(term_weights({"description": text}), self.dim)
+        query_norm = float(np.linalg.norm(query * idf))
+        if not query_norm:
+            return []
+        scores = (matrix[:len(ids)] @ (query * idf2)) / (norms * query_norm)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[row], float(scores[row])) for row in top if scores[row] > 0]
+
+    def signatures(self) -> Dict[str, str]:
+        """Job id -> signature of its vector in the published index"""
+        with self._lock:
+            return self._signatures if self._refresh() else {}
+
+    def neighbors(self, job_ids: Iterable[str], k: int = 10, min_score: float = 0.0,
+                  block: int = 128) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Top-k most similar indexed jobs (id, cosine) for each of `job_ids`,
+        the job itself excluded. Scores `block` jobs per matrix product, so a
+        full pass over N jobs is N / block products; CPU-bound, run it in a thread.
+        """
+        with self._lock:
+            if not self._refresh():
+                return {}
+            ids, matrix, idf2, norms, row_of = self._ids, self._matrix, self._idf2, self._norms, self._row_of
+        matrix = matrix[:len(ids)]
+        rows = np.array([row_of[job_id] for job_id in job_ids if job_id in row_of], dtype=np.int64)
+        k = min(k, len(row_of) - 1)
+        result: Dict[str, List[Tuple[str, float]]] = {}
+        if k <= 0:
+            return result
+        for start in range(0, len(rows), block):
+            batch = rows[start:start + block]
+            queries = matrix[batch] * idf2 / norms[batch, None]
+            scores = (matrix @ queries.T) / norms[:, None]
+            scores[batch, np.arange(len(batch))] = -np.inf
+            top = np.argpartition(-scores, k - 1, axis=0)[:k]
+            for column, row in enumerate(batch):
+                candidates = top[:, column]
+                candidates = candidates[np.argsort(-scores[candidates, column])]
+                result[ids[row]] = [(ids[other], float(scores[other, column]))
+                                    for other in candidates if scores[other, column] > min_score]
+        return result
+
+    # Writing (one worker per host)
+
+    async def sync(self, db, rebuild: bool = False) -> Dict[str, Any]:
+        """Bring the index up to date with the active jobs; skipped if another worker is syncing"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / LOCK_FILE, "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return {"skipped": "another worker is syncing"}
+            try:
+                return await self._sync(db, rebuild)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _writable_meta(self, rebuild: bool = False):
+        """(published metadata, metadata to update incrementally or None to start over)"""
+        previous = self._read_meta()
+        meta = previous if previous and previous["dim"] == self.dim and not rebuild else None
+        return previous, meta
+
+    async def _sync(self, db, rebuild: bool) -> Dict[str, Any]:
+        started = time.perf_counter()
+        previous, meta = await asyncio.to_thread(self._writable_meta, rebuild)
+        signatures = meta["signatures"] if meta else {}
+
+        current = {}
+        async for job in db.jobs.find(ACTIVE_JOBS, SIGNATURE_PROJECTION):
+            current[job["id"]] = job_signature(job)
+        changed = [job_id for job_id, signature in current.items() if signatures.get(job_id) != signature]
+        removed = [job_id for job_id in signatures if job_id not in current or job_id in changed]
+        if not changed and not removed and meta:
+            return {"jobs": len(signatures), "added": 0, "removed": 0}
+
+        vectors: Dict[str, np.ndarray] = {}
+        for start in range(0, len(changed), READ_BATCH):
+            batch = changed[start:start + READ_BATCH]
+            jobs = await db.jobs.find({"id": {"$in": batch}, **ACTIVE_JOBS}, TEXT_PROJECTION).to_list(length=None)
+            vectors.update(await asyncio.to_thread(self._hash_jobs, jobs))
+            for job in jobs:
+                current[job["id"]] = job_signature(job)
+
+        result = await asyncio.to_thread(self._write, previous, meta, vectors,
+                                         {job_id: current[job_id] for job_id in vectors}, removed)
+        return {**result, "seconds": round(time.perf_counter() - started, 2)}
+
+    def build(self, jobs: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Index `jobs` from scratch, without MongoDB (offline builds, the retrieval benchmark)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        previous, _ = self._writable_meta(rebuild=True)
+        jobs = list(jobs)
+        signatures = {job["id"]: job_signature(job) for job in jobs}
+        return self._write(previous, None, self._hash_jobs(jobs), signatures, [])
+
+    def _hash_jobs(self, jobs: Iterable[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        return {job["id"]: hash_vector(term_weights(job_fields(job)), self.dim) for job in jobs}
+
+    def _write(self, previous: Optional[Dict[str, Any]], meta: Optional[Dict[str, Any]],
+               vectors: Dict[str, np.ndarray], new_signatures: Dict[str, str], removed: List[str]) -> Dict[str, Any]:
+        """Write new vectors to free rows, free the removed rows, publish the metadata"""
+        ids: List[Optional[str]] = list(meta["ids"]) if meta else []
+        signatures: Dict[str, str] = dict(meta["signatures"]) if meta else {}
+        df = np.asarray(meta["df"], dtype=np.int64) if meta else np.zeros(self.dim, dtype=np.int64)
+        version = previous["version"] + 1 if previous else 1
+
+        matrix = np.load(self.directory / meta["file"], mmap_mode="r+") if meta else None
+        file_name = meta["file"] if meta else None
+        row_of = {job_id: row for row, job_id in enumerate(ids) if job_id is not None}
+
+        # Rows free in the published index take the new vectors; grow the file if there are too few
+        free = [row for row, job_id in enumerate(ids) if job_id is None]
+        if matrix is None or len(free) < len(vectors):
+            capacity = max(len(ids) * 2, len(ids) + len(vectors) - len(free), 1024)
+            file_name = f"vectors-{version}.npy"
+            grown = np.lib.format.open_memmap(self.directory / file_name, mode="w+", dtype=np.float32,
+                                              shape=(capacity, self.dim))
+            if matrix is not None:
+                grown[:len(ids)] = matrix[:len(ids)]
+            free += range(len(ids), capacity)
+            ids += [None] * (capacity - len(ids))
+            matrix = grown
+
+        new_ids = list(ids)
+        for job_id in removed:
+            row = row_of[job_id]
+            df -= (matrix[row] != 0)
+            new_ids[row] = None
+            signatures.pop(job_id)
+        for (job_id, vector), row in zip(vectors.items(), free):
+            matrix[row] = vector
+            df += (vector != 0)
+            new_ids[row] = job_id
+            signatures[job_id] = new_signatures[job_id]
+        matrix.flush()
+        np.maximum(df, 0, out=df)
+
+        published = {
+            "version": version, "dim": self.dim, "file": file_name, "ids": new_ids, "signatures": signatures,
+            "df": df.tolist(), "docs": len(signatures), "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        tmp = self.directory / f"{META_FILE}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(published, f)
+        os.replace(tmp, self.directory / META_FILE)
+        if previous and previous["file"] != file_name:
+            # Workers that still map the old file keep reading it until they reload
+            (self.directory / previous["file"]).unlink(missing_ok=True)
+        return {"jobs": len(signatures), "added": len(vectors), "removed": len(removed)}
+
+
+def _vectors_dir() -> Path:
+    return Path(os.environ.get("JOB_VECTORS_DIR") or Path(__file__).parent / "data" / "job_vectors")
+
+
+job_vectors = JobVectorIndex(_vectors_dir())
+
+
+def order_by_ids(jobs: Iterable[Dict[str, Any]], ids: List[str]) -> List[Dict[str, Any]]:
+    by_id = {job["id"]: job for job in jobs}
+    return [by_id[job_id] for job_id in ids if job_id in by_id]
@@ -0,0 +1,256 @@
+"""
+Event loop blocking watchdog for HealthCare Jobs API.
+A coroutine that does CPU work or blocking I/O (bcrypt, json.loads of a big
+payload, base64 of an upload, ET.tostring of the sitemap) stalls every
+request on the worker. monitor_loop_lag() in metrics.py says how much; this
+says where. A daemon thread posts a callback to the loop every
+CHECK_INTERVAL seconds. If it hasn't run after LOOP_BLOCK_MS, the thread
+samples the loop thread's stack (sys._current_frames) every LOOP_BLOCK_MS
+until it does. The stall is then recorded with its duration, the route of
+the request whose task was running (LoopWatchdogMiddleware) and the app
+frame seen in most samples, and aggregated per (route, frame) for
+GET /api/admin/loop-blocks. Durations are counted from the ping, so they
+can be up to CHECK_INTERVAL short.
+
+Set LOOP_WATCHDOG=0 to turn it off and LOOP_BLOCK_MS to change the
+threshold (default 100ms). budget() is the test mode: it raises
+LoopBlockedError when the loop is blocked longer than a given time inside
+it (see test_loop_blocking.py).
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter as Tally, deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from metrics import LOOP_BLOCKS
+
+logger = logging.getLogger(__name__)
+
+WATCHDOG_ENABLED = os.environ.get("LOOP_WATCHDOG", "1") != "0"
+LOOP_BLOCK_MS = float(os.environ.get("LOOP_BLOCK_MS", "100"))
+CHECK_INTERVAL = 0.05
+RECENT_SIZE = 200
+STACK_DEPTH = 25
+# Frames in these files are the framework and this module, not the code that blocked
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_SKIP_FILES = (os.path.abspath(__file__), os.sep + "site-packages" + os.sep, os.sep + "asyncio" + os.sep)
+
+
+class LoopBlockedError(AssertionError):
+    """Raised by budget() with the stalls that went over it"""
+
+    def __init__(self, blocks: List[Dict[str, Any]], max_ms: float):
+        self.blocks = blocks
+        worst = max(blocks, key=lambda block: block["blocked_ms"])
+        super().__init__(f"event loop blocked {worst['blocked_ms']:.0f} ms (budget {max_ms:.0f} ms) "
+                         f"in {worst['route']} at {worst['frame']}")
+
+
+def _app_frame(stack: traceback.StackSummary) -> str:
+    """Innermost frame in the app's own code (the call that blocked), else the innermost frame"""
+    for frame in reversed(stack):
+        path = os.path.abspath(frame.filename)
+        if path.startswith(_APP_DIR) and not any(skip in path for skip in _SKIP_FILES):
+            return f"{os.path.relpath(path, _APP_DIR)}:{frame.lineno} {frame.name}"
+    if stack:
+        return f"{stack[-1].filename}:{stack[-1].lineno} {stack[-1].name}"
+    return "unknown"
+
+
+class _Ping:
+    __slots__ = ("sent", "done", "samples")
+
+    def __init__(self):
+        self.sent = time.perf_counter()
+        self.done = threading.Event()
+        self.samples: List[Dict[str, Any]] = []
+
+
+class LoopWatchdog:
+    def __init__(self, threshold_ms: float = LOOP_BLOCK_MS, interval: float = CHECK_INTERVAL):
+        self.threshold_ms = threshold_ms
+        self.interval = interval
+        self._lock = threading.Lock()
+        # Request task -> ASGI scope (its "route" is filled in by the router)
+        self._requests: Dict[asyncio.Task, Dict[str, Any]] = {}
+        self._recent = deque(maxlen=RECENT_SIZE)
+        self._blocks: Dict[tuple, Dict[str, Any]] = {}
+        self._seq = 0
+        self._since = datetime.now(timezone.utc)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        """Watch the running loop (call from it)"""
+        if self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    # Request tracking (LoopWatchdogMiddleware)
+
+    def request_started(self, scope: Dict[str, Any]) -> Optional[asyncio.Task]:
+        task = asyncio.current_task()
+        if task is not None:
+            self._requests[task] = scope
+        return task
+
+    def request_finished(self, task: Optional[asyncio.Task]):
+        self._requests.pop(task, None)
+
+    # Watchdog thread
+
+    def _watch(self):
+        while not self._stopping.is_set():
+            ping = _Ping()
+            try:
+                self._loop.call_soon_threadsafe(self._pong, ping)
+            except RuntimeError:
+                return  # loop closed
+            timeout = self.threshold_ms / 1000
+            while not ping.done.wait(timeout):
+                if self._stopping.is_set():
+                    return
+                self._sample(ping)
+            self._stopping.wait(self.interval)
+
+    def _sample(self, ping: _Ping):
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame, limit=STACK_DEPTH)
+        del frame
+        # Reads the loop's current task from this thread; a stale answer only mislabels one sample
+        task = asyncio.current_task(self._loop)
+        scope = self._requests.get(task) if task is not None else None
+        if scope is not None:
+            route = getattr(scope.get("route"), "path", None) or scope.get("path", "unmatched")
+            route = f"{scope.get('method', '')} {route}".strip()
+        elif task is not None:
+            route = f"task {getattr(task.get_coro(), '__qualname__', '?')}"
+        else:
+            route = "loop callback"
+        with self._lock:
+            if not ping.done.is_set():
+                ping.samples.append({"route": route, "frame": _app_frame(stack), "stack": stack})
+
+    # Back on the loop: the stall is over
+
+    def _pong(self, ping: _Ping):
+        blocked_ms = (time.perf_counter() - ping.sent) * 1000
+        with self._lock:
+            ping.done.set()
+            samples = ping.samples
+        if samples and blocked_ms >= self.threshold_ms:
+            self._record(blocked_ms, samples)
+
+    def _record(self, blocked_ms: float, samples: List[Dict[str, Any]]):
+        # Where the time went: the (route, frame) seen in most samples
+        (route, frame), _ = Tally((s["route"], s["frame"]) for s in samples).most_common(1)[0]
+        stack = next(s["stack"] for s in samples if (s["route"], s["frame"]) == (route, frame))
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            self._seq += 1
+            event = {
+                "seq": self._seq,
+                "at": now,
+                "blocked_ms": round(blocked_ms, 1),
+                "route": route,
+                "frame": frame,
+                "samples": len(samples),
+                "stack": [f"{f.filename}:{f.lineno} {f.name}: {f.line or ''}".rstrip() for f in stack],
+            }
+            self._recent.append(event)
+            block = self._blocks.get((route, frame))
+            if block is None:
+                block = self._blocks[(route, frame)] = {"route": route, "frame": frame, "count": 0,
+                                                        "total_ms": 0.0, "max_ms": 0.0}
+            block["count"] += 1
+            block["total_ms"] += blocked_ms
+            block["max_ms"] = max(block["max_ms"], blocked_ms)
+            block["last_at"] = now
+            block["stack"] = event["stack"]
+        LOOP_BLOCKS.labels(route).inc()
+        logger.warning("Event loop blocked for %.0f ms in %s at %s", blocked_ms, route, frame,
+                       extra={"key": ("loop_blocked", route, frame)})
+
+    # Reporting
+
+    def snapshot(self, recent: int = 20) -> Dict[str, Any]:
+        """Stalls per (route, frame) by total blocked time, and the most recent ones"""
+        with self._lock:
+            blocks = [{**block, "total_ms": round(block["total_ms"], 1), "max_ms": round(block["max_ms"], 1)}
+                      for block in self._blocks.values()]
+            latest = list(self._recent)[-recent:][::-1] if recent > 0 else []
+        return {
+            "enabled": WATCHDOG_ENABLED,
+            "running": self._thread is not None,
+            "since": self._since,
+            "threshold_ms": self.threshold_ms,
+            "blocks": sorted(blocks, key=lambda block: block["total_ms"], reverse=True),
+            "recent": latest,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._recent.clear()
+            self._blocks.clear()
+            self._since = datetime.now(timezone.utc)
+
+    def events_since(self, seq: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [event for event in self._recent if event["seq"] > seq]
+
+    @asynccontextmanager
+    async def budget(self, max_ms: float):
+        """Raise LoopBlockedError if the loop is blocked longer than max_ms while inside"""
+        if self._thread is None:
+            raise RuntimeError("loop watchdog is not running")
+        if max_ms < self.threshold_ms:
+            raise ValueError(f"budget {max_ms} ms is below the watchdog threshold {self.threshold_ms} ms")
+        with self._lock:
+            start = self._seq
+        yield
+        # Let a pong queued behind the last stall run before looking
+        await asyncio.sleep(0)
+        over = [event for event in self.events_since(start) if event["blocked_ms"] > max_ms]
+        if over:
+            raise LoopBlockedError(over, max_ms)
+
+
+loop_watchdog = LoopWatchdog()
+
+
+class LoopWatchdogMiddleware:
+    """Tell the watchdog which request each task is serving (innermost, so it runs in the endpoint's task)"""
+
+    def __init__(self, app, watchdog: LoopWatchdog = loop_watchdog):
+        self.app = app
+        self.watchdog = watchdog
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        task = self.watchdog.request_started(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.watchdog.request_finished(task)
@@ -0,0 +1,368 @@
+"""
+Prometheus metrics for HealthCare Jobs API.
+Counters, gauges and histograms in the Prometheus text format, served at
+/metrics. Recording is a dict lookup and an attribute increment (bind label
+sets once with .labels() and keep the child for hot paths); nothing takes a
+lock. Each worker publishes a snapshot to the `metrics_workers` collection
+every few seconds (scheduler job `metrics_publish`) and /metrics merges the
+live snapshots, so a scrape of any worker covers all uvicorn processes.
+"""
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+WORKERS_COLLECTION = "metrics_workers"
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+# Snapshots older than this belong to workers that are gone
+WORKER_STALE_SECONDS = 60
+WORKER_TTL_SECONDS = 300
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+REGISTRY: Dict[str, "Metric"] = {}
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # Per-bucket counts (last one is +Inf); made cumulative when rendered
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metric:
+    """A metric family; labels(*values) returns the child for one label set"""
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        if name in REGISTRY:
+            raise ValueError(f"Metric {name} already registered")
+        REGISTRY[name] = self
+
+    def _new_child(self):
+        return _Value()
+
+    def labels(self, *values) -> Any:
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def samples(self) -> List[List[Any]]:
+        return [[list(labels), child.value] for labels, child in list(self._children.items())]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    """merge decides how workers combine: 'sum' (e.g. in-flight) or 'max' (e.g. loop lag)"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), merge: str = "sum"):
+        super().__init__(name, documentation, labelnames)
+        self.merge = merge
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _Buckets(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def samples(self) -> List[List[Any]]:
+        return [
+            [list(labels), {"counts": list(child.counts), "sum": child.sum, "count": child.count}]
+            for labels, child in list(self._children.items())
+        ]
+
+
+# HTTP
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests", ["method", "route", "status"])
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route"])
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served")
+HTTP_RESPONSE_SIZE = Histogram("http_response_size_bytes", "HTTP response body size", ["method", "route"],
+                               buckets=SIZE_BUCKETS)
+
+# MongoDB connection pools, one per server (primary and each secondary used for reads)
+POOL_CHECKOUTS = Counter("mongodb_pool_checkouts_total", "Connection pool checkouts", ["server", "result"])
+POOL_WAIT = Histogram("mongodb_pool_checkout_wait_seconds", "Time waiting for a pooled connection", ["server"],
+                      buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5))
+POOL_CHECKED_OUT = Gauge("mongodb_pool_checked_out", "Connections currently checked out", ["server"])
+POOL_CONNECTIONS = Gauge("mongodb_pool_connections", "Open pooled connections", ["server"])
+
+# Event loop, caches, background jobs, AI
+LOOP_LAG = Histogram("event_loop_lag_seconds", "Delay of a scheduled event loop wakeup",
+                     buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 5))
+LOOP_LAG_MAX = Gauge("event_loop_lag_max_seconds", "Largest loop lag in the last minute", merge="max")
+LOOP_BLOCKS = Counter("event_loop_blocks_total", "Event loop stalls over the watchdog threshold", ["route"])
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups", ["cache", "result"])
+JOB_DURATION = Histogram("scheduler_job_duration_seconds", "Scheduled job run time", ["job", "status"],
+                         buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300))
+AI_LATENCY = Histogram("ai_request_duration_seconds", "LLM call latency", ["endpoint", "status"],
+                       buckets=(0.25, 0.5, 1, 2, 5, 10, 20, 30, 60))
+AI_IN_FLIGHT = Gauge("ai_requests_in_flight", "LLM calls holding a gateway slot", ["endpoint"])
+AI_REJECTED = Counter("ai_requests_rejected_total", "LLM requests turned away by the gateway", ["endpoint", "reason"])
+AI_COALESCED = Counter("ai_requests_coalesced_total", "LLM requests served by an identical in-flight call",
+                       ["endpoint"])
+AI_CACHE_SAVED = Counter("ai_cache_saved_seconds_total", "LLM latency avoided by AI cache hits", ["endpoint"])
+TRACES = Counter("traces_total", "Request traces by export decision (sampled, slow, skipped, dropped)", ["result"])
+CHAT_LOG_MESSAGES = Counter("chat_log_messages_total", "Chat messages handled by the chat log writer", ["result"])
+
+
+def snapshot() -> Dict[str, List[List[Any]]]:
+    """This worker's samples, in a form that can be stored and merged"""
+    return {name: metric.samples() for name, metric in REGISTRY.items()}
+
+
+def merge(snapshots: List[Dict[str, List[List[Any]]]]) -> Dict[str, List[List[Any]]]:
+    """Combine worker snapshots: counters and histograms add up, gauges follow their merge mode"""
+    merged: Dict[str, Dict[Tuple[str, ...], Any]] = {}
+    for snap in snapshots:
+        for name, samples in snap.items():
+            metric = REGISTRY.get(name)
+            if metric is None:
+                continue
+            combined = merged.setdefault(name, {})
+            for labels, value in samples:
+                key = tuple(labels)
+                current = combined.get(key)
+                if current is None:
+                    combined[key] = {**value, "counts": list(value["counts"])} if isinstance(value, dict) else value
+                elif metric.kind == "histogram":
+                    if len(current["counts"]) == len(value["counts"]):
+                        current["counts"] = [a + b for a, b in zip(current["counts"], value["counts"])]
+                        current["sum"] += value["sum"]
+                        current["count"] += value["count"]
+                elif metric.kind == "gauge" and metric.merge == "max":
+                    combined[key] = max(current, value)
+                else:
+                    combined[key] = current + value
+    return {name: [[list(key), value] for key, value in combined.items()] for name, combined in merged.items()}
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Tuple[str, ...], values: List[Any], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def render(samples: Dict[str, List[List[Any]]]) -> str:
+    """Prometheus text exposition format (0.0.4)"""
+    lines = []
+    for name, metric in REGISTRY.items():
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for labels, value in samples.get(name, []):
+            if metric.kind == "histogram":
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float("inf"),), value["counts"]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    lines.append(f"{name}_bucket{_label_text(metric.labelnames, labels, ('le', le))} {cumulative}")
+                lines.append(f"{name}_sum{_label_text(metric.labelnames, labels)} {_number(value['sum'])}")
+                lines.append(f"{name}_count{_label_text(metric.labelnames, labels)} {value['count']}")
+            else:
+                lines.append(f"{name}{_label_text(metric.labelnames, labels)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+async def publish_worker_metrics(db) -> Dict[str, Any]:
+    """Store this worker's snapshot for the other workers' /metrics"""
+    await db[WORKERS_COLLECTION].replace_one(
+        {"_id": WORKER_ID},
+        {"updated_at": datetime.now(timezone.utc), "metrics": snapshot()},
+        upsert=True
+    )
+    return {"worker": WORKER_ID}
+
+
+async def collect_metrics(db) -> str:
+    """Metrics of all live workers (this worker's own values are always current)"""
+    snapshots = [snapshot()]
+    try:
+        since = datetime.now(timezone.utc) - timedelta(seconds=WORKER_STALE_SECONDS)
+        async for doc in db[WORKERS_COLLECTION].find({"updated_at": {"$gte": since}, "_id": {"$ne": WORKER_ID}}):
+            snapshots.append(doc.get("metrics", {}))
+    except Exception as e:
+        logger.warning("Could not read other workers' metrics: %s", e)
+    return render(merge(snapshots))
+
+
+class MetricsMiddleware:
+    """
+    Request count, latency, in-flight and response size per route template.
+    Plain ASGI (not BaseHTTPMiddleware) so streamed bodies are measured and
+    the hot path skips the extra task per request.
+    """
+    def __init__(self, app):
+        self.app = app
+        self._bound: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = [500]
+        size = [0]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            elif message["type"] == "http.response.body":
+                size[0] += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            key = (scope["method"], route)
+            bound = self._bound.get(key)
+            if bound is None:
+                bound = self._bound[key] = (HTTP_LATENCY.labels(*key), HTTP_RESPONSE_SIZE.labels(*key))
+            bound[0].observe(time.perf_counter() - started)
+            bound[1].observe(size[0])
+            HTTP_REQUESTS.labels(scope["method"], route, str(status[0])).inc()
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Checkouts, checkout wait time and connections in use per server, from pymongo pool events"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @staticmethod
+    def _server(event) -> str:
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        server = self._server(event)
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            POOL_WAIT.labels(server).observe(time.perf_counter() - started)
+        POOL_CHECKOUTS.labels(server, "ok").inc()
+        POOL_CHECKED_OUT.labels(server).inc()
+
+    def connection_check_out_failed(self, event):
+        POOL_CHECKOUTS.labels(self._server(event), "failed").inc()
+
+    def connection_checked_in(self, event):
+        POOL_CHECKED_OUT.labels(self._server(event)).dec()
+
+    def connection_created(self, event):
+        POOL_CONNECTIONS.labels(self._server(event)).inc()
+
+    def connection_closed(self, event):
+        POOL_CONNECTIONS.labels(self._server(event)).dec()
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+
+pool_metrics = PoolMetrics()
+
+
+async def monitor_loop_lag(interval: float = 0.5):
+    """Measure how late the event loop wakes us up (time spent in blocking code)"""
+    loop = asyncio.get_running_loop()
+    window_max, window_started = 0.0, loop.time()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - expected)
+        LOOP_LAG.observe(lag)
+        window_max = max(window_max, lag)
+        LOOP_LAG_MAX.set(window_max)
+        if loop.time() - window_started >= 60:
+            window_max, window_started = 0.0, loop.time()
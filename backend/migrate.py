@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Data migration CLI
+Runs the versioned migrations registered in the migrations package, and
+applies the index manifest (indexes.py), against the database configured by
+MONGO_URL / DB_NAME (backend/.env). Run `indexes` once per deploy.
+
+Usage:
+    python migrate.py list
+    python migrate.py status
+    python migrate.py run                      # all pending migrations, in order
+    python migrate.py run 0005 fix_category_names --dry-run
+    python migrate.py run 0007 --batch-size 2000 --concurrency 8
+    python migrate.py run 0003 --force         # re-run a completed migration
+    python migrate.py indexes                  # create/replace indexes from the manifest
+    python migrate.py indexes --dry-run --prune
+"""
+import argparse
+import asyncio
+import sys
+
+from indexes import ensure_indexes
+from migrations import get_migrations, run_migration, migration_status, DEFAULT_BATCH_SIZE, DEFAULT_CONCURRENCY
+
+
+def list_migrations():
+    for m in get_migrations():
+        flags = " (repeatable)" if m.repeatable else ""
+        print(f"{m.version}  {m.name:<28} {m.collection:<12} {m.description}{flags}")
+
+
+async def show_status(db):
+    for row in await migration_status(db):
+        finished = row["finished_at"].isoformat() if row["finished_at"] else "-"
+        print(f"{row['version']}  {row['name']:<28} {row['status']:<10} "
+              f"scanned={row['scanned']:<8} modified={row['modified']:<8} errors={row['errors']:<5} finished={finished}")
+
+
+async def run(db, args):
+    migrations = get_migrations(args.migrations)
+    if args.migrations and not migrations:
+        print(f"❌ No migrations match: {' '.join(args.migrations)}")
+        return 1
+
+    for m in migrations:
+        await run_migration(
+            db, m,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            dry_run=args.dry_run,
+            force=args.force,
+            max_diffs=args.max_diffs
+        )
+    return 0
+
+
+async def apply_indexes(db, args):
+    report = await ensure_indexes(db, prune=args.prune, dry_run=args.dry_run)
+    return 1 if report["errors"] else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run versioned data migrations")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="List registered migrations")
+    sub.add_parser("status", help="Show progress recorded in the _migrations collection")
+
+    run_parser = sub.add_parser("run", help="Run pending migrations (or the given versions/names)")
+    run_parser.add_argument("migrations", nargs="*", help="Versions or names to run (default: all)")
+    run_parser.add_argument("--dry-run", action="store_true", help="Print diffs without writing")
+    run_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    run_parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                            help="Number of bulk_write batches in flight")
+    run_parser.add_argument("--force", action="store_true", help="Start over even if completed or interrupted")
+    run_parser.add_argument("--max-diffs", type=int, default=20, help="Diffs printed per migration in dry runs")
+
+    index_parser = sub.add_parser("indexes", help="Create or replace the indexes declared in indexes.py")
+    index_parser.add_argument("--dry-run", action="store_true", help="Show what would change without changing it")
+    index_parser.add_argument("--prune", action="store_true", help="Also drop indexes that are not in the manifest")
+
+    args = parser.parse_args()
+
+    if args.command == "list":
+        list_migrations()
+        return 0
+
+    from database import client, db
+    try:
+        if args.command == "status":
+            asyncio.run(show_status(db))
+            return 0
+        if args.command == "indexes":
+            return asyncio.run(apply_indexes(db, args))
+        return asyncio.run(run(db, args))
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
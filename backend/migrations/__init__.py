@@ -0,0 +1,12 @@
+# Migrations package
+from migrations.runner import (
+    Migration, MIGRATIONS, migration, get_migrations, run_migration, migration_status,
+    describe_update, MIGRATIONS_COLLECTION, DEFAULT_BATCH_SIZE, DEFAULT_CONCURRENCY
+)
+# Importing the modules registers their migrations
+from migrations import chat, jobs
+
+__all__ = [
+    'Migration', 'MIGRATIONS', 'migration', 'get_migrations', 'run_migration', 'migration_status',
+    'describe_update', 'MIGRATIONS_COLLECTION', 'DEFAULT_BATCH_SIZE', 'DEFAULT_CONCURRENCY'
+]
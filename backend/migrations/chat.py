@@ -0,0 +1,18 @@
+"""
+Chat log migrations.
+"""
+from datetime import datetime
+
+from chat_log import CHAT_MESSAGES_COLLECTION
+from migrations.runner import migration
+
+
+@migration("0009", "chat_dates_to_datetime", CHAT_MESSAGES_COLLECTION,
+           {"created_at": {"$type": "string"}},
+           projection={"id": 1, "created_at": 1})
+def chat_dates_to_datetime(message):
+    """Convert ISO string created_at to a datetime so the chat log TTL index expires old messages"""
+    try:
+        return {"$set": {"created_at": datetime.fromisoformat(message["created_at"].replace('Z', '+00:00'))}}
+    except ValueError:
+        return None
@@ -0,0 +1,172 @@
+"""
+Job collection migrations.
+Replaces the one-off migrate_*.py / fix_*.py scripts that updated one document at a time.
+"""
+from datetime import datetime
+
+from job_cards import CARD_SOURCE_FIELDS, build_card
+from migrations.runner import migration
+from slug_allocator import generate_slug
+
+# Mapping of inconsistent -> canonical category names (from fix_category_names.py)
+CATEGORY_FIXES = {
+    'dentist': 'dentists',
+    'pharmacy': 'pharmacists',
+    'physiotherapy': 'physiotherapists',
+    'nurse': 'nurses',
+    'doctor': 'doctors'
+}
+
+DATE_FIELDS = ["created_at", "expires_at", "application_deadline"]
+
+
+@migration("0001", "category_to_categories", "jobs",
+           {"category": {"$exists": True}},
+           projection={"id": 1, "category": 1, "categories": 1})
+def category_to_categories(job):
+    """Convert the legacy 'category' string into the 'categories' array"""
+    categories = list(job.get("categories") or [])
+    if job.get("category") and job["category"] not in categories:
+        categories.append(job["category"])
+    return {"$set": {"categories": categories}, "$unset": {"category": ""}}
+
+
+@migration("0002", "salary_to_string", "jobs",
+           {"$or": [{"salary_min": {"$type": "number"}}, {"salary_max": {"$type": "number"}}]},
+           projection={"id": 1, "salary_min": 1, "salary_max": 1})
+def salary_to_string(job):
+    """Store numeric salary_min/salary_max as strings (the fields also hold 'Negotiable' etc.)"""
+    update = {}
+    for field in ("salary_min", "salary_max"):
+        value = job.get(field)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            update[field] = str(int(value)) if float(value).is_integer() else str(value)
+    return {"$set": update} if update else None
+
+
+@migration("0003", "fix_category_names", "jobs",
+           {"categories": {"$in": list(CATEGORY_FIXES)}},
+           projection={"id": 1, "categories": 1})
+def fix_category_names(job):
+    """Normalize category names to their plural form and drop duplicates"""
+    fixed = [CATEGORY_FIXES.get(cat, cat) for cat in job.get("categories") or []]
+    fixed = list(dict.fromkeys(fixed))
+    if fixed == job.get("categories"):
+        return None
+    return {"$set": {"categories": fixed}}
+
+
+@migration("0004", "add_currency", "jobs",
+           {"currency": {"$exists": False}},
+           projection={"id": 1})
+def add_currency(job):
+    """Default jobs without a currency to INR"""
+    return {"$set": {"currency": "INR"}}
+
+
+@migration("0005", "string_dates_to_datetime", "jobs",
+           {"$or": [{field: {"$type": "string"}} for field in DATE_FIELDS]},
+           projection={"id": 1, **{field: 1 for field in DATE_FIELDS}})
+def string_dates_to_datetime(job):
+    """Convert ISO string created_at/expires_at/application_deadline values to datetimes"""
+    update = {}
+    for field in DATE_FIELDS:
+        value = job.get(field)
+        if isinstance(value, str) and value:
+            try:
+                update[field] = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            except ValueError:
+                continue
+    return {"$set": update} if update else None
+
+
+@migration("0006", "missing_job_slugs", "jobs",
+           {"slug": {"$in": [None, ""]}},
+           projection={"id": 1, "title": 1, "company": 1, "location": 1, "slug": 1},
+           repeatable=True)
+def missing_job_slugs(job):
+    """Generate slugs for jobs that do not have one"""
+    if not job.get("id"):
+        return None
+    slug = generate_slug(job.get("title", "Job"), job.get("company"), job.get("location"), job["id"])
+    return {"$set": {"slug": slug}}
+
+
+@migration("0007", "job_slug_id_suffix", "jobs",
+           {"id": {"$exists": True}},
+           projection={"id": 1, "title": 1, "company": 1, "location": 1, "slug": 1})
+def job_slug_id_suffix(job):
+    """Regenerate slugs that are missing the job ID suffix ([title]-job-at-[company]-in-[location]-[id])"""
+    job_id = job.get("id")
+    if not job_id or job_id[:8] in (job.get("slug") or ""):
+        return None
+    slug = generate_slug(job.get("title", "Job"), job.get("company"), job.get("location"), job_id)
+    return {"$set": {"slug": slug}}
+
+
+@migration("0008", "job_cards", "jobs",
+           {"card": {"$exists": False}},
+           projection={"id": 1, **{field: 1 for field in CARD_SOURCE_FIELDS}},
+           repeatable=True)
+def job_cards(job):
+    """Store the compact list card (snippet, salary string, first requirements) on jobs that lack one"""
+    return {"$set": {"card": build_card(job)}}
+
+
+# Names 0003 leaves alone: capitalised forms (from migrate_production_categories.py)
+CATEGORY_ALIASES = {
+    **CATEGORY_FIXES,
+    'Doctors': 'doctors',
+    'Nurses': 'nurses',
+    'Dentists': 'dentists',
+    'Pharmacists': 'pharmacists',
+    'Physiotherapists': 'physiotherapists',
+}
+
+# Category for a job whose categories end up empty: explicit titles first
+# (from migrate_fix_categories.py), then the first matching title keyword, else doctors
+TITLE_CATEGORIES = {
+    'HERO Surgical Technologist': ['nurses'],
+}
+TITLE_KEYWORD_CATEGORIES = [
+    (('doctor', 'physician', 'medical', 'surgeon'), 'doctors'),
+    (('nurse', 'nursing'), 'nurses'),
+    (('pharma', 'chemist'), 'pharmacists'),
+    (('dental', 'dentist'), 'dentists'),
+    (('physio', 'therapy'), 'physiotherapists'),
+]
+
+
+def categories_from_title(title: str):
+    if title in TITLE_CATEGORIES:
+        return list(TITLE_CATEGORIES[title])
+    lowered = title.lower()
+    for keywords, category in TITLE_KEYWORD_CATEGORIES:
+        if any(keyword in lowered for keyword in keywords):
+            return [category]
+    return ['doctors']
+
+
+@migration("0010", "clean_categories", "jobs",
+           {"$or": [{"categories": {"$in": [None, ""] + list(CATEGORY_ALIASES)}}, {"categories": {"$size": 0}}]},
+           projection={"id": 1, "title": 1, "categories": 1})
+def clean_categories(job):
+    """Drop None/empty categories, normalize capitalised and singular names, fill empty lists from the title"""
+    if not isinstance(job.get("categories"), list):
+        return None
+    cleaned = [CATEGORY_ALIASES.get(cat, cat) for cat in job["categories"] if cat]
+    cleaned = list(dict.fromkeys(cleaned)) or categories_from_title(job.get("title") or "")
+    if cleaned == job["categories"]:
+        return None
+    return {"$set": {"categories": cleaned}}
+
+
+PHYSIOTHERAPY_TITLES = ["HERO Surgical Technologist", "HERO Radiologic Technologist"]
+
+
+@migration("0011", "physiotherapy_categories", "jobs",
+           {"title": {"$in": PHYSIOTHERAPY_TITLES}, "categories": {"$ne": "physiotherapists"}},
+           projection={"id": 1, "categories": 1})
+def physiotherapy_categories(job):
+    """Add physiotherapists to the HERO technologist jobs (they include physiotherapy services)"""
+    return {"$set": {"categories": list(job.get("categories") or []) + ["physiotherapists"]}}
@@ -0,0 +1,322 @@
+"""
+Migration runner for HealthCare Jobs API.
+Versioned data migrations that stream a collection in _id order, apply
+batched unordered bulk_writes with bounded concurrency, and checkpoint
+progress in the `_migrations` collection so an interrupted run resumes
+where it stopped.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+MIGRATIONS_COLLECTION = "_migrations"
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_CONCURRENCY = 4
+
+
+@dataclass
+class Migration:
+    """A versioned migration: documents matching query are passed to transform"""
+    version: str
+    name: str
+    collection: str
+    query: Dict[str, Any]
+    # Returns a MongoDB update document for the given doc, or None to leave it unchanged
+    transform: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+    projection: Optional[Dict[str, Any]] = None
+    # Repeatable migrations start over once completed (e.g. "fill in missing slugs")
+    repeatable: bool = False
+    description: str = ""
+
+
+# Registry of all migrations, keyed by version
+MIGRATIONS: Dict[str, Migration] = {}
+
+
+def migration(version: str, name: str, collection: str, query: Dict[str, Any],
+              projection: Optional[Dict[str, Any]] = None, repeatable: bool = False):
+    """Decorator registering a transform function as a migration"""
+    def decorator(transform):
+        if version in MIGRATIONS:
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS[version] = Migration(
+            version=version,
+            name=name,
+            collection=collection,
+            query=query,
+            transform=transform,
+            projection=projection,
+            repeatable=repeatable,
+            description=(transform.__doc__ or "").strip()
+        )
+        return transform
+    return decorator
+
+
+def get_migrations(versions: Optional[List[str]] = None) -> List[Migration]:
+    """Return registered migrations in version order, optionally filtered by version or name"""
+    selected = sorted(MIGRATIONS.values(), key=lambda m: m.version)
+    if versions:
+        wanted = set(versions)
+        selected = [m for m in selected if m.version in wanted or m.name in wanted]
+    return selected
+
+
+def describe_update(doc: Dict[str, Any], update: Dict[str, Any]) -> List[str]:
+    """Human readable field-level diff of an update document (used by dry runs)"""
+    lines = []
+    for field, value in update.get("$set", {}).items():
+        lines.append(f"{field}: {doc.get(field)!r} → {value!r}")
+    for field in update.get("$unset", {}):
+        lines.append(f"{field}: {doc.get(field)!r} → (removed)")
+    return lines
+
+
+class _Checkpointer:
+    """
+    Tracks out-of-order batch completion and only advances the persisted
+    checkpoint past batches whose predecessors have all been written.
+    """
+
+    def __init__(self, state, version: str):
+        self.state = state
+        self.version = version
+        self.next_seq = 0
+        self.done: Dict[int, Any] = {}
+        self.lock = asyncio.Lock()
+
+    async def complete(self, seq: int, last_id, scanned: int, counters: Dict[str, int]):
+        async with self.lock:
+            self.done[seq] = (last_id, scanned)
+            checkpoint = None
+            while self.next_seq in self.done:
+                checkpoint = self.done.pop(self.next_seq)
+                self.next_seq += 1
+            if checkpoint is not None:
+                await self.state.update_one(
+                    {"_id": self.version},
+                    {"$set": {
+                        "last_id": checkpoint[0],
+                        "scanned": checkpoint[1],
+                        "modified": counters["modified"],
+                        "errors": counters["errors"],
+                        "updated_at": datetime.now(timezone.utc)
+                    }}
+                )
+
+
+async def run_migration(
+    db,
+    migration: Migration,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    dry_run: bool = False,
+    force: bool = False,
+    max_diffs: int = 20,
+    log: Callable[[str], None] = print
+) -> Dict[str, Any]:
+    """
+    Run one migration and return a report with scanned/modified/error counts
+    and throughput. Dry runs print field diffs and write nothing.
+    """
+    state = db[MIGRATIONS_COLLECTION]
+    collection = db[migration.collection]
+    label = f"{migration.version}_{migration.name}"
+
+    existing = await state.find_one({"_id": migration.version})
+    resume_after = None
+    if existing and existing.get("status") == "completed" and not (force or migration.repeatable):
+        log(f"⏭️  {label}: already completed at {existing.get('finished_at')}")
+        return {"version": migration.version, "name": migration.name, "skipped": True}
+    if existing and existing.get("status") in ("running", "failed") and not (force or dry_run):
+        resume_after = existing.get("last_id")
+        if resume_after is not None:
+            log(f"↩️  {label}: resuming after _id {resume_after}")
+
+    counters = {"scanned": 0, "matched": 0, "modified": 0, "errors": 0}
+    if resume_after is not None:
+        counters["scanned"] = existing.get("scanned", 0)
+        counters["modified"] = existing.get("modified", 0)
+        counters["errors"] = existing.get("errors", 0)
+
+    now = datetime.now(timezone.utc)
+    if not dry_run:
+        await state.update_one(
+            {"_id": migration.version},
+            {
+                "$set": {
+                    "name": migration.name,
+                    "collection": migration.collection,
+                    "status": "running",
+                    "started_at": now,
+                    "updated_at": now,
+                    "batch_size": batch_size,
+                    "concurrency": concurrency
+                },
+                "$unset": {"finished_at": "", "error": ""} if resume_after is not None
+                else {"finished_at": "", "error": "", "last_id": ""}
+            },
+            upsert=True
+        )
+
+    query = migration.query
+    if resume_after is not None:
+        query = {"$and": [migration.query, {"_id": {"$gt": resume_after}}]}
+
+    log(f"🔄 {label}{' (dry run)' if dry_run else ''}: {migration.description}")
+
+    checkpointer = _Checkpointer(state, migration.version)
+    slots = asyncio.Semaphore(concurrency)
+    # Batch writes, kept until their result has been collected so a failed one fails the run
+    in_flight = set()
+    diffs_shown = 0
+    started = time.perf_counter()
+    last_report = started
+
+    async def write_batch(seq: int, ops: List[UpdateOne], last_id, scanned: int):
+        try:
+            if ops:
+                try:
+                    result = await collection.bulk_write(ops, ordered=False)
+                    counters["modified"] += result.modified_count
+                except BulkWriteError as e:
+                    details = e.details or {}
+                    counters["modified"] += details.get("nModified", 0)
+                    write_errors = details.get("writeErrors", [])
+                    counters["errors"] += len(write_errors)
+                    if write_errors:
+                        log(f"   ⚠️ {len(write_errors)} write errors in batch {seq}, first: {write_errors[0].get('errmsg')}")
+            await checkpointer.complete(seq, last_id, scanned, counters)
+        finally:
+            slots.release()
+
+    seq = 0
+    batch_ops: List[UpdateOne] = []
+    batch_last_id = None
+    batch_count = 0
+
+    def collect_finished():
+        """Drop finished writes, re-raising the error of a failed one"""
+        for task in [task for task in in_flight if task.done()]:
+            in_flight.discard(task)
+            task.result()
+
+    async def flush():
+        nonlocal seq, batch_ops, batch_count
+        if dry_run:
+            batch_ops, batch_count = [], 0
+            return
+        await slots.acquire()
+        try:
+            collect_finished()
+        except BaseException:
+            slots.release()
+            raise
+        task = asyncio.create_task(write_batch(seq, batch_ops, batch_last_id, counters["scanned"]))
+        in_flight.add(task)
+        seq += 1
+        batch_ops, batch_count = [], 0
+
+    try:
+        cursor = collection.find(query, migration.projection).sort("_id", 1).batch_size(batch_size)
+        async for doc in cursor:
+            counters["scanned"] += 1
+            batch_count += 1
+            batch_last_id = doc["_id"]
+
+            update = migration.transform(doc)
+            if update:
+                counters["matched"] += 1
+                batch_ops.append(UpdateOne({"_id": doc["_id"]}, update))
+                if dry_run and diffs_shown < max_diffs:
+                    diffs_shown += 1
+                    log(f"   {doc.get('id', doc['_id'])}:")
+                    for line in describe_update(doc, update):
+                        log(f"      {line}")
+
+            if batch_count >= batch_size:
+                await flush()
+                now_ts = time.perf_counter()
+                if now_ts - last_report >= 5:
+                    last_report = now_ts
+                    rate = counters["scanned"] / (now_ts - started)
+                    log(f"   … {counters['scanned']} scanned, {counters['modified']} modified ({rate:,.0f} docs/s)")
+
+        if batch_count:
+            await flush()
+        if in_flight:
+            await asyncio.gather(*in_flight)
+    except Exception as e:
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        if not dry_run:
+            await state.update_one(
+                {"_id": migration.version},
+                {"$set": {"status": "failed", "error": str(e), "updated_at": datetime.now(timezone.utc)}}
+            )
+        log(f"❌ {label}: failed after {counters['scanned']} documents: {e}")
+        raise
+
+    elapsed = time.perf_counter() - started
+    rate = counters["scanned"] / elapsed if elapsed > 0 else 0.0
+
+    if not dry_run:
+        await state.update_one(
+            {"_id": migration.version},
+            {"$set": {
+                "status": "completed",
+                "scanned": counters["scanned"],
+                "modified": counters["modified"],
+                "errors": counters["errors"],
+                "finished_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc)
+            }}
+        )
+
+    if dry_run:
+        log(f"✅ {label}: would modify {counters['matched']} of {counters['scanned']} scanned documents "
+            f"({rate:,.0f} docs/s)")
+    else:
+        log(f"✅ {label}: {counters['modified']} modified, {counters['errors']} errors, "
+            f"{counters['scanned']} scanned in {elapsed:.1f}s ({rate:,.0f} docs/s)")
+
+    return {
+        "version": migration.version,
+        "name": migration.name,
+        "dry_run": dry_run,
+        "scanned": counters["scanned"],
+        "matched": counters["matched"],
+        "modified": counters["modified"],
+        "errors": counters["errors"],
+        "elapsed_seconds": round(elapsed, 3),
+        "docs_per_second": round(rate, 1)
+    }
+
+
+async def migration_status(db) -> List[Dict[str, Any]]:
+    """Status of every registered migration merged with its `_migrations` record"""
+    records = {
+        doc["_id"]: doc
+        for doc in await db[MIGRATIONS_COLLECTION].find({}).to_list(length=None)
+    }
+    status = []
+    for m in get_migrations():
+        record = records.get(m.version, {})
+        status.append({
+            "version": m.version,
+            "name": m.name,
+            "collection": m.collection,
+            "repeatable": m.repeatable,
+            "status": record.get("status", "pending"),
+            "scanned": record.get("scanned", 0),
+            "modified": record.get("modified", 0),
+            "errors": record.get("errors", 0),
+            "finished_at": record.get("finished_at")
+        })
+    return status
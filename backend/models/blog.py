@@ -49,6 +49,7 @@ class BlogPostSummary(BaseModel):
     is_featured: bool = False
     created_at: datetime
     published_at: Optional[datetime] = None
+    highlight: Optional[str] = None
 
 
 class BlogPostCreate(BaseModel):
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Startup profiler
+Shows where `import server` spends its time (python -X importtime) and,
+with --serve, how long a fresh uvicorn process takes to answer its first
+request. Neither step needs MongoDB: the client connects lazily and
+robots.txt does not touch the database.
+
+Usage:
+    python profile_startup.py                    # import profile, top 25 modules
+    python profile_startup.py --top 50 --sort self
+    python profile_startup.py --serve --budget-ms 500   # exit 1 if over budget (CI)
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+
+# Settings server.py requires at import time; nothing connects to them
+DUMMY_ENV = {"MONGO_URL": "mongodb://127.0.0.1:1", "DB_NAME": "startup_profile"}
+
+
+def _env():
+    return {**DUMMY_ENV, **os.environ}
+
+
+def import_profile():
+    """[(module, self_us, cumulative_us)] for `import server`, parsed from -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import server failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_request(timeout: float = 30.0) -> float:
+    """Milliseconds from spawning uvicorn to the first successful response"""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/robots.txt"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=_env(), stdout=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {process.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    response.read()
+                return (time.perf_counter() - started) * 1000
+            except OSError:
+                if time.perf_counter() - started > timeout:
+                    raise RuntimeError(f"no response within {timeout:.0f}s")
+                time.sleep(0.005)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile API startup")
+    parser.add_argument("--top", type=int, default=25, help="Modules to list")
+    parser.add_argument("--sort", choices=["cumulative", "self"], default="cumulative")
+    parser.add_argument("--serve", action="store_true", help="Also measure time to first request")
+    parser.add_argument("--runs", type=int, default=3, help="--serve runs (the best is reported)")
+    parser.add_argument("--budget-ms", type=float, help="Exit 1 if time to first request exceeds this")
+    args = parser.parse_args()
+
+    rows = import_profile()
+    total_us = next(cumulative for name, _, cumulative in rows if name == "server")
+    column = 2 if args.sort == "cumulative" else 1
+    print(f"📦 import server: {total_us / 1000:.0f} ms ({len(rows)} modules)")
+    print(f"{'self ms':>9} {'cum ms':>9}  module")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: row[column], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {name}")
+
+    if not args.serve:
+        return 0
+
+    timings = [time_to_first_request() for _ in range(args.runs)]
+    best = min(timings)
+    print(f"🚀 Time to first request: {best:.0f} ms (runs: {', '.join(f'{t:.0f}' for t in timings)})")
+    if args.budget_ms is not None and best > args.budget_ms:
+        print(f"❌ Over the {args.budget_ms:.0f} ms startup budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+# Scheduler package
+from scheduler.core import (
+    ScheduledJob, JOBS, scheduled_job, LeaseLock, Scheduler, run_job_now, request_run,
+    scheduler_status, LOCKS_COLLECTION, JOBS_COLLECTION, RUNS_COLLECTION
+)
+# Importing the module registers the jobs
+from scheduler import jobs
+
+__all__ = [
+    'ScheduledJob', 'JOBS', 'scheduled_job', 'LeaseLock', 'Scheduler', 'run_job_now', 'request_run',
+    'scheduler_status', 'LOCKS_COLLECTION', 'JOBS_COLLECTION', 'RUNS_COLLECTION'
+]
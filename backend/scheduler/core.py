@@ -0,0 +1,340 @@
+"""
+Background scheduler for HealthCare Jobs API.
+Every uvicorn worker runs a Scheduler, but only the holder of a MongoDB lease
+(`scheduler_locks`) runs leader jobs, so N workers do not repeat the same
+sweep N times. Per-job schedule state lives in `scheduler_jobs` (so a new
+leader carries on where the old one stopped) and every run is recorded in
+`scheduler_runs`. Jobs that act on per-process state (e.g. counter buffers)
+are registered with leader_only=False and run in every worker.
+"""
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from metrics import JOB_DURATION
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+LOCKS_COLLECTION = "scheduler_locks"
+JOBS_COLLECTION = "scheduler_jobs"
+RUNS_COLLECTION = "scheduler_runs"
+
+LEADER_LOCK = "scheduler_leader"
+
+# The leader renews its lease every tick; a crashed leader is replaced after the lease expires
+LEASE_SECONDS = 60
+TICK_SECONDS = 15
+
+# Run history is kept for 30 days (TTL index on started_at, see indexes.py)
+RUN_HISTORY_SECONDS = 30 * 24 * 60 * 60
+
+
+@dataclass
+class ScheduledJob:
+    """A periodic job: func(db) is awaited every interval seconds plus up to jitter seconds"""
+    name: str
+    func: Callable[[Any], Awaitable[Any]]
+    interval: float
+    jitter: float = 0
+    # Leader jobs run once per deployment; others run in every worker
+    leader_only: bool = True
+    timeout: Optional[float] = None
+    # Record runs in scheduler_runs (off for high-frequency per-worker jobs)
+    history: bool = True
+    # Also run once while the worker shuts down (e.g. flush buffers)
+    run_on_shutdown: bool = False
+    description: str = ""
+
+    def next_run(self, now: datetime) -> datetime:
+        return now + timedelta(seconds=self.interval + random.uniform(0, self.jitter))
+
+
+# Registry of all scheduled jobs, keyed by name
+JOBS: Dict[str, ScheduledJob] = {}
+
+
+def scheduled_job(name: str, interval: float, jitter: float = 0, leader_only: bool = True,
+                  timeout: Optional[float] = None, history: bool = True, run_on_shutdown: bool = False):
+    """Decorator registering an async func(db) as a scheduled job"""
+    def decorator(func):
+        if name in JOBS:
+            raise ValueError(f"Duplicate scheduled job {name}")
+        JOBS[name] = ScheduledJob(
+            name=name,
+            func=func,
+            interval=interval,
+            jitter=jitter,
+            leader_only=leader_only,
+            timeout=timeout,
+            history=history,
+            run_on_shutdown=run_on_shutdown,
+            description=(func.__doc__ or "").strip()
+        )
+        return func
+    return decorator
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    """MongoDB returns naive UTC datetimes unless the client is tz_aware"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class LeaseLock:
+    """
+    Lease-based lock on a single document. acquire() both takes an expired
+    (or missing) lease and renews one we already hold, in one atomic
+    find_one_and_update; losing the upsert race raises DuplicateKeyError.
+    """
+
+    def __init__(self, collection, name: str, owner: str, lease_seconds: float = LEASE_SECONDS):
+        self.collection = collection
+        self.name = name
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+
+    async def acquire(self) -> bool:
+        now = _utcnow()
+        try:
+            lock = await self.collection.find_one_and_update(
+                {"_id": self.name, "$or": [{"owner": self.owner}, {"expires_at": {"$lt": now}}]},
+                {"$set": {
+                    "owner": self.owner,
+                    "expires_at": now + timedelta(seconds=self.lease_seconds),
+                    "renewed_at": now
+                }},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Someone else holds an unexpired lease
+            return False
+        return bool(lock) and lock.get("owner") == self.owner
+
+    async def release(self):
+        await self.collection.delete_one({"_id": self.name, "owner": self.owner})
+
+
+async def record_run(db, job: ScheduledJob, trigger: str, owner: str) -> Dict[str, Any]:
+    """Run a job once, recording it in scheduler_runs and its state in scheduler_jobs"""
+    run_id = str(uuid.uuid4())
+    started_at = _utcnow()
+    if job.history:
+        await db[RUNS_COLLECTION].insert_one({
+            "_id": run_id,
+            "job": job.name,
+            "trigger": trigger,
+            "owner": owner,
+            "status": "running",
+            "started_at": started_at
+        })
+
+    started = time.perf_counter()
+    result, error = None, None
+    try:
+        with span(f"job {job.name}", **{"scheduler.trigger": trigger}):
+            result = await asyncio.wait_for(job.func(db), job.timeout)
+        status = "success"
+    except asyncio.TimeoutError:
+        status, error = "failed", f"Timed out after {job.timeout}s"
+    except Exception as e:
+        status, error = "failed", str(e)
+    duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    JOB_DURATION.labels(job.name, status).observe(duration_ms / 1000)
+
+    if error:
+        logger.error("Scheduled job %s failed after %sms: %s", job.name, duration_ms, error)
+    elif job.history:
+        logger.info("Scheduled job %s (%s) finished in %sms: %s", job.name, trigger, duration_ms, result)
+
+    finished = {
+        "status": status,
+        "finished_at": _utcnow(),
+        "duration_ms": duration_ms,
+        "result": result if isinstance(result, (dict, int, float, str)) else None,
+        "error": error
+    }
+    if job.history:
+        await db[RUNS_COLLECTION].update_one({"_id": run_id}, {"$set": finished})
+        await db[JOBS_COLLECTION].update_one(
+            {"_id": job.name},
+            {"$set": {
+                "last_status": status,
+                "last_finished_at": finished["finished_at"],
+                "last_duration_ms": duration_ms,
+                "last_error": error
+            }},
+            upsert=True
+        )
+    return {"job": job.name, "trigger": trigger, "started_at": started_at, **finished}
+
+
+async def run_job_now(db, name: str, trigger: str = "manual") -> Dict[str, Any]:
+    """Run a registered job immediately in this process (CLI / cron entry points)"""
+    job = JOBS.get(name)
+    if not job:
+        raise KeyError(f"Unknown scheduled job {name}")
+    await db[JOBS_COLLECTION].update_one(
+        {"_id": name}, {"$set": {"last_started_at": _utcnow()}}, upsert=True
+    )
+    return await record_run(db, job, trigger, owner=f"{socket.gethostname()}:{os.getpid()}")
+
+
+async def request_run(db, name: str):
+    """Ask the current leader to run a job at its next tick (coalesces repeated requests)"""
+    await db[JOBS_COLLECTION].update_one(
+        {"_id": name}, {"$set": {"requested_at": _utcnow()}}, upsert=True
+    )
+
+
+async def scheduler_status(db, history: int = 20) -> Dict[str, Any]:
+    """Leader lease, per-job schedule state and the most recent runs"""
+    lock = await db[LOCKS_COLLECTION].find_one({"_id": LEADER_LOCK})
+    states = {doc["_id"]: doc for doc in await db[JOBS_COLLECTION].find({}).to_list(length=None)}
+    jobs = []
+    for job in JOBS.values():
+        state = states.get(job.name, {})
+        jobs.append({
+            "name": job.name,
+            "description": job.description,
+            "interval_seconds": job.interval,
+            "jitter_seconds": job.jitter,
+            "leader_only": job.leader_only,
+            "next_run_at": state.get("next_run_at"),
+            "requested_at": state.get("requested_at"),
+            "last_started_at": state.get("last_started_at"),
+            "last_finished_at": state.get("last_finished_at"),
+            "last_status": state.get("last_status"),
+            "last_duration_ms": state.get("last_duration_ms"),
+            "last_error": state.get("last_error")
+        })
+    runs = await db[RUNS_COLLECTION].find({}).sort("started_at", -1).limit(history).to_list(length=history)
+    return {
+        "leader": {"owner": lock.get("owner"), "expires_at": lock.get("expires_at")} if lock else None,
+        "jobs": jobs,
+        "recent_runs": [{"id": run.pop("_id"), **run} for run in runs]
+    }
+
+
+class Scheduler:
+    """Runs the registered jobs from one worker, competing for the leader lease"""
+
+    def __init__(self, db, jobs: Optional[List[ScheduledJob]] = None,
+                 lease_seconds: float = LEASE_SECONDS, tick_seconds: float = TICK_SECONDS):
+        self.db = db
+        self.jobs = {job.name: job for job in (jobs if jobs is not None else JOBS.values())}
+        self.tick_seconds = tick_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lock = LeaseLock(db[LOCKS_COLLECTION], LEADER_LOCK, self.owner, lease_seconds)
+        self.is_leader = False
+        self._task: Optional[asyncio.Task] = None
+        self._running: Dict[str, asyncio.Task] = {}
+        # Per-worker jobs keep their schedule in memory, staggered by their jitter
+        now = _utcnow()
+        self._local_next_run = {
+            job.name: now + timedelta(seconds=random.uniform(0, job.jitter or job.interval))
+            for job in self.jobs.values() if not job.leader_only
+        }
+
+    def start(self):
+        self._task = asyncio.create_task(self._loop())
+        logger.info("Scheduler started as %s with jobs: %s", self.owner, ", ".join(self.jobs))
+
+    async def stop(self, timeout: float = 10):
+        """Stop ticking, let running jobs finish, run shutdown hooks and give up the lease"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._running:
+            await asyncio.wait(list(self._running.values()), timeout=timeout)
+        for job in self.jobs.values():
+            if job.run_on_shutdown:
+                await record_run(self.db, job, "shutdown", self.owner)
+        if self.is_leader:
+            try:
+                await self.lock.release()
+            except Exception as e:
+                logger.warning("Scheduler could not release the leader lease: %s", e)
+            self.is_leader = False
+
+    async def _loop(self):
+        while True:
+            try:
+                await self._tick()
+            except Exception as e:
+                logger.error("Scheduler tick failed: %s", e)
+            # Small jitter so workers started together do not hit the lock in lockstep
+            await asyncio.sleep(self.tick_seconds + random.uniform(0, self.tick_seconds / 5))
+
+    def _launch(self, job: ScheduledJob, trigger: str):
+        task = asyncio.create_task(record_run(self.db, job, trigger, self.owner))
+        self._running[job.name] = task
+        task.add_done_callback(lambda _: self._running.pop(job.name, None))
+
+    async def _tick(self):
+        now = _utcnow()
+
+        for job in self.jobs.values():
+            if not job.leader_only and job.name not in self._running and now >= self._local_next_run[job.name]:
+                self._local_next_run[job.name] = job.next_run(now)
+                self._launch(job, "schedule")
+
+        leader = await self.lock.acquire()
+        if leader != self.is_leader:
+            logger.info("Scheduler %s %s the leader", self.owner, "became" if leader else "is no longer")
+            self.is_leader = leader
+        if not leader:
+            return
+
+        leader_jobs = [job for job in self.jobs.values() if job.leader_only]
+        states = {
+            doc["_id"]: doc
+            for doc in await self.db[JOBS_COLLECTION].find(
+                {"_id": {"$in": [job.name for job in leader_jobs]}}
+            ).to_list(length=None)
+        }
+
+        for job in leader_jobs:
+            if job.name in self._running:
+                continue
+            state = states.get(job.name, {})
+            next_run_at = _aware(state.get("next_run_at"))
+            requested_at = _aware(state.get("requested_at"))
+            last_started_at = _aware(state.get("last_started_at"))
+
+            if next_run_at is None:
+                # First time this job is seen: schedule it within its jitter window
+                await self.db[JOBS_COLLECTION].update_one(
+                    {"_id": job.name},
+                    {"$set": {"next_run_at": now + timedelta(seconds=random.uniform(0, job.jitter))}},
+                    upsert=True
+                )
+                continue
+
+            requested = requested_at is not None and (last_started_at is None or requested_at > last_started_at)
+            if next_run_at > now and not requested:
+                continue
+
+            # Claim the run before starting it so a leader change cannot start it twice
+            claimed = await self.db[JOBS_COLLECTION].update_one(
+                {"_id": job.name, "next_run_at": state["next_run_at"]},
+                {"$set": {"last_started_at": now, "next_run_at": job.next_run(now)}}
+            )
+            if claimed.matched_count:
+                self._launch(job, "request" if requested and next_run_at > now else "schedule")
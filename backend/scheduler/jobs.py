@@ -0,0 +1,96 @@
+"""
+Scheduled jobs.
+Replaces the archive loop in server.py, job_scheduler.py (midnight sweep per
+worker) and the sitemap/archive cron scripts.
+"""
+from datetime import datetime, timezone
+
+from counters import flush_counters
+from database import secondary
+from deadline_queue import deadline_queue, expired_jobs_query
+from events import JOBS_ARCHIVED, publish
+from job_alerts import close_digests, process_alert_queue
+from job_dedup import job_dedup
+from job_vectors import job_vectors
+from metrics import publish_worker_metrics
+from scheduler.core import scheduled_job
+from similar_jobs import refresh_similar_jobs
+from site_stats import refresh_admin_stats
+from sitemap import refresh_sitemap
+
+
+@scheduled_job("archive_expired_jobs", interval=15 * 60, jitter=60, timeout=300)
+async def archive_expired_jobs(db):
+    """Archive jobs past their application deadline or expiry date (safety net for the deadline queue)"""
+    now = datetime.now(timezone.utc)
+    # One update_many: each $or branch is served by its own date index, nothing is loaded
+    result = await db.jobs.update_many(
+        expired_jobs_query(now),
+        {"$set": {"is_archived": True, "archived_at": now}}
+    )
+    if result.modified_count:
+        await publish(db, JOBS_ARCHIVED, {"count": result.modified_count, "reason": "sweep"})
+    return {"archived": result.modified_count}
+
+
+@scheduled_job("deadline_reload", interval=60, jitter=10, timeout=60, history=False)
+async def deadline_reload(db):
+    """Queue jobs whose deadline falls within the next few minutes"""
+    return await deadline_queue.reload(db)
+
+
+@scheduled_job("sitemap", interval=30 * 60, jitter=120, timeout=600)
+async def sitemap(db):
+    """Rebuild the cached sitemap.xml (the full scan reads from a secondary when there is one)"""
+    return await refresh_sitemap(db, read_db=secondary(db))
+
+
+@scheduled_job("job_alerts", interval=60, jitter=10, timeout=300)
+async def job_alerts(db):
+    """Match newly approved jobs against saved searches; hand finished digests to the mailer"""
+    result = await process_alert_queue(db)
+    result["digests_ready"] = await close_digests(db)
+    return result
+
+
+@scheduled_job("job_vectors", interval=10 * 60, jitter=60, leader_only=False, timeout=600, history=False)
+async def job_vectors_sync(db):
+    """Update this host's job vector index for /ai/match-jobs (one worker per host writes it)"""
+    return await job_vectors.sync(db)
+
+
+@scheduled_job("job_dedup_reload", interval=60, jitter=10, leader_only=False, timeout=120, history=False)
+async def job_dedup_reload(db):
+    """Load MinHash signatures of jobs other workers indexed into this worker's duplicate index"""
+    return await job_dedup.reload(db)
+
+
+@scheduled_job("similar_jobs", interval=10 * 60, jitter=60, timeout=600)
+async def similar_jobs(db):
+    """Neighbour lists for new and edited jobs (and the jobs they now resemble)"""
+    return await refresh_similar_jobs(db)
+
+
+@scheduled_job("similar_jobs_full", interval=24 * 60 * 60, jitter=30 * 60, timeout=3600)
+async def similar_jobs_full(db):
+    """Recompute every job's neighbour list"""
+    return await refresh_similar_jobs(db, full=True)
+
+
+@scheduled_job("stats_refresh", interval=5 * 60, jitter=30, timeout=120)
+async def stats_refresh(db):
+    """Recompute the cached admin dashboard stats"""
+    return await refresh_admin_stats(db)
+
+
+@scheduled_job("counter_flush", interval=10, jitter=5, leader_only=False, timeout=30,
+               history=False, run_on_shutdown=True)
+async def counter_flush(db):
+    """Write this worker's buffered view counts"""
+    return await flush_counters(db)
+
+
+@scheduled_job("metrics_publish", interval=15, jitter=3, leader_only=False, timeout=15, history=False)
+async def metrics_publish(db):
+    """Share this worker's metrics so /metrics on any worker covers all of them"""
+    return await publish_worker_metrics(db)
@@ -1,18 +1,21 @@
 from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Form, Header, Request, Query, BackgroundTasks
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import Response, PlainTextResponse, RedirectResponse, HTMLResponse, FileResponse
+from fastapi.responses import Response, PlainTextResponse, RedirectResponse, HTMLResponse, FileResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.staticfiles import StaticFiles
-from fastapi.middleware.gzip import GZipMiddleware
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response as StarletteResponse
-from motor.motor_asyncio import AsyncIOMotorClient
 import hashlib
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 import pymongo
 import asyncio
+import importlib.util
+from contextlib import asynccontextmanager
+from functools import lru_cache
+import time
 from datetime import datetime, timedelta, timezone
 import os
 import logging
@@ -20,10 +23,39 @@ import jwt
 import uuid
 import json
 import xml.etree.ElementTree as ET
-import subprocess
 from io import BytesIO
-from PIL import Image
 import base64
+from ai_cache import ai_cache_stats, cached_completion
+from app_logging import RequestIdMiddleware, setup_logging
+from ai_gateway import ai_gateway, client_ip
+from blog_search import BLOG_SORTS, search_blog_posts
+from config import AI_MODEL, AI_PROVIDER, DUPLICATE_JOB_POLICY
+from boot_tasks import run_boot_tasks
+from migrations import MIGRATIONS, run_migration
+from scheduler import Scheduler, request_run, run_job_now, scheduler_status, JOBS as SCHEDULED_JOBS
+from sitemap import get_sitemap_xml as get_cached_sitemap_xml
+from site_stats import get_admin_stats as get_cached_admin_stats
+from counters import job_views
+from db_profiler import ProfilingMiddleware, profiler
+from loop_watchdog import WATCHDOG_ENABLED, LoopWatchdogMiddleware, loop_watchdog
+from tracing import CLIENT, TracingMiddleware, exporter as trace_exporter, span, traced
+from metrics import AI_LATENCY, MetricsMiddleware, collect_metrics, monitor_loop_lag
+from deadline_queue import deadline_queue
+from events import JOB_ARCHIVED, JOBS_ARCHIVED, subscribe
+from categories import CATEGORY_DB_MAPPING, TITLE_BASED_CATEGORIES
+from job_alerts import SAVED_SEARCHES_COLLECTION, enqueue_job, save_search
+from job_vectors import ACTIVE_JOBS, job_vectors, order_by_ids
+from similar_jobs import similar_job_cards
+from job_dedup import DUPLICATE_POLICIES, find_duplicate, job_dedup, scan_duplicates
+from chat_log import CHAT_MESSAGES_COLLECTION, CHAT_SESSIONS_COLLECTION, chat_log
+
+# JSON records through a queue: handlers only enqueue, a listener thread writes stdout (app_logging.py)
+setup_logging()
+logger = logging.getLogger(__name__)
+from job_cards import (
+    CARD_FIELDS, MAX_BATCH_IDS, build_card, find_cards, find_job_fields, find_jobs_by_keys, parse_fields
+)
+from slug_allocator import generate_slug, allocate_slug, insert_with_unique_slug, update_with_unique_slug
 
 # Load environment variables
 from pathlib import Path
@@ -31,6 +63,7 @@ ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # Helper function to compress base64 images for thumbnails
+@traced("image.compress")
 def compress_base64_image(base64_string: str, max_width: int = 400, quality: int = 60) -> str:
     """
     Compress a base64 image to create a smaller thumbnail.
@@ -44,7 +77,8 @@ def compress_base64_image(base64_string: str, max_width: int = 400, quality: int
         header, data = base64_string.split(',', 1)
         mime_type = header.split(':')[1].split(';')[0]
         
-        # Decode base64 to image
+        # Decode base64 to image (PIL is imported on first use to keep startup fast)
+        from PIL import Image
         image_data = base64.b64decode(data)
         image = Image.open(BytesIO(image_data))
         
@@ -90,42 +124,37 @@ def sanitize_filename(filename):
     # Reconstruct filename
     return f"{name}.{ext}" if ext else name
 
-# MongoDB connection
-import ssl
-mongo_url = os.environ['MONGO_URL']
-# Configure SSL/TLS for MongoDB Atlas with optimized settings
-client = AsyncIOMotorClient(
-    mongo_url,
-    tlsAllowInvalidCertificates=True,
-    serverSelectionTimeoutMS=60000,
-    connectTimeoutMS=60000,
-    socketTimeoutMS=60000,
-    maxPoolSize=50,
-    minPoolSize=10,
-    maxIdleTimeMS=45000,
-    retryWrites=True,
-    retryReads=True
-)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection, shared with the scheduler and scripts (see database.py):
+# db for writes and read-your-writes, read_db (secondaryPreferred) for public listing/search reads
+from database import client, db, read_db
+
+# Background scheduler (leader-elected, started on app startup)
+scheduler = Scheduler(db)
+
+# Keep references to fire-and-forget tasks so they are not garbage collected
+_background_tasks = set()
 
 # Helper function to regenerate sitemap
 def regenerate_sitemap_async():
-    """Trigger sitemap regeneration in background"""
+    """Ask the scheduler leader to rebuild the cached sitemap at its next tick"""
     try:
-        print("🔄 Triggering sitemap regeneration...")
-        result = subprocess.Popen(
-            ['python3', '/app/backend/update_sitemap.py'],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        print(f"✓ Sitemap regeneration triggered (PID: {result.pid})")
+        task = asyncio.get_running_loop().create_task(request_run(db, "sitemap"))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
     except Exception as e:
-        print(f"❌ Failed to regenerate sitemap: {e}")
-        logger.error(f"Failed to regenerate sitemap: {e}")
+        logger.error("Failed to request sitemap regeneration: %s", e)
+
+# Jobs archived at their deadline (or by the sweep) drop out of the sitemap
+async def _on_jobs_archived(payload: Dict[str, Any]):
+    regenerate_sitemap_async()
+
+subscribe(JOB_ARCHIVED, _on_jobs_archived)
+subscribe(JOBS_ARCHIVED, _on_jobs_archived)
 
 # Meta Tag Injection Middleware removed - app now uses pure client-side rendering
 
 # Helper function for background thumbnail updates
+@traced("background.update_thumbnails")
 async def update_thumbnails_bg(posts_to_update: List[Dict]):
     """Update thumbnails in background to not block response"""
     if not posts_to_update:
@@ -140,10 +169,8 @@ async def update_thumbnails_bg(posts_to_update: List[Dict]):
         except Exception as e:
             logging.error(f"Failed to cache thumbnail for {item['id']}: {e}")
 
-# Create the main app
-app = FastAPI(title="HealthCare Jobs API", version="1.0.0")
-
-
+# Routes outside the /api prefix (robots.txt, sitemaps, metrics, SEO meta); the app itself is built by create_app()
+site_router = APIRouter()
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -179,14 +206,15 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 security = HTTPBearer()
 
-# AI Integration
-try:
-    from emergentintegrations.llm.chat import LlmChat, UserMessage
-    AI_ENABLED = True
-except ImportError:
-    AI_ENABLED = False
+# AI Integration (the package is imported on the first AI request; it loads the LLM SDKs)
+AI_ENABLED = importlib.util.find_spec("emergentintegrations") is not None
+if not AI_ENABLED:
     print("AI integration not available")
 
+def UserMessage(**kwargs):
+    from emergentintegrations.llm.chat import UserMessage as LlmUserMessage
+    return LlmUserMessage(**kwargs)
+
 # Models
 class UserRole(str):
     JOB_SEEKER = "job_seeker"
@@ -240,6 +268,46 @@ class Job(BaseModel):
     application_count: int = 0
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     expires_at: Optional[datetime] = None
+    duplicate_of: Optional[str] = None  # Near-duplicate of this job, flagged at posting time (job_dedup.py)
+
+class JobCard(BaseModel):
+    """Compact job for list pages (built from the stored card, see job_cards.py)"""
+    id: str
+    slug: Optional[str] = None
+    title: str
+    company: str
+    location: str
+    salary: Optional[str] = None  # Display string, e.g. "₹30000 - ₹50000" or "Negotiable"
+    job_type: str = "full_time"
+    categories: List[str] = []
+    created_at: datetime
+    is_archived: bool = False
+    snippet: str = ""  # Plain-text start of the description
+    requirements: List[str] = []  # First few requirements
+    requirements_count: int = 0
+
+class JobCardPage(BaseModel):
+    jobs: List[JobCard]
+    total: int
+    skip: int
+    limit: int
+    page: int
+    total_pages: int
+    has_more: bool
+
+# Names accepted by ?fields= on the job list endpoints
+JOB_FIELDS = set(Job.model_fields) | set(CARD_FIELDS)
+
+def parse_job_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """?fields=title,company,salary -> field list (None if not given)"""
+    try:
+        return parse_fields(fields, JOB_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def sparse_response(content) -> JSONResponse:
+    # Partial jobs do not satisfy the endpoint's response model, so skip its validation
+    return JSONResponse(jsonable_encoder(content))
 
 # Enhanced User Profile Model
 class UserProfile(BaseModel):
@@ -434,6 +502,7 @@ class BlogPostSummary(BaseModel):
     is_featured: bool = False
     created_at: datetime
     published_at: Optional[datetime] = None
+    highlight: Optional[str] = None  # Excerpt with <mark>ed search terms (search results only)
 
 class BlogPostCreate(BaseModel):
     title: str
@@ -460,6 +529,7 @@ class SEOSettings(BaseModel):
 class AIRequest(BaseModel):
     text: str
     job_id: Optional[str] = None
+    session_id: Optional[str] = None  # Conversation id sent by the chat widget
 
 class Token(BaseModel):
     access_token: str
@@ -491,78 +561,9 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     return encoded_jwt
 
 
-def generate_slug(title: str, company: str = None, location: str = None, job_id: str = None) -> str:
-    """Generate SEO-friendly slug from job title, company, location, and job ID"""
-    import re
-    
-    def clean_text(text: str, max_length: int = None) -> str:
-        """Clean and convert text to slug format"""
-        if not text:
-            return ""
-        # Convert to lowercase
-        text = text.lower()
-        # Remove special characters, keep only alphanumeric, spaces, and hyphens
-        text = re.sub(r'[^a-z0-9\s-]', '', text)
-        # Replace spaces and multiple hyphens with single hyphen
-        text = re.sub(r'[\s-]+', '-', text)
-        # Remove leading/trailing hyphens
-        text = text.strip('-')
-        
-        # Truncate if too long
-        if max_length and len(text) > max_length:
-            text = text[:max_length].rsplit('-', 1)[0]  # Cut at word boundary
-        
-        return text
-    
-    # Clean each component with length limits
-    title_slug = clean_text(title, max_length=80)  # Max 80 chars for title
-    company_slug = clean_text(company, max_length=50) if company else ""  # Max 50 for company
-    location_slug = clean_text(location, max_length=40) if location else ""  # Max 40 for location
-    
-    # Build slug in format: [job-name]-job-at-[company-name]-in-[location]-[id]
-    slug_parts = [title_slug]
-    
-    if company_slug:
-        slug_parts.extend(["job-at", company_slug])
-    
-    if location_slug:
-        slug_parts.extend(["in", location_slug])
-    
-    # Add job ID at the end for uniqueness (first 8 characters)
-    if job_id:
-        slug_parts.append(job_id[:8])
-    
-    slug = "-".join(slug_parts)
-    
-    # Ensure slug is not empty and not too long (max 200 chars total)
-    if not slug:
-        slug = f"job-{job_id[:8]}" if job_id else "job"
-    elif len(slug) > 200:
-        slug = slug[:200].rsplit('-', 1)[0]  # Truncate at word boundary
-        # Re-add the ID at the end after truncation
-        if job_id:
-            slug = f"{slug}-{job_id[:8]}"
-    
-    return slug
-
 async def ensure_unique_slug(base_slug: str, job_id: str = None) -> str:
-    """Ensure slug is unique by appending number if necessary"""
-    slug = base_slug
-    counter = 1
-    
-    while True:
-        # Check if slug exists (excluding current job if updating)
-        query = {"slug": slug}
-        if job_id:
-            query["id"] = {"$ne": job_id}
-        
-        existing = await db.jobs.find_one(query)
-        if not existing:
-            return slug
-        
-        # Slug exists, append counter
-        slug = f"{base_slug}-{counter}"
-        counter += 1
+    """Ensure slug is unique by appending the next free number if necessary (single indexed query)"""
+    return await allocate_slug(db.jobs, base_slug, exclude_id=job_id)
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
@@ -599,19 +600,51 @@ async def get_current_user_optional(authorization: str = None):
     except:
         return None
 
+@lru_cache(maxsize=1)
+def _llm_chat_class():
+    from emergentintegrations.llm.chat import LlmChat
+    return LlmChat
+
 async def get_ai_chat():
     if not AI_ENABLED:
         raise HTTPException(status_code=503, detail="AI service not available")
+    try:
+        LlmChat = _llm_chat_class()
+    except ImportError:
+        raise HTTPException(status_code=503, detail="AI service not available")
     
     api_key = os.environ.get('EMERGENT_LLM_KEY')
     if not api_key:
         raise HTTPException(status_code=503, detail="AI API key not configured")
     
+    # LlmChat keeps the conversation in the instance, so every request gets its own
+    # (a cheap object; the HTTP connections underneath are pooled by the LLM client library)
     return LlmChat(
         api_key=api_key,
         session_id=f"healthcare_jobs_{uuid.uuid4()}",
         system_message="You are an AI assistant for a healthcare job platform. Help with job matching, resume analysis, interview preparation, and lead generation. Be professional and helpful."
-    ).with_model("openai", "gpt-4o-mini")
+    ).with_model(AI_PROVIDER, AI_MODEL)
+
+async def send_ai_message(chat, message, endpoint: str, ip: Optional[str] = None):
+    """
+    chat.send_message through the AI gateway (concurrency limit, single-flight, timeout),
+    timed into the ai_request_duration_seconds metric
+    """
+    async def call():
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            with span("ai.send_message", CLIENT, **{"ai.endpoint": endpoint, "ai.model": AI_MODEL}):
+                response = await chat.send_message(message)
+            outcome = "ok"
+            return response
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            AI_LATENCY.labels(endpoint, outcome).observe(time.perf_counter() - started)
+    
+    return await ai_gateway.call(endpoint, message.text, call, ip=ip)
 
 # Authentication Routes
 @api_router.post("/auth/register", response_model=Token)
@@ -622,7 +655,8 @@ async def register(user_data: UserCreate):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create user
-    hashed_password = hash_password(user_data.password)
+    # bcrypt is deliberately slow (~100-250 ms); keep it off the event loop
+    hashed_password = await asyncio.to_thread(hash_password, user_data.password)
     user = User(**user_data.dict(exclude={'password', 'phone'}))
     user_dict = user.dict()
     user_dict['hashed_password'] = hashed_password
@@ -657,7 +691,7 @@ async def register(user_data: UserCreate):
             
             await db.job_seekers.insert_one(profile_dict)
         except Exception as e:
-            print(f"Error creating job seeker profile during registration: {e}")
+            logger.error("Error creating job seeker profile during registration: %s", e)
     
     # Create token
     access_token = create_access_token(
@@ -670,7 +704,7 @@ async def register(user_data: UserCreate):
 async def login(user_data: UserLogin):
     # Check if user exists and password is correct
     user = await db.users.find_one({"email": user_data.email})
-    if not user or not verify_password(user_data.password, user['hashed_password']):
+    if not user or not await asyncio.to_thread(verify_password, user_data.password, user['hashed_password']):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Create or update job seeker profile for registered users
@@ -734,7 +768,7 @@ async def login(user_data: UserLogin):
             
         except Exception as e:
             # Log error but don't fail login
-            print(f"Error creating job seeker profile on login: {e}")
+            logger.error("Error creating job seeker profile on login: %s", e)
     
     # Create access token
     access_token = create_access_token(
@@ -765,13 +799,27 @@ async def create_job(job_data: JobCreate, current_user: User = Depends(get_curre
     
     # Generate unique slug from title, company, location, and job ID
     base_slug = generate_slug(job.title, job.company, job.location, job.id)
-    job.slug = await ensure_unique_slug(base_slug, job.id)
     
     job_dict = job.dict()
     # Keep datetime objects as-is for MongoDB - do NOT convert to isoformat
     # MongoDB natively supports datetime objects and the app expects them for proper sorting
     
-    await db.jobs.insert_one(job_dict)
+    # Near-duplicate of a live job: posted anyway, flagged for the admins
+    duplicate = await find_duplicate(db, job_dict)
+    if duplicate:
+        job.duplicate_of = job_dict["duplicate_of"] = duplicate["id"]
+        logger.warning("Job '%s' looks like a duplicate of %s (%.0f%% similar)", job.title, duplicate['id'],
+                       duplicate['similarity'] * 100, extra={"job_id": job.id})
+    
+    # Compact form read by the list endpoints
+    job_dict["card"] = build_card(job_dict)
+    
+    # Insert-and-retry on the unique slug index so concurrent posts never share a slug
+    job.slug = await insert_with_unique_slug(db.jobs, job_dict, base_slug)
+    await job_dedup.index_job(db, job_dict)
+    
+    # Archive at its deadline
+    deadline_queue.track(job_dict)
     
     # Auto-regenerate sitemap after new job
     regenerate_sitemap_async()
@@ -779,19 +827,21 @@ async def create_job(job_data: JobCreate, current_user: User = Depends(get_curre
     return job
 
 
-@api_router.get("/jobs/search")
+@api_router.get("/jobs/search", response_model=JobCardPage)
 async def search_jobs(
     q: Optional[str] = Query(None, description="Search term for title, company, or location"),
     category: Optional[str] = Query(None, description="Category filter"),
     job_type: Optional[str] = Query(None, description="Job type filter"),
     location: Optional[str] = Query(None, description="Location filter"),
     skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma-separated job fields to return instead of cards")
 ):
     """
     Search jobs with server-side filtering and pagination.
-    Returns jobs list, total count, and metadata.
+    Returns job cards (or the requested fields), total count, and metadata.
     """
+    selected = parse_job_fields(fields)
     try:
         # Build query
         query = {
@@ -842,36 +892,17 @@ async def search_jobs(
             query["location"] = {"$regex": location, "$options": "i"}
 
         # Get total count
-        total_count = await db.jobs.count_documents(query)
+        total_count = await read_db.jobs.count_documents(query)
         
         # Get data
         # Sort by created_at desc, archived last
-        cursor = db.jobs.find(query).sort([("created_at", -1), ("is_archived", 1)]).skip(skip).limit(limit)
-        jobs = await cursor.to_list(length=None)
-        
-        # Serialize
-        result_jobs = []
-        for job in jobs:
-            try:
-                # Handle dates and serialization same as get_jobs
-                if isinstance(job.get('created_at'), str):
-                    job['created_at'] = datetime.fromisoformat(job['created_at'])
-                if job.get('expires_at') and isinstance(job.get('expires_at'), str):
-                    job['expires_at'] = datetime.fromisoformat(job['expires_at'])
-                if job.get('application_deadline') and isinstance(job.get('application_deadline'), str):
-                    job['application_deadline'] = datetime.fromisoformat(job['application_deadline'])
-                    
-                if job.get('salary_min') is not None and isinstance(job.get('salary_min'), int):
-                    job['salary_min'] = str(job['salary_min'])
-                if job.get('salary_max') is not None and isinstance(job.get('salary_max'), int):
-                    job['salary_max'] = str(job['salary_max'])
-                    
-                result_jobs.append(Job(**job))
-            except Exception as e:
-                print(f"[ERROR] Serialization error for job {job.get('id')}: {e}")
-                continue
+        sort = [("created_at", -1), ("is_archived", 1)]
+        if selected:
+            result_jobs = await find_job_fields(read_db.jobs, query, sort, skip, limit, selected)
+        else:
+            result_jobs = await find_cards(read_db.jobs, query, sort, skip, limit)
 
-        return {
+        page = {
             "jobs": result_jobs,
             "total": total_count,
             "skip": skip,
@@ -880,16 +911,18 @@ async def search_jobs(
             "total_pages": (total_count + limit - 1) // limit,
             "has_more": (skip + limit) < total_count
         }
+        return sparse_response(page) if selected else page
 
     except Exception as e:
-        print(f"[ERROR] search_jobs failed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("search_jobs failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@api_router.get("/jobs", response_model=List[Job])
-async def get_jobs(skip: int = 0, limit: int = 20, approved_only: bool = True, category: str = None, summary: bool = False):
+@api_router.get("/jobs", response_model=Union[List[Job], List[JobCard]])
+async def get_jobs(skip: int = 0, limit: int = 20, approved_only: bool = True, category: str = None, summary: bool = False,
+                   fields: Optional[str] = None):
+    """Jobs, newest first; summary=true returns compact job cards (list pages), fields=a,b only those fields"""
+    selected = parse_job_fields(fields)
     try:
         query = {"is_approved": True, "is_deleted": {"$ne": True}} if approved_only else {"is_deleted": {"$ne": True}}
         
@@ -897,21 +930,21 @@ async def get_jobs(skip: int = 0, limit: int = 20, approved_only: bool = True, c
         if category:
             query["categories"] = category
 
-        # Projection for summary mode
-        projection = {"_id": 0}
-        if summary:
-            # Exclude heavy fields
-            projection.update({
-                # "description": 0,  # Required by Job model & Frontend
-                # "requirements": 0, # Required by Job model & Frontend
-                "benefits": 0,
-                "content": 0 # Just in case
-            })
+        projection = {"_id": 0, "card": 0}
         
+        # Public listings can be served by a secondary; the unapproved listing stays on the primary
+        source = read_db if approved_only else db
+
         # Sort: By created_at descending (newest first), then archived jobs at end
-        jobs = await db.jobs.find(query, projection).sort([("created_at", -1), ("is_archived", 1)]).skip(skip).limit(limit).to_list(length=None)
+        if selected:
+            return sparse_response(await find_job_fields(source.jobs, query, [("created_at", -1), ("is_archived", 1)],
+                                                         skip, limit, selected))
+        if summary:
+            cards = await find_cards(source.jobs, query, [("created_at", -1), ("is_archived", 1)], skip, limit)
+            return [JobCard(**card) for card in cards]
+        jobs = await source.jobs.find(query, projection).sort([("created_at", -1), ("is_archived", 1)]).skip(skip).limit(limit).to_list(length=None)
         
-        print(f"[DEBUG] Found {len(jobs)} jobs from database")
+        logger.debug("get_jobs: %d jobs from database", len(jobs))
         
         result_jobs = []
         for job in jobs:
@@ -934,42 +967,17 @@ async def get_jobs(skip: int = 0, limit: int = 20, approved_only: bool = True, c
                 job_instance = Job(**job)
                 result_jobs.append(job_instance)
             except Exception as e:
-                print(f"[ERROR] Failed to serialize job {job.get('id', 'unknown')}: {e}")
-                print(f"[ERROR] Job fields: {list(job.keys())}")
+                logger.error("Failed to serialize job %s: %s", job.get('id', 'unknown'), e,
+                             extra={"fields": list(job.keys())})
                 continue
         
-        print(f"[DEBUG] Successfully serialized {len(result_jobs)} jobs")
+        logger.debug("get_jobs: serialized %d jobs", len(result_jobs))
         return result_jobs
     except Exception as e:
-        print(f"[ERROR] get_jobs endpoint failed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("get_jobs failed")
         raise HTTPException(status_code=500, detail=f"Failed to fetch jobs: {str(e)}")
 
 
-# Map URL slugs to database category values
-CATEGORY_DB_MAPPING = {
-    "doctor": ["doctors", "doctor"],  # DB has "doctors" (plural)
-    "nursing": ["nurses", "nursing"],  # DB has "nurses" (plural)
-    "pharmacy": ["pharmacy", "pharmacists"],
-    "dentist": ["dentist", "dentists"],
-    "physiotherapy": ["physiotherapy", "physiotherapists"],
-    "medical-lab-technician": ["medical-lab-technician"],
-    "medical-science-liaison": ["medical-science-liaison"],
-    "pharmacovigilance": ["pharmacovigilance"],
-    "clinical-research": ["clinical-research"],
-    "non-clinical-jobs": ["non-clinical-jobs", "all"]
-}
-
-# Categories that should filter by job title instead of category field
-TITLE_BASED_CATEGORIES = {
-    "medical-lab-technician": ["medical lab technician", "mlt", "lab technician"],
-    "medical-science-liaison": ["medical science liaison", "msl"],
-    "pharmacovigilance": ["pharmacovigilance", "drug safety", "pv specialist", "pv associate"],
-    "clinical-research": ["clinical research", "clinical trial", "cra", "crc", "clinical data"],
-    "non-clinical-jobs": ["non clinical", "admin", "hr", "manager", "operations", "marketing"]
-}
-
 # Category metadata mapping
 CATEGORY_METADATA = {
     "doctor": {
@@ -1045,7 +1053,7 @@ async def get_all_categories():
             # Filter by job title keywords
             title_keywords = TITLE_BASED_CATEGORIES[slug]
             title_regex = "|".join(title_keywords)
-            count = await db.jobs.count_documents({
+            count = await read_db.jobs.count_documents({
                 "title": {"$regex": title_regex, "$options": "i"},
                 "is_approved": True,
                 "is_deleted": {"$ne": True}
@@ -1053,7 +1061,7 @@ async def get_all_categories():
         else:
             # Count jobs in this category using DB mapping
             db_categories = CATEGORY_DB_MAPPING.get(slug, [slug])
-            count = await db.jobs.count_documents({
+            count = await read_db.jobs.count_documents({
                 "categories": {"$in": db_categories},
                 "is_approved": True,
                 "is_deleted": {"$ne": True}
@@ -1079,9 +1087,11 @@ async def get_category_jobs(
     job_type: str = Query(None),
     experience: str = Query(None),
     salary_min: int = Query(None),
-    salary_max: int = Query(None)
+    salary_max: int = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated job fields to return instead of cards")
 ):
     """Get jobs for a specific category with filters and pagination"""
+    selected = parse_job_fields(fields)
     
     # Validate category exists
     if category_slug not in CATEGORY_METADATA:
@@ -1123,23 +1133,14 @@ async def get_category_jobs(
         query["salary_max"] = salary_query
     
     # Get total count for pagination
-    total_count = await db.jobs.count_documents(query)
+    total_count = await read_db.jobs.count_documents(query)
     
-    # Get jobs
-    jobs = await db.jobs.find(query).sort([("created_at", -1), ("is_archived", 1)]).skip(skip).limit(limit).to_list(length=None)
-    
-    # Process jobs
-    for job in jobs:
-        if isinstance(job.get('created_at'), str):
-            job['created_at'] = datetime.fromisoformat(job['created_at'])
-        if job.get('expires_at') and isinstance(job.get('expires_at'), str):
-            job['expires_at'] = datetime.fromisoformat(job['expires_at'])
-        
-        # Convert integer salaries to strings
-        if job.get('salary_min') is not None and isinstance(job.get('salary_min'), int):
-            job['salary_min'] = str(job['salary_min'])
-        if job.get('salary_max') is not None and isinstance(job.get('salary_max'), int):
-            job['salary_max'] = str(job['salary_max'])
+    # Get job cards (or just the requested fields)
+    sort = [("created_at", -1), ("is_archived", 1)]
+    if selected:
+        jobs = await find_job_fields(read_db.jobs, query, sort, skip, limit, selected)
+    else:
+        jobs = [JobCard(**job) for job in await find_cards(read_db.jobs, query, sort, skip, limit)]
     
     # Get category metadata with dynamic count
     metadata = CATEGORY_METADATA[category_slug].copy()
@@ -1153,19 +1154,40 @@ async def get_category_jobs(
             "name": metadata["name"],
             **metadata
         },
-        "jobs": [Job(**job) for job in jobs],
+        "jobs": jobs,
         "total_count": total_count,
         "page": skip // limit + 1,
         "total_pages": (total_count + limit - 1) // limit,
         "has_more": skip + limit < total_count
     }
 
+@api_router.get("/jobs/batch")
+async def get_jobs_batch(
+    ids: str = Query(..., description=f"Comma-separated job ids or slugs (at most {MAX_BATCH_IDS})"),
+    fields: Optional[str] = Query(None, description="Comma-separated job fields to return instead of cards")
+):
+    """Several jobs in one query (saved jobs, applications, related jobs), in the order requested"""
+    keys = list(dict.fromkeys(key.strip() for key in ids.split(",") if key.strip()))
+    if not keys:
+        raise HTTPException(status_code=400, detail="No job ids given")
+    if len(keys) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    selected = parse_job_fields(fields)
+    
+    jobs, missing = await find_jobs_by_keys(read_db.jobs, keys, selected)
+    if not selected:
+        jobs = [JobCard(**job) for job in jobs]
+    return {"jobs": jobs, "missing": missing}
+
 @api_router.get("/jobs/{job_identifier}")
 async def get_job(job_identifier: str, authorization: str = Header(None)):
     # Try to find by slug first, then by ID (backward compatibility)
-    job = await db.jobs.find_one({"slug": job_identifier, "is_deleted": {"$ne": True}})
-    if not job:
-        job = await db.jobs.find_one({"id": job_identifier, "is_deleted": {"$ne": True}})
+    with span("job.lookup") as lookup:
+        job = await db.jobs.find_one({"slug": job_identifier, "is_deleted": {"$ne": True}})
+        if not job:
+            if lookup:
+                lookup.set("job.slug_miss", True)
+            job = await db.jobs.find_one({"id": job_identifier, "is_deleted": {"$ne": True}})
     
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -1183,23 +1205,29 @@ async def get_job(job_identifier: str, authorization: str = Header(None)):
     
     # Check if user has applied for this job (for logged-in users)
     has_applied = False
-    current_user = await get_current_user_optional(authorization)
+    with span("job.current_user"):
+        current_user = await get_current_user_optional(authorization)
     
     if current_user:
-        # Check in applications collection
-        existing_application = await db.applications.find_one({
-            "job_id": job['id'],
-            "applicant_id": current_user.id
-        })
-        # Also check in job_leads collection (for users who applied before logging in)
-        existing_lead = await db.job_leads.find_one({
-            "job_id": job['id'],
-            "email": current_user.email
-        })
-        has_applied = bool(existing_application or existing_lead)
+        with span("job.has_applied"):
+            # Check in applications collection
+            existing_application = await db.applications.find_one({
+                "job_id": job['id'],
+                "applicant_id": current_user.id
+            })
+            # Also check in job_leads collection (for users who applied before logging in)
+            existing_lead = await db.job_leads.find_one({
+                "job_id": job['id'],
+                "email": current_user.email
+            })
+            has_applied = bool(existing_application or existing_lead)
     
-    job_response = Job(**job).dict()
+    with span("job.serialize"):
+        job_response = Job(**job).dict()
     job_response['has_applied'] = has_applied
+    # Related jobs: the precomputed neighbour list, read as cards with one $in
+    with span("job.similar_jobs"):
+        job_response['similar_jobs'] = [JobCard(**card).dict() for card in await similar_job_cards(read_db.jobs, job)]
     return job_response
 
 # Job Application Routes
@@ -1207,25 +1235,37 @@ async def get_job(job_identifier: str, authorization: str = Header(None)):
 
 # AI Routes
 @api_router.post("/ai/enhance-job-description")
-async def enhance_job_description(request: AIRequest, current_user: User = Depends(get_current_user)):
+async def enhance_job_description(request: AIRequest, refresh: bool = False, current_user: User = Depends(get_current_user)):
     if current_user.role not in [UserRole.EMPLOYER, UserRole.ADMIN]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    chat = await get_ai_chat()
-    
-    message = UserMessage(
-        text=f"Please enhance this healthcare job description to be more attractive and comprehensive: {request.text}"
-    )
+    async def generate():
+        chat = await get_ai_chat()
+        message = UserMessage(
+            text=f"Please enhance this healthcare job description to be more attractive and comprehensive: {request.text}"
+        )
+        return await send_ai_message(chat, message, "enhance-job-description")
     
-    response = await chat.send_message(message)
+    # Same description, same answer: served from the AI cache unless ?refresh=true
+    response = await cached_completion(db, "enhance-job-description", request.text, generate, refresh=refresh)
     return {"enhanced_description": response}
 
 @api_router.post("/ai/match-jobs")
 async def match_jobs(request: AIRequest, current_user: User = Depends(get_current_user)):
     chat = await get_ai_chat()
     
-    # Get available jobs
-    jobs = await db.jobs.find({"is_approved": True}).limit(10).to_list(length=None)
+    # The 10 active jobs closest to the profile (local vector index); newest jobs until it is built
+    projection = {"_id": 0, "id": 1, "title": 1, "company": 1, "description": 1}
+    matches = await asyncio.to_thread(job_vectors.search, request.text, 10)
+    if matches:
+        # The index lags edits by up to a sync interval: drop jobs archived or deleted since
+        ids = [job_id for job_id, _ in matches]
+        found = await read_db.jobs.find({"id": {"$in": ids}, **ACTIVE_JOBS}, projection).to_list(length=None)
+        jobs = order_by_ids(found, ids)
+    else:
+        jobs = await read_db.jobs.find(
+            {"is_approved": True, "is_deleted": {"$ne": True}}, projection
+        ).sort([("created_at", -1), ("is_archived", 1)]).limit(10).to_list(length=None)
     jobs_text = "\n".join([f"Job {i+1}: {job['title']} at {job['company']} - {job['description'][:200]}..." 
                           for i, job in enumerate(jobs)])
     
@@ -1233,7 +1273,7 @@ async def match_jobs(request: AIRequest, current_user: User = Depends(get_curren
         text=f"Based on this candidate profile: {request.text}\n\nHere are available healthcare jobs:\n{jobs_text}\n\nPlease recommend the top 3 most suitable jobs and explain why they match."
     )
     
-    response = await chat.send_message(message)
+    response = await send_ai_message(chat, message, "match-jobs")
     return {"recommendations": response}
 
 @api_router.post("/ai/analyze-resume")
@@ -1244,21 +1284,22 @@ async def analyze_resume(request: AIRequest, current_user: User = Depends(get_cu
         text=f"Please analyze this healthcare professional's resume and provide feedback on strengths, areas for improvement, and healthcare job recommendations: {request.text}"
     )
     
-    response = await chat.send_message(message)
+    response = await send_ai_message(chat, message, "analyze-resume")
     return {"analysis": response}
 
 @api_router.post("/ai/generate-interview-questions")
-async def generate_interview_questions(request: AIRequest, current_user: User = Depends(get_current_user)):
+async def generate_interview_questions(request: AIRequest, refresh: bool = False, current_user: User = Depends(get_current_user)):
     if current_user.role not in [UserRole.EMPLOYER, UserRole.ADMIN]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    chat = await get_ai_chat()
-    
-    message = UserMessage(
-        text=f"Generate 10 relevant interview questions for this healthcare job position: {request.text}"
-    )
+    async def generate():
+        chat = await get_ai_chat()
+        message = UserMessage(
+            text=f"Generate 10 relevant interview questions for this healthcare job position: {request.text}"
+        )
+        return await send_ai_message(chat, message, "generate-interview-questions")
     
-    response = await chat.send_message(message)
+    response = await cached_completion(db, "generate-interview-questions", request.text, generate, refresh=refresh)
     return {"questions": response}
 
 # AI Job Enhancement Routes for Admin CMS
@@ -1285,69 +1326,65 @@ async def enhance_job_description(request: AIRequest, current_user: User = Depen
         Keep it professional but engaging, around 150-300 words."""
     )
     
-    response = await chat.send_message(message)
+    response = await send_ai_message(chat, message, "enhance-job-description")
     return {"enhanced_description": response}
 
 @api_router.post("/ai/suggest-job-requirements")
-async def suggest_job_requirements(request: AIRequest, current_user: User = Depends(get_current_user)):
+async def suggest_job_requirements(request: AIRequest, refresh: bool = False, current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    chat = await get_ai_chat()
-    
-    message = UserMessage(
-        text=f"""Based on this healthcare job title and description, suggest comprehensive job requirements including:
-        - Educational qualifications
-        - Professional certifications
-        - Years of experience needed
-        - Technical skills
-        - Soft skills
-        - Any specialty-specific requirements
-        
-        Job Details: {request.text}
-        
-        Please provide a list of 5-8 specific, realistic requirements for this healthcare position."""
-    )
+    async def generate():
+        chat = await get_ai_chat()
+        message = UserMessage(
+            text=f"""Based on this healthcare job title and description, suggest comprehensive job requirements including:
+            - Educational qualifications
+            - Professional certifications
+            - Years of experience needed
+            - Technical skills
+            - Soft skills
+            - Any specialty-specific requirements
+            
+            Job Details: {request.text}
+            
+            Please provide a list of 5-8 specific, realistic requirements for this healthcare position."""
+        )
+        return await send_ai_message(chat, message, "suggest-job-requirements")
     
-    response = await chat.send_message(message)
+    response = await cached_completion(db, "suggest-job-requirements", request.text, generate, refresh=refresh)
     return {"suggested_requirements": response}
 
 @api_router.post("/ai/suggest-job-benefits")
-async def suggest_job_benefits(request: AIRequest, current_user: User = Depends(get_current_user)):
+async def suggest_job_benefits(request: AIRequest, refresh: bool = False, current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    chat = await get_ai_chat()
-    
-    message = UserMessage(
-        text=f"""Suggest attractive and competitive benefits for this healthcare position. Consider the role level, location, and industry standards:
-        
-        Job Details: {request.text}
-        
-        Please suggest 6-10 benefits that would be attractive to healthcare professionals, including:
-        - Healthcare and insurance benefits
-        - Professional development opportunities
-        - Financial benefits
-        - Work-life balance perks
-        - Career advancement opportunities
-        
-        Make them specific and appealing to healthcare workers."""
-    )
+    async def generate():
+        chat = await get_ai_chat()
+        message = UserMessage(
+            text=f"""Suggest attractive and competitive benefits for this healthcare position. Consider the role level, location, and industry standards:
+            
+            Job Details: {request.text}
+            
+            Please suggest 6-10 benefits that would be attractive to healthcare professionals, including:
+            - Healthcare and insurance benefits
+            - Professional development opportunities
+            - Financial benefits
+            - Work-life balance perks
+            - Career advancement opportunities
+            
+            Make them specific and appealing to healthcare workers."""
+        )
+        return await send_ai_message(chat, message, "suggest-job-benefits")
     
-    response = await chat.send_message(message)
+    response = await cached_completion(db, "suggest-job-benefits", request.text, generate, refresh=refresh)
     return {"suggested_benefits": response}
 
-@api_router.post("/ai/job-posting-assistant")
-async def job_posting_assistant(request: AIRequest, current_user: User = Depends(get_current_user)):
-    if current_user.role != UserRole.ADMIN:
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    chat = await get_ai_chat()
-    
-    message = UserMessage(
+def job_posting_assistant_message(text: str):
+    return UserMessage(
         text=f"""You are an expert healthcare recruitment assistant. Please help with this job posting question or request:
         
-        Question/Request: {request.text}
+        Question/Request: {text}
         
         Please provide helpful, professional advice about:
         - Job posting best practices
@@ -1360,15 +1397,18 @@ async def job_posting_assistant(request: AIRequest, current_user: User = Depends
         
         Be specific, actionable, and focused on healthcare roles."""
     )
+
+@api_router.post("/ai/job-posting-assistant")
+async def job_posting_assistant(request: AIRequest, current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
     
-    response = await chat.send_message(message)
+    chat = await get_ai_chat()
+    response = await send_ai_message(chat, job_posting_assistant_message(request.text), "job-posting-assistant")
     return {"assistant_response": response}
 
 # Chatbot Routes
-@api_router.post("/chat")
-async def chat_with_bot(request: AIRequest):
-    chat = await get_ai_chat()
-    
+def chat_message(text: str):
     # Enhanced system message for lead generation
     lead_gen_prompt = f"""
     You are a helpful assistant for HealthCare Jobs platform. Your goals are:
@@ -1378,43 +1418,54 @@ async def chat_with_bot(request: AIRequest):
     4. Collect contact information when appropriate
     5. Be professional, helpful, and engaging
     
-    User message: {request.text}
+    User message: {text}
     
     If this seems like a potential lead (someone interested in jobs or hiring), subtly encourage them to:
     - Register on the platform for personalized job matching
     - Contact us for premium employer services
     - Sign up for job alerts
     """
-    
-    message = UserMessage(text=lead_gen_prompt)
-    response = await chat.send_message(message)
-    
-    # Save chat message
+    return UserMessage(text=lead_gen_prompt)
+
+def save_chat_message(text: str, response: str, session_id: Optional[str] = None) -> ChatMessage:
     chat_msg = ChatMessage(
-        session_id=f"anonymous_{uuid.uuid4()}",
-        message=request.text,
+        session_id=session_id[:64] if session_id else f"anonymous_{uuid.uuid4()}",
+        message=text,
         response=response
     )
     
-    chat_dict = chat_msg.dict()
-    chat_dict['created_at'] = chat_dict['created_at'].isoformat()
+    # Buffered: written in batches with the session rollup (chat_log.py), not before responding
+    chat_log.log(chat_msg.dict())
+    return chat_msg
+
+@api_router.post("/chat")
+async def chat_with_bot(request: AIRequest, http_request: Request):
+    chat = await get_ai_chat()
+    # Anonymous endpoint: the gateway also caps concurrent requests per visitor IP
+    response = await send_ai_message(chat, chat_message(request.text), "chat", ip=client_ip(http_request))
     
-    await db.chat_messages.insert_one(chat_dict)
+    # Save chat message
+    save_chat_message(request.text, response, request.session_id)
     
     return {"response": response}
 
 # Admin Routes
 @api_router.get("/admin/jobs/pending", response_model=List[Job])
-async def get_pending_jobs(limit: int = 100, current_user: User = Depends(get_current_user)):
+async def get_pending_jobs(limit: int = 100, fields: Optional[str] = None, current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
+    selected = parse_job_fields(fields)
+    if selected:
+        return sparse_response(await find_job_fields(db.jobs, {"is_approved": False}, [("created_at", -1)], 0, limit, selected))
+    
     # Optimize: Exclude heavy fields
     # Note: cannot use $substr in find(), so we just exclude heavy arrays
     projection = {
         "requirements": 0,
         "benefits": 0,
-        "content": 0
+        "content": 0,
+        "card": 0
     }
     
     jobs = await db.jobs.find({"is_approved": False}, projection).sort("created_at", -1).limit(limit).to_list(length=limit)
@@ -1446,38 +1497,91 @@ async def approve_job(job_id: str, current_user: User = Depends(get_current_user
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Job not found")
     
+    # Now visible to job seekers: match it against their job alerts
+    await enqueue_job(db, job_id)
+    
     # Auto-regenerate sitemap after job approval (now visible in sitemap)
     regenerate_sitemap_async()
     
     return {"message": "Job approved successfully"}
 
 @api_router.get("/admin/stats")
-async def get_admin_stats(current_user: User = Depends(get_current_user)):
+async def get_admin_stats(refresh: bool = False, current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    total_users = await db.users.count_documents({})
-    total_jobs = await db.jobs.count_documents({})
-    pending_jobs = await db.jobs.count_documents({"is_approved": False})
-    total_applications = await db.applications.count_documents({})
-    total_blogs = await db.blog_posts.count_documents({})
-    published_blogs = await db.blog_posts.count_documents({"is_published": True})
+    # Refreshed by the scheduler every few minutes; ?refresh=true recomputes now
+    return await get_cached_admin_stats(db, refresh=refresh)
+
+@api_router.get("/admin/chat/sessions")
+async def get_chat_sessions(
+    topic: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    days: int = Query(30, ge=1, le=365),
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
     
+    # Per-conversation rollups (chat_log.py): latest first, optionally about one category
+    query = {"topics": topic} if topic else {}
+    sessions = await db[CHAT_SESSIONS_COLLECTION].find(query).sort("last_message_at", -1).skip(skip).limit(limit).to_list(length=None)
+    for session in sessions:
+        session["session_id"] = session.pop("_id")
+    
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    totals = await db[CHAT_SESSIONS_COLLECTION].aggregate([
+        {"$match": {"last_message_at": {"$gte": since}}},
+        {"$facet": {
+            "totals": [{"$group": {"_id": None, "sessions": {"$sum": 1}, "messages": {"$sum": "$messages"}}}],
+            "topics": [{"$unwind": "$topics"}, {"$group": {"_id": "$topics", "sessions": {"$sum": 1}}},
+                       {"$sort": {"sessions": -1}}],
+        }},
+    ]).to_list(length=None)
+    summary = (totals[0]["totals"] or [{}])[0] if totals else {}
     return {
-        "total_users": total_users,
-        "total_jobs": total_jobs,
-        "pending_jobs": pending_jobs,
-        "total_applications": total_applications,
-        "total_blogs": total_blogs,
-        "published_blogs": published_blogs
+        "sessions": sessions,
+        "summary": {
+            "days": days,
+            "sessions": summary.get("sessions", 0),
+            "messages": summary.get("messages", 0),
+            "topics": {item["_id"]: item["sessions"] for item in (totals[0]["topics"] if totals else [])},
+        },
     }
 
+@api_router.get("/admin/chat/sessions/{session_id}")
+async def get_chat_session_messages(session_id: str, current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    messages = await db[CHAT_MESSAGES_COLLECTION].find({"session_id": session_id}, {"_id": 0}).sort("created_at", 1).to_list(length=500)
+    if not messages:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return {"session_id": session_id, "messages": messages}
+
+@api_router.get("/admin/ai-cache")
+async def get_ai_cache_stats(current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    # Hit ratio and LLM time saved per cached AI endpoint
+    return {"endpoints": await ai_cache_stats(db)}
+
 # Admin Job Creation
 @api_router.post("/admin/jobs", response_model=Job)
-async def admin_create_job(job_data: JobCreate, current_user: User = Depends(get_current_user)):
+async def admin_create_job(
+    job_data: JobCreate,
+    on_duplicate: Optional[str] = Query(None, description="warn, merge or allow (default: DUPLICATE_JOB_POLICY)"),
+    current_user: User = Depends(get_current_user)
+):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
+    policy = on_duplicate or DUPLICATE_JOB_POLICY
+    if policy not in DUPLICATE_POLICIES:
+        raise HTTPException(status_code=400, detail=f"on_duplicate must be one of: {', '.join(DUPLICATE_POLICIES)}")
+    
     # Validate external URL must be HTTPS
     if job_data.is_external and job_data.external_url:
         if not job_data.external_url.startswith('https://'):
@@ -1490,13 +1594,42 @@ async def admin_create_job(job_data: JobCreate, current_user: User = Depends(get
     
     # Generate unique slug from title, company, location, and job ID
     base_slug = generate_slug(job.title, job.company, job.location, job.id)
-    job.slug = await ensure_unique_slug(base_slug, job.id)
     
     job_dict = job.dict()
     # Keep datetime objects as-is for MongoDB - do NOT convert to isoformat
     # MongoDB natively supports datetime objects and the app expects them for proper sorting
     
-    await db.jobs.insert_one(job_dict)
+    # Near-duplicate of a live job (bulk posts from several sources): apply the posting policy
+    duplicate = await find_duplicate(db, job_dict) if policy != "allow" else None
+    if duplicate and policy == "merge":
+        logger.info("Job '%s' merged into %s (%.0f%% similar)", job.title, duplicate['id'], duplicate['similarity'] * 100)
+        await db.jobs.update_one({"id": duplicate["id"]}, {"$inc": {"duplicate_posts": 1}})
+        if isinstance(duplicate.get('created_at'), str):
+            duplicate['created_at'] = datetime.fromisoformat(duplicate['created_at'])
+        if duplicate.get('expires_at') and isinstance(duplicate.get('expires_at'), str):
+            duplicate['expires_at'] = datetime.fromisoformat(duplicate['expires_at'])
+        if duplicate.get('salary_min') is not None and isinstance(duplicate.get('salary_min'), int):
+            duplicate['salary_min'] = str(duplicate['salary_min'])
+        if duplicate.get('salary_max') is not None and isinstance(duplicate.get('salary_max'), int):
+            duplicate['salary_max'] = str(duplicate['salary_max'])
+        return Job(**duplicate)
+    if duplicate:
+        job.duplicate_of = job_dict["duplicate_of"] = duplicate["id"]
+        logger.warning("Job '%s' looks like a duplicate of %s (%.0f%% similar)", job.title, duplicate['id'],
+                       duplicate['similarity'] * 100, extra={"job_id": job.id})
+    
+    # Compact form read by the list endpoints
+    job_dict["card"] = build_card(job_dict)
+    
+    # Insert-and-retry on the unique slug index so concurrent posts never share a slug
+    job.slug = await insert_with_unique_slug(db.jobs, job_dict, base_slug)
+    await job_dedup.index_job(db, job_dict)
+    
+    # Approved on creation: match it against job seekers' alerts
+    await enqueue_job(db, job.id)
+    
+    # Archive at its deadline
+    deadline_queue.track(job_dict)
     
     # Auto-regenerate sitemap after new job
     regenerate_sitemap_async()
@@ -1556,7 +1689,7 @@ async def create_blog_post(
         except HTTPException:
             raise
         except Exception as e:
-            print(f"Error processing image: {e}")
+            logger.error("Error processing image: %s", e)
             # Continue without image if upload fails
             featured_image_url = None
     
@@ -1588,7 +1721,8 @@ async def create_blog_post(
     if is_published:
         blog_data["published_at"] = datetime.now(timezone.utc).isoformat()
     
-    await db.blog_posts.insert_one(blog_data)
+    # Blog slugs come from the title alone, so allocate a free "-N" suffix on collision
+    await insert_with_unique_slug(db.blog_posts, blog_data, slug)
     
     # Auto-regenerate sitemap after new blog post (if published)
     if is_published:
@@ -1751,7 +1885,7 @@ async def update_blog_post(
         except HTTPException:
             raise
         except Exception as e:
-            print(f"Error processing image: {e}")
+            logger.error("Error processing image: %s", e)
             # Keep existing image if upload fails
             featured_image_url = existing_post.get('featured_image')
     
@@ -1772,14 +1906,14 @@ async def update_blog_post(
         "seo_description": seo_description,
         "faqs": faqs_list,
         "featured_image": featured_image_url,
-        "slug": slug,
         "updated_at": datetime.now(timezone.utc).isoformat()
     }
     
     if is_published and not existing_post.get('published_at'):
         update_data["published_at"] = datetime.now(timezone.utc).isoformat()
     
-    await db.blog_posts.update_one({"id": post_id}, {"$set": update_data})
+    # Keeps the current slug if the title is unchanged, otherwise allocates a free one
+    await update_with_unique_slug(db.blog_posts, post_id, slug, update_data)
     
     # Auto-regenerate sitemap if blog post is published
     if is_published or existing_post.get('is_published'):
@@ -1858,9 +1992,10 @@ async def get_all_jobs_admin(
     include_deleted: bool = False,
     skip: int = 0,
     limit: int = 50,
+    fields: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
-    """Get all jobs for admin management with pagination"""
+    """Get all jobs for admin management with pagination (fields=a,b for only those fields)"""
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
@@ -1868,12 +2003,17 @@ async def get_all_jobs_admin(
     if not include_deleted:
         query["is_deleted"] = {"$ne": True}
     
+    selected = parse_job_fields(fields)
+    if selected:
+        return sparse_response(await find_job_fields(db.jobs, query, [("created_at", -1)], skip, limit, selected))
+    
     # Optimize: Exclude heavy fields (valid find projection)
     # Note: cannot use $substr in find(), and cannot mix 0/1 except for _id
     projection = {
         "requirements": 0,
         "benefits": 0,
-        "content": 0
+        "content": 0,
+        "card": 0
     }
 
     # Add pagination to prevent timeout on large datasets
@@ -1940,6 +2080,8 @@ async def update_job_admin(
     
     update_data = job_data.dict(exclude_unset=True)
     update_data['updated_at'] = datetime.now(timezone.utc).isoformat()
+    # Keep the list card in sync with the edited description/requirements/salary
+    update_data['card'] = build_card({**existing_job, **update_data})
     
     # DO NOT regenerate slug on edit to preserve existing URLs and SEO
     # The slug is generated only once during job creation
@@ -1956,11 +2098,28 @@ async def update_job_admin(
     if updated_job.get('expires_at') and isinstance(updated_job.get('expires_at'), str):
         updated_job['expires_at'] = datetime.fromisoformat(updated_job['expires_at'])
     
+    # Re-queue with the (possibly changed) deadline
+    deadline_queue.track(updated_job)
+    
+    # The edited text gets a new MinHash signature
+    await job_dedup.index_job(db, updated_job)
+    
     # Auto-regenerate sitemap after job update
     regenerate_sitemap_async()
     
     return Job(**updated_job)
 
+@api_router.post("/admin/jobs/deduplicate")
+async def deduplicate_jobs(apply: bool = False, current_user: User = Depends(get_current_user)):
+    """Find near-duplicate jobs already posted; apply=true soft deletes all but the oldest of each group"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    result = await scan_duplicates(db, apply=apply)
+    if apply and result["duplicates"]:
+        regenerate_sitemap_async()
+    return result
+
 @api_router.delete("/admin/jobs/{job_id}")
 async def soft_delete_job(job_id: str, current_user: User = Depends(get_current_user)):
     """Soft delete a job (mark as deleted, don't remove from database)"""
@@ -2012,6 +2171,12 @@ async def unarchive_job(job_id: str, current_user: User = Depends(get_current_us
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Job not found")
     
+    # Back in the live set, so archive it again at its deadline
+    job = await db.jobs.find_one({"id": job_id}, {"_id": 0, "id": 1, "application_deadline": 1,
+                                                  "expires_at": 1, "is_archived": 1, "is_deleted": 1})
+    if job:
+        deadline_queue.track(job)
+    
     # Auto-regenerate sitemap after job unarchival
     regenerate_sitemap_async()
     
@@ -2033,6 +2198,12 @@ async def restore_job(job_id: str, current_user: User = Depends(get_current_user
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Job not found")
     
+    # Back in the live set, so archive it again at its deadline
+    job = await db.jobs.find_one({"id": job_id}, {"_id": 0, "id": 1, "application_deadline": 1,
+                                                  "expires_at": 1, "is_archived": 1, "is_deleted": 1})
+    if job:
+        deadline_queue.track(job)
+    
     # Auto-regenerate sitemap after job restoration
     regenerate_sitemap_async()
     
@@ -2055,12 +2226,11 @@ async def regenerate_job_slug(job_id: str, current_user: User = Depends(get_curr
     
     old_slug = job.get('slug', '')
     base_slug = generate_slug(title, company, location, job_id)
-    new_slug = await ensure_unique_slug(base_slug, job_id)
     
-    # Update the slug
-    await db.jobs.update_one(
-        {"id": job_id},
-        {"$set": {"slug": new_slug, "updated_at": datetime.now(timezone.utc).isoformat()}}
+    # Update the slug (retries on the unique slug index if another write races us)
+    new_slug = await update_with_unique_slug(
+        db.jobs, job_id, base_slug,
+        {"updated_at": datetime.now(timezone.utc).isoformat()}
     )
     
     # Regenerate sitemap
@@ -2085,14 +2255,17 @@ async def get_blog_posts(
     category: Optional[str] = None,
     tag: Optional[str] = None,
     q: Optional[str] = None,
+    sort: str = Query("relevance", description="relevance (when searching) or recent"),
     limit: int = 10,
     skip: int = 0,
     page: int = 1
 ):
     """
     Get blog posts with server-side filtering, search, and pagination.
-    Returns: { "posts": List[BlogPostSummary], "total": int, "page": int, "total_pages": int }
+    Returns: { "posts": List[BlogPostSummary], "total": int, "page": int, "total_pages": int, "tags": [...] }
     """
+    if sort not in BLOG_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(BLOG_SORTS)}")
     query = {"is_published": True}
     
     if featured_only:
@@ -2103,55 +2276,13 @@ async def get_blog_posts(
         
     if tag:
         query["tags"] = tag
-        
-    if q:
-        query["$or"] = [
-            {"title": {"$regex": q, "$options": "i"}},
-            {"excerpt": {"$regex": q, "$options": "i"}},
-            {"tags": {"$regex": q, "$options": "i"}}
-        ]
 
-    # Calculate total count for pagination
-    total_count = await db.blog_posts.count_documents(query)
+    # Page of posts (sorted and limited on the index) and, concurrently, total count and tag facets.
+    # Search uses the weighted text index (title > tags > excerpt) instead of regex scans.
+    search = await search_blog_posts(read_db, query, q=q, sort=sort, skip=skip, limit=limit)
+    posts = search["posts"]
+    total_count = search["total"]
     total_pages = (total_count + limit - 1) // limit
-
-    # Aggregation Pipeline for efficient fetching
-    pipeline = [
-        {"$match": query},
-        {"$sort": {"published_at": -1}},
-        {"$skip": skip},
-        {"$limit": limit},
-        {"$project": {
-            "_id": 0,
-            "id": 1,
-            "title": 1,
-            "slug": 1,
-            "excerpt": 1,
-            "author_id": 1,
-            "category": 1,
-            "tags": 1,
-            "is_published": 1,
-            "is_featured": 1,
-            "created_at": 1,
-            "published_at": 1,
-            "featured_image_thumbnail": 1,
-            # conditionally fetch featured_image only if thumbnail is missing
-            "featured_image": {
-                "$cond": {
-                    "if": { 
-                        "$and": [
-                            {"$ne": ["$featured_image_thumbnail", None]}, 
-                            {"$ne": ["$featured_image_thumbnail", ""]}
-                        ]
-                    },
-                    "then": "$$REMOVE",
-                    "else": "$featured_image"
-                }
-            }
-        }}
-    ]
-    
-    posts = await db.blog_posts.aggregate(pipeline).to_list(length=None)
     
     posts_to_update = []
     
@@ -2194,7 +2325,8 @@ async def get_blog_posts(
         "posts": [BlogPostSummary(**post) for post in posts],
         "total": total_count,
         "page": page,
-        "total_pages": total_pages
+        "total_pages": total_pages,
+        "tags": search["tags"]
     }
 
 @api_router.get("/blog/{slug}", response_model=BlogPost)
@@ -2254,7 +2386,8 @@ async def clear_database(current_user: User = Depends(get_current_user)):
         # Clear all collections
         collections_to_clear = [
             "users", "jobs", "applications", "job_leads", "user_profiles",
-            "chat_messages", "blog_posts", "seo_settings", "saved_jobs"
+            "chat_messages", "chat_sessions", "blog_posts", "seo_settings", "saved_jobs",
+            "saved_searches", "job_alert_queue", "alert_outbox"
         ]
         
         cleared_collections = []
@@ -2493,7 +2626,7 @@ async def track_job_application(email: str, job_id: str):
 # Job Application Endpoint
 @api_router.post("/jobs/{job_id}/apply", response_model=Dict)
 async def apply_for_job(job_id: str, application_data: dict, current_user: User = Depends(get_current_user)):
-    print(f"🎯 Application attempt - Job ID: {job_id}, User ID: {current_user.id}, User Email: {current_user.email}")
+    logger.debug("Application attempt", extra={"job_id": job_id, "user_id": current_user.id})
     
     # Check if job exists (try slug first, then ID for backward compatibility)
     job = await db.jobs.find_one({"slug": job_id, "is_deleted": {"$ne": True}})
@@ -2511,7 +2644,7 @@ async def apply_for_job(job_id: str, application_data: dict, current_user: User
         "applicant_id": current_user.id
     })
     if existing_application:
-        print(f"⚠️ Duplicate application detected for user {current_user.id} on job {actual_job_id}")
+        logger.info("Duplicate application", extra={"job_id": actual_job_id, "user_id": current_user.id})
         raise HTTPException(status_code=400, detail="You have already applied for this job")
     
     # Create job application
@@ -2525,9 +2658,9 @@ async def apply_for_job(job_id: str, application_data: dict, current_user: User
     application_dict = application.dict()
     application_dict['created_at'] = application_dict['created_at'].isoformat()
     
-    print(f"💾 Saving application to database: {application_dict}")
     await db.applications.insert_one(application_dict)
-    print(f"✅ Application saved successfully with ID: {application.id}")
+    logger.info("Application saved", extra={"application_id": application.id, "job_id": actual_job_id,
+                                            "user_id": current_user.id})
     
     # Update job application count
     await db.jobs.update_one(
@@ -2637,25 +2770,59 @@ async def get_job_seeker_dashboard(current_user: User = Depends(get_current_user
     }
 
 
+# Job Alerts (saved searches; matched against new jobs by the job_alerts scheduled job)
+class JobAlertCreate(BaseModel):
+    keywords: Optional[str] = None
+    location: Optional[str] = None
+    category: Optional[str] = None  # Category page slug, e.g. "nursing"
+    job_type: Optional[str] = None
+    salary_min: Optional[int] = Field(None, ge=0)
+
+@api_router.post("/job-alerts")
+async def create_job_alert(alert: JobAlertCreate, current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.JOB_SEEKER:
+        raise HTTPException(status_code=403, detail="Job seeker access required")
+    if alert.category and alert.category not in CATEGORY_METADATA:
+        raise HTTPException(status_code=400, detail="Unknown category")
+    
+    try:
+        return await save_search(db, current_user.id, current_user.email, **alert.dict())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.get("/job-alerts")
+async def get_job_alerts(current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.JOB_SEEKER:
+        raise HTTPException(status_code=403, detail="Job seeker access required")
+    
+    return await db[SAVED_SEARCHES_COLLECTION].find(
+        {"user_id": current_user.id}, {"_id": 0, "id": 1, "query": 1, "created_at": 1}
+    ).sort("created_at", -1).to_list(length=None)
+
+@api_router.delete("/job-alerts/{alert_id}")
+async def delete_job_alert(alert_id: str, current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.JOB_SEEKER:
+        raise HTTPException(status_code=403, detail="Job seeker access required")
+    
+    result = await db[SAVED_SEARCHES_COLLECTION].delete_one({"id": alert_id, "user_id": current_user.id})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Job alert not found")
+    return {"message": "Job alert deleted"}
+
+
 # Get Job Seeker Applications with Job Details
 @api_router.get("/job-seeker/applications")
 async def get_job_seeker_applications(current_user: User = Depends(get_current_user)):
-    print(f"📋 Fetching applications for user: {current_user.id}, email: {current_user.email}, role: {current_user.role}")
-    
     if current_user.role != UserRole.JOB_SEEKER:
         raise HTTPException(status_code=403, detail="Job seeker access required")
     
     # Get applications from applications collection (logged-in applications)
     applications = await db.applications.find({"applicant_id": current_user.id}).to_list(length=None)
-    print(f"💼 Found {len(applications)} applications in applications collection")
-    if applications:
-        print(f"   Application IDs: {[app['id'] for app in applications]}")
     
     # Get applications from job_leads collection (applied before logging in, matched by email)
     leads = await db.job_leads.find({"email": current_user.email}).to_list(length=None)
-    print(f"📧 Found {len(leads)} leads in job_leads collection")
-    if leads:
-        print(f"   Lead IDs: {[lead['id'] for lead in leads]}")
+    logger.debug("Job seeker applications: %d applications, %d leads", len(applications), len(leads),
+                 extra={"user_id": current_user.id})
     
     # Combine and get job details for each application
     all_applications = []
@@ -2666,7 +2833,7 @@ async def get_job_seeker_applications(current_user: User = Depends(get_current_u
         if job:
             # Skip jobs with missing critical fields
             if not job.get('title') or not job.get('company'):
-                print(f"   ⚠️ Skipping application - job has missing title or company. Job ID: {app['job_id']}")
+                logger.warning("Skipping application: job has no title or company", extra={"job_id": app['job_id']})
                 continue
                 
             all_applications.append({
@@ -2681,9 +2848,8 @@ async def get_job_seeker_applications(current_user: User = Depends(get_current_u
                 "status": app.get('status', 'pending'),
                 "application_type": "registered"
             })
-            print(f"   ✅ Processed application for job: {job.get('title')}")
         else:
-            print(f"   ⚠️ Job not found or deleted for application ID: {app['id']}, job_id: {app['job_id']}")
+            logger.debug("Application for a missing or deleted job", extra={"job_id": app['job_id']})
     
     # Process lead applications
     for lead in leads:
@@ -2694,7 +2860,7 @@ async def get_job_seeker_applications(current_user: User = Depends(get_current_u
             if job:
                 # Skip jobs with missing critical fields
                 if not job.get('title') or not job.get('company'):
-                    print(f"   ⚠️ Skipping lead application - job has missing title or company. Job ID: {lead['job_id']}")
+                    logger.warning("Skipping lead: job has no title or company", extra={"job_id": lead['job_id']})
                     continue
                     
                 all_applications.append({
@@ -2709,16 +2875,12 @@ async def get_job_seeker_applications(current_user: User = Depends(get_current_u
                     "status": "pending",
                     "application_type": "lead"
                 })
-                print(f"   ✅ Processed lead for job: {job.get('title')}")
             else:
-                print(f"   ⚠️ Job not found or deleted for lead ID: {lead['id']}, job_id: {lead['job_id']}")
-        else:
-            print(f"   ℹ️ Skipping lead {lead['id']} - already converted to application")
+                logger.debug("Lead for a missing or deleted job", extra={"job_id": lead['job_id']})
     
     # Sort by applied date (most recent first)
     all_applications.sort(key=lambda x: x['applied_at'], reverse=True)
     
-    print(f"📊 Total applications to return: {len(all_applications)}")
     
     return {
         "total_applications": len(all_applications),
@@ -2764,11 +2926,8 @@ async def get_job_with_tracking(job_id: str):
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Increment view count
-    await db.jobs.update_one(
-        {"id": job_id},
-        {"$inc": {"view_count": 1}}
-    )
+    # Increment view count (buffered, written by the scheduler's counter flush)
+    job_views.incr(job_id)
     
     # Convert datetime strings
     if isinstance(job.get('created_at'), str):
@@ -2809,7 +2968,7 @@ async def get_job_seeker_stats(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Admin access required")
     
     # Get total counts
-    total_job_seekers = await db.job_seekers.count_documents({})
+    total_job_seekers = await db.job_seekers.estimated_document_count()
     registered_users = await db.job_seekers.count_documents({"is_registered": True})
     leads_only = await db.job_seekers.count_documents({"is_registered": False})
     
@@ -2852,8 +3011,17 @@ async def get_job_seeker_stats(current_user: User = Depends(get_current_user)):
         "conversion_rate": round((registered_users / total_job_seekers * 100), 2) if total_job_seekers > 0 else 0
     }
 
+# Prometheus metrics (all workers merged; set METRICS_TOKEN to require a bearer token)
+@site_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(request: Request):
+    metrics_token = os.environ.get('METRICS_TOKEN')
+    if metrics_token and request.headers.get("authorization") != f"Bearer {metrics_token}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+    return PlainTextResponse(await collect_metrics(db), media_type="text/plain; version=0.0.4")
+
 # SEO Routes - Robots.txt
-@app.get("/robots.txt", response_class=PlainTextResponse)
+@site_router.get("/robots.txt", response_class=PlainTextResponse)
 async def get_robots_txt():
     """
     Generate robots.txt for search engine crawling
@@ -2885,105 +3053,73 @@ async def migrate_job_slugs(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Admin access required")
     
     try:
-        # Find all jobs without slugs
-        jobs_without_slugs = await db.jobs.find({"slug": {"$in": [None, ""]}}).to_list(length=None)
-        
-        updated_count = 0
-        for job in jobs_without_slugs:
-            # Generate slug from title, company, location, and job ID
-            base_slug = generate_slug(
-                job.get('title', 'Job'),
-                job.get('company'),
-                job.get('location'),
-                job.get('id')
-            )
-            unique_slug = await ensure_unique_slug(base_slug, job['id'])
-            
-            # Update job with slug
-            await db.jobs.update_one(
-                {"id": job['id']},
-                {"$set": {"slug": unique_slug}}
-            )
-            updated_count += 1
-            print(f"✅ Generated slug '{unique_slug}' for job: {job['title']}")
+        # Batched bulk_write through the migration runner instead of one update per job
+        report = await run_migration(db, MIGRATIONS["0006"], log=logging.info)
+        updated_count = report["modified"]
         
         return {
             "success": True,
             "message": f"Successfully generated slugs for {updated_count} jobs",
-            "updated_count": updated_count
+            "updated_count": updated_count,
+            "errors": report["errors"]
         }
     except Exception as e:
-        print(f"❌ Error migrating slugs: {e}")
+        logger.exception("Error migrating slugs")
         raise HTTPException(status_code=500, detail=f"Migration failed: {str(e)}")
 
 
-# Background Task for Auto-Archiving Jobs
-async def archive_expired_jobs():
+# Background scheduler status and manual triggers (admin only)
+@api_router.get("/admin/scheduler")
+async def get_scheduler_status(current_user: User = Depends(get_current_user)):
+    """Current leader, per-job schedule and recent run history"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    return await scheduler_status(db)
+
+@api_router.post("/admin/scheduler/{job_name}/run")
+async def trigger_scheduled_job(job_name: str, wait: bool = False, current_user: User = Depends(get_current_user)):
     """
-    Background task to automatically archive jobs whose application deadline has passed.
-    Run frequency: Every 12 hours.
+    Run a scheduled job. By default the leader picks it up at its next tick;
+    with ?wait=true it runs in this request and the run report is returned.
     """
-    while True:
-        try:
-            now = datetime.now(timezone.utc)
-            result = await db.jobs.update_many(
-                {
-                    "is_archived": False,
-                    "application_deadline": {"$lt": now}
-                },
-                {"$set": {"is_archived": True}}
-            )
-            if result.modified_count > 0:
-                print(f"Auto-Archiver: Archived {result.modified_count} expired jobs.")
-            
-        except Exception as e:
-            print(f"Error in auto-archive task: {e}")
-        
-        # Wait for 12 hours
-        await asyncio.sleep(12 * 60 * 60)
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
 
-@app.on_event("startup")
-async def startup_db_client():
-    try:
-        # Create Indexes for Performance
-        print("Creating database indexes...")
-        
-        # Jobs Collection Indexes
-        # 1. Default sort index
-        await db.jobs.create_index([("created_at", -1), ("is_archived", 1)])
-        
-        # 2. Filtering index (approved/deleted)
-        await db.jobs.create_index([("is_approved", 1), ("is_deleted", 1)])
-        
-        # 3. Slug lookup for details page
-        # Existing index is sparse=True, so we must match it to avoid conflicts
-        await db.jobs.create_index("slug", unique=True, sparse=True)
-        
-        # 4. Filter indexes
-        await db.jobs.create_index("categories")
-        await db.jobs.create_index("job_type")
-        
-        # 5. Deadline Index for Auto-Archiving
-        await db.jobs.create_index("application_deadline")
-        
-        # 6. Text Search Index
-        # Check if text index exists before creating to avoid conflicts
-        indexes = await db.jobs.index_information()
-        if "title_text_company_text_location_text" not in indexes:
-             await db.jobs.create_index(
-                [("title", "text"), ("company", "text"), ("location", "text"), ("description", "text")],
-                name="search_index"
-            )
-        
-        print("Database indexes created successfully.")
-        
-        # Start background tasks
-        asyncio.create_task(archive_expired_jobs())
-        
-    except Exception as e:
-        print(f"Error creating indexes or background tasks: {e}")
-        # Don't crash the server on index errors, just log it
-        # raise HTTPException(status_code=500, detail=f"Migration failed: {str(e)}")
+    if job_name not in SCHEDULED_JOBS:
+        raise HTTPException(status_code=404, detail="Scheduled job not found")
+
+    if wait:
+        return await run_job_now(db, job_name)
+
+    await request_run(db, job_name)
+    return {"message": f"{job_name} will run at the scheduler's next tick"}
+
+# Per-route MongoDB timings and slow command log (admin only)
+@api_router.get("/admin/perf")
+async def get_db_performance(slow: int = Query(50, ge=0, le=200), reset: bool = False,
+                             current_user: User = Depends(get_current_user)):
+    """Query count, DB time and percentiles per route since startup (or the last reset)"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    snapshot = profiler.snapshot(slow=slow)
+    if reset:
+        profiler.reset()
+    return snapshot
+
+# Event loop stalls with the route and code that caused them (admin only)
+@api_router.get("/admin/loop-blocks")
+async def get_loop_blocks(recent: int = Query(20, ge=0, le=200), reset: bool = False,
+                          current_user: User = Depends(get_current_user)):
+    """Stalls over the watchdog threshold per route and frame since startup (or the last reset), with stacks"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    snapshot = loop_watchdog.snapshot(recent=recent)
+    if reset:
+        loop_watchdog.reset()
+    return snapshot
 
 
 # Contact Form Submission
@@ -3003,13 +3139,13 @@ async def submit_contact_form(contact: ContactMessage):
     Submit contact form inquiry
     """
     try:
-        print(f"📧 New contact form submission from: {contact.name} ({contact.email})")
+        logger.info("New contact form submission", extra={"contact_id": contact.id})
         
         # Save to database
         contact_dict = contact.dict()
         await db.contact_messages.insert_one(contact_dict)
         
-        print(f"✅ Contact message saved with ID: {contact.id}")
+        logger.debug("Contact message saved", extra={"contact_id": contact.id})
         
         return {
             "success": True,
@@ -3017,11 +3153,11 @@ async def submit_contact_form(contact: ContactMessage):
             "message_id": contact.id
         }
     except Exception as e:
-        print(f"❌ Error saving contact message: {e}")
+        logger.exception("Error saving contact message")
         raise HTTPException(status_code=500, detail="Failed to submit contact form")
 
 # SEO Meta Tags API for dynamic pages
-@app.get("/api/seo/meta/{page_type}")
+@site_router.get("/api/seo/meta/{page_type}")
 async def get_seo_meta(page_type: str, job_id: str = None, blog_slug: str = None):
     # Create XML root element
     urlset = ET.Element("urlset")
@@ -3114,7 +3250,7 @@ async def get_seo_meta(page_type: str, job_id: str = None, blog_slug: str = None
 
 
 # SEO Meta Tags API for dynamic pages
-@app.get("/api/seo/meta/{page_type}")
+@site_router.get("/api/seo/meta/{page_type}")
 async def get_seo_meta(page_type: str, job_id: str = None, blog_slug: str = None):
     """
     Get SEO metadata for dynamic pages
@@ -3154,125 +3290,18 @@ async def get_seo_meta(page_type: str, job_id: str = None, blog_slug: str = None
         "canonical": "https://jobslly.com"
     }
 
-@app.get("/sitemap.xml", response_class=Response)
+@site_router.get("/sitemap.xml", response_class=Response)
 async def get_sitemap_xml():
     """
-    Generate dynamic sitemap.xml for the entire site
+    Serve sitemap.xml for the entire site.
+    Built by sitemap.build_sitemap_xml and cached in the database; the scheduler
+    rebuilds it periodically and shortly after jobs or blog posts change.
     """
-    urlset = ET.Element("urlset")
-    urlset.set("xmlns", "http://www.sitemaps.org/schemas/sitemap/0.9")
-    
-    base_url = 'https://jobslly.com'
-    
-    # 1. Static Pages
-    static_pages = [
-        ('/', '1.0', 'daily'),
-        ('/jobs/', '0.9', 'daily'),
-        ('/blogs/', '0.8', 'daily'),
-        ('/login/', '0.7', 'weekly'),
-        ('/register/', '0.7', 'weekly'),
-        ('/dashboard/', '0.6', 'weekly'),
-        ('/contact-us/', '0.7', 'weekly'),
-        ('/privacy-policy/', '0.5', 'monthly'),
-        ('/terms-of-service/', '0.5', 'monthly'),
-        ('/cookies/', '0.5', 'monthly'),
-        ('/sitemap/', '0.5', 'monthly'),
-        ('/student-profiles/', '0.6', 'weekly'),
-        # Job Categories
-        ('/jobs/doctor/', '0.8', 'daily'),
-        ('/jobs/nursing/', '0.8', 'daily'),
-        ('/jobs/pharmacy/', '0.8', 'daily'),
-        ('/jobs/dentist/', '0.8', 'daily'),
-        ('/jobs/physiotherapy/', '0.8', 'daily'),
-        ('/jobs/medical-lab-technician/', '0.8', 'daily'),
-        ('/jobs/medical-science-liaison/', '0.8', 'daily'),
-        ('/jobs/pharmacovigilance/', '0.8', 'daily'),
-        ('/jobs/clinical-research/', '0.8', 'daily'),
-        ('/jobs/non-clinical-jobs/', '0.8', 'daily'),
-    ]
-    
-    for path, priority, changefreq in static_pages:
-        url_elem = ET.SubElement(urlset, "url")
-        ET.SubElement(url_elem, "loc").text = f"{base_url}{path}"
-        ET.SubElement(url_elem, "lastmod").text = datetime.now(timezone.utc).strftime('%Y-%m-%d')
-        ET.SubElement(url_elem, "changefreq").text = changefreq
-        ET.SubElement(url_elem, "priority").text = priority
-        
-    # 2. Dynamic Jobs (Approved, Not Deleted, Not Expired)
-    try:
-        current_time = datetime.now(timezone.utc)
-        query = {
-            "is_approved": True, 
-            "is_deleted": {"$ne": True},
-            "is_archived": {"$ne": True}, # Exclude archived jobs
-            "$or": [
-                {"expires_at": None},
-                {"expires_at": {"$gt": current_time}}
-            ]
-        }
-        
-        # Get ALL approved jobs (removed limit as per user request)
-        # Note: For extremely large datasets (100k+), we would need sitemap index files
-        projection = {"slug": 1, "updated_at": 1, "created_at": 1, "id": 1}
-        jobs = await db.jobs.find(query, projection).sort("created_at", -1).to_list(length=None)
-        
-        for job in jobs:
-            url_elem = ET.SubElement(urlset, "url")
-            job_slug = job.get('slug', job['id'])
-            ET.SubElement(url_elem, "loc").text = f"{base_url}/jobs/{job_slug}"
-            
-            # Use updated_at if available, else created_at, else today
-            lastmod = job.get('updated_at', job.get('created_at', datetime.now(timezone.utc)))
-            if isinstance(lastmod, str):
-                try:
-                    lastmod = datetime.fromisoformat(lastmod.replace('Z', '+00:00'))
-                except:
-                    lastmod = datetime.now(timezone.utc)
-            
-            ET.SubElement(url_elem, "lastmod").text = lastmod.strftime('%Y-%m-%d')
-            ET.SubElement(url_elem, "changefreq").text = "daily"
-            ET.SubElement(url_elem, "priority").text = "0.8"
-            
-    except Exception as e:
-        print(f"Error adding jobs to sitemap: {e}")
-        
-    # 3. Blog Posts
-    try:
-        query = {
-            "is_published": True,
-            "published_at": {"$ne": None}
-        }
-        projection = {"slug": 1, "published_at": 1, "updated_at": 1}
-        posts = await db.blog_posts.find(query, projection).sort("published_at", -1).to_list(length=None)
-        
-        for post in posts:
-            url_elem = ET.SubElement(urlset, "url")
-            ET.SubElement(url_elem, "loc").text = f"{base_url}/blogs/{post['slug']}"
-            
-            lastmod = post.get('updated_at', post.get('published_at'))
-            if isinstance(lastmod, str):
-                try:
-                    lastmod = datetime.fromisoformat(lastmod.replace('Z', '+00:00'))
-                except:
-                    lastmod = datetime.now(timezone.utc)
-            
-            ET.SubElement(url_elem, "lastmod").text = lastmod.strftime('%Y-%m-%d')
-            ET.SubElement(url_elem, "changefreq").text = "daily"
-            ET.SubElement(url_elem, "priority").text = "0.8"
-            
-    except Exception as e:
-        print(f"Error adding blog posts to sitemap: {e}")
-
-    # Generate XML string
-    sitemap_xml = ET.tostring(urlset, encoding="unicode", method="xml")
-    
-    # Add XML declaration
-    return Response(content=f'<?xml version="1.0" encoding="UTF-8"?>\n{sitemap_xml}', media_type="application/xml")
+    sitemap_xml = await get_cached_sitemap_xml(db)
+    return Response(content=sitemap_xml, media_type="application/xml")
 
 # Include the router
-app.include_router(api_router)
-
-@app.get("/sitemap-debug.xml", response_class=Response)
+@site_router.get("/sitemap-debug.xml", response_class=Response)
 async def get_sitemap_xml():
     """
     Generate dynamic sitemap.xml for the entire site
@@ -3309,17 +3338,16 @@ async def get_sitemap_xml():
         ('/jobs/non-clinical-jobs/', '0.8', 'daily'),
     ]
     
-    print(f"Generating sitemap with {len(static_pages)} static pages")
+    logger.debug("Generating sitemap with %d static pages", len(static_pages))
     for path, priority, changefreq in static_pages:
         try:
-            print(f"Adding static page: {path}")
             url_elem = ET.SubElement(urlset, "url")
             ET.SubElement(url_elem, "loc").text = f"{base_url}{path}"
             ET.SubElement(url_elem, "lastmod").text = datetime.now(timezone.utc).strftime('%Y-%m-%d')
             ET.SubElement(url_elem, "changefreq").text = changefreq
             ET.SubElement(url_elem, "priority").text = priority
         except Exception as e:
-            print(f"Error adding {path}: {str(e)}")
+            logger.error("Error adding %s to the sitemap: %s", path, e)
         
     # 2. Dynamic Jobs (Approved, Not Deleted, Not Expired)
     try:
@@ -3355,7 +3383,7 @@ async def get_sitemap_xml():
             ET.SubElement(url_elem, "changefreq").text = "daily"
             ET.SubElement(url_elem, "priority").text = "0.8"
     except Exception as e:
-        print(f"Error adding jobs to sitemap: {e}")
+        logger.error("Error adding jobs to sitemap: %s", e)
         
     # 3. Dynamic Blog Posts
     try:
@@ -3376,43 +3404,64 @@ async def get_sitemap_xml():
             ET.SubElement(url_elem, "changefreq").text = "weekly"
             ET.SubElement(url_elem, "priority").text = "0.7"
     except Exception as e:
-        print(f"Error adding blogs to sitemap: {e}")
+        logger.error("Error adding blogs to sitemap: %s", e)
         
     xml_str = ET.tostring(urlset, encoding='utf-8', method='xml')
     return Response(content=xml_str, media_type="application/xml")
 
-# Add WWW to non-WWW redirect middleware (must be added before CORS)
-app.add_middleware(WWWRedirectMiddleware)
+# Production frontend build (served for all non-API routes when present)
+frontend_build_path = "/app/frontend/build"
 
-# CORS Middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+def _start_background(coro):
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    """
+    Per-worker hooks run in every uvicorn worker; run-once hooks (boot_tasks.py)
+    run in the background in whichever worker claims them first. Nothing here
+    waits for MongoDB, so a worker accepts requests as soon as it is imported.
+    """
+    # Per worker: scheduler (leader-elected jobs + this worker's counter flush),
+    # deadline queue, chat log writer, the event loop lag metric and blocking watchdog
+    scheduler.start()
+    deadline_queue.start(db)
+    chat_log.start(db)
+    _start_background(monitor_loop_lag())
+    if WATCHDOG_ENABLED:
+        loop_watchdog.start()
+
+    # Once per deploy: index check, sitemap rebuild
+    _start_background(run_boot_tasks(db))
+
+    yield
+
+    # Flush buffered counters and chat messages, hand over the leader lease, then close the client
+    await deadline_queue.stop()
+    await chat_log.stop()
+    await scheduler.stop()
+    loop_watchdog.stop()
+    trace_exporter.stop()
+    for task in list(_background_tasks):
+        task.cancel()
+    client.close()
 
-# Mount static files for production frontend serving
-import os.path
-frontend_build_path = "/app/frontend/build"
 
-# Check if frontend build exists
-if os.path.exists(frontend_build_path):
+def _serve_frontend(application: FastAPI):
+    """Static assets and the React catch-all route (must be registered last)"""
+    if not os.path.exists(frontend_build_path):
+        return
+
     # Mount static files (CSS, JS, images, etc.) - only if static directory exists
     static_path = f"{frontend_build_path}/static"
     if os.path.exists(static_path) and os.path.isdir(static_path):
-        app.mount("/static", StaticFiles(directory=static_path), name="static")
-    
-    # Catch-all route for frontend (must be last)
-    @app.get("/{full_path:path}")
+        application.mount("/static", StaticFiles(directory=static_path), name="static")
+
+    @application.get("/{full_path:path}")
     async def serve_frontend(request: Request, full_path: str):
         """
         Serve React frontend for all non-API routes.
@@ -3421,37 +3470,51 @@ if os.path.exists(frontend_build_path):
         # Skip API routes - they're handled by api_router
         if full_path.startswith('api/'):
             raise HTTPException(status_code=404, detail="Not found")
-        
+
         # Return the index.html for all frontend routes
         index_path = f"{frontend_build_path}/index.html"
-        
+
         if os.path.exists(index_path):
             return FileResponse(index_path, media_type="text/html")
         else:
             raise HTTPException(status_code=404, detail="Frontend build not found")
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize background tasks on app startup"""
-    # Start job expiry scheduler
-    from job_scheduler import start_scheduler
-    start_scheduler()
-    print("✅ Job expiry scheduler started")
-    
-    # Create indexes strictly required for performance
-    try:
-        await db.jobs.create_index("created_at")
-        print("✅ Created 'created_at' index")
-    except Exception as e:
-        print(f"⚠️ Index creation warning: {e}")
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+def create_app() -> FastAPI:
+    """Build the ASGI app: routers, middleware, frontend and lifecycle hooks"""
+    application = FastAPI(title="HealthCare Jobs API", version="1.0.0", lifespan=lifespan)
+    application.include_router(api_router)
+    application.include_router(site_router)
 
-def regenerate_sitemap_async():
-    """
-    Legacy function: dynamic sitemap endpoints (/sitemap.xml) are now used.
-    This stub prevents NameErrors.
-    """
-    print("Sitemap is dynamic and up-to-date. No static generation needed.")
\ No newline at end of file
+    # Route of each request's task for the loop watchdog (innermost, so it runs in the endpoint's task)
+    application.add_middleware(LoopWatchdogMiddleware)
+
+    # Attribute DB commands to requests and add the Server-Timing header
+    application.add_middleware(ProfilingMiddleware)
+
+    # Add WWW to non-WWW redirect middleware (must be added before CORS)
+    application.add_middleware(WWWRedirectMiddleware)
+
+    # CORS Middleware
+    application.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Request metrics (outside CORS and the redirect, so redirects and CORS preflights are counted too)
+    application.add_middleware(MetricsMiddleware)
+
+    # Request id for log records and the X-Request-ID response header
+    application.add_middleware(RequestIdMiddleware)
+
+    # Request span; everything above runs inside it (outermost)
+    application.add_middleware(TracingMiddleware)
+
+    _serve_frontend(application)
+    return application
+
+
+app = create_app()
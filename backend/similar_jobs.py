@@ -0,0 +1,69 @@
+"""
+Similar jobs: the related-jobs list on a job page, precomputed.
+Each active job stores `similar` = {"ids": [...], "signature": ...}, its
+nearest neighbours in the job vector index (job_vectors.py) and the job
+signature they were computed for. The scheduled refresh finds jobs whose
+stored signature differs from the index (new and edited jobs), scores them
+against every job in batched matrix products, and also recomputes the
+lists of their new neighbours so a new job shows up on the pages of the
+jobs it resembles. A daily pass recomputes every list.
+
+get_job reads the list as cards with one $in restricted to active jobs, so
+jobs archived or removed since the last refresh simply drop out; a few more
+neighbours are stored than shown to leave room for that.
+"""
+import asyncio
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+
+from job_cards import find_cards_by_ids
+from job_vectors import ACTIVE_JOBS, JobVectorIndex, job_vectors
+
+# Neighbours stored per job / shown on the job page
+STORED = 10
+SHOWN = 6
+# Below this cosine a job is not "similar" enough to show
+MIN_SCORE = 0.1
+WRITE_BATCH = 500
+
+
+async def refresh_similar_jobs(db, index: JobVectorIndex = job_vectors, full: bool = False) -> Dict[str, Any]:
+    """Recompute the neighbour lists of new and edited jobs (of every job with full=True)"""
+    synced = await index.sync(db)
+    signatures = await asyncio.to_thread(index.signatures)
+    if not signatures:
+        return {"jobs": 0, "index": synced}
+
+    if full:
+        stale = list(signatures)
+    else:
+        stale = []
+        async for job in db.jobs.find(ACTIVE_JOBS, {"_id": 0, "id": 1, "similar.signature": 1}):
+            signature = signatures.get(job["id"])
+            if signature is not None and (job.get("similar") or {}).get("signature") != signature:
+                stale.append(job["id"])
+    if not stale:
+        return {"jobs": len(signatures), "updated": 0}
+
+    neighbors = await asyncio.to_thread(index.neighbors, stale, STORED, MIN_SCORE)
+    if not full:
+        # Jobs a new or edited job now resembles may need it in their own list
+        affected = {other for found in neighbors.values() for other, _ in found} - set(neighbors)
+        neighbors.update(await asyncio.to_thread(index.neighbors, list(affected), STORED, MIN_SCORE))
+
+    requests = [
+        UpdateOne({"id": job_id}, {"$set": {"similar": {
+            "ids": [other for other, _ in found], "signature": signatures[job_id],
+        }}})
+        for job_id, found in neighbors.items()
+    ]
+    for start in range(0, len(requests), WRITE_BATCH):
+        await db.jobs.bulk_write(requests[start:start + WRITE_BATCH], ordered=False)
+    return {"jobs": len(signatures), "stale": len(stale), "updated": len(requests)}
+
+
+async def similar_job_cards(collection, job: Dict[str, Any], limit: int = SHOWN) -> List[Dict[str, Any]]:
+    """Cards of a job's stored neighbours that are still active (one $in query)"""
+    ids = (job.get("similar") or {}).get("ids") or []
+    return await find_cards_by_ids(collection, ids, ACTIVE_JOBS, limit)
@@ -0,0 +1,69 @@
+"""
+Admin dashboard statistics for HealthCare Jobs API.
+The counts are refreshed by the scheduler into the `stats_cache` collection
+so the admin dashboard does not run six collection counts per page load.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from metrics import CACHE_REQUESTS
+
+STATS_CACHE_COLLECTION = "stats_cache"
+ADMIN_STATS_ID = "admin_stats"
+
+# Cached stats older than this are recomputed inline (e.g. if the scheduler is down)
+ADMIN_STATS_MAX_AGE = timedelta(minutes=15)
+
+_CACHE_HIT = CACHE_REQUESTS.labels("admin_stats", "hit")
+_CACHE_MISS = CACHE_REQUESTS.labels("admin_stats", "miss")
+
+
+async def compute_admin_stats(db) -> Dict[str, int]:
+    """Count users, jobs, applications and blog posts"""
+    # Unfiltered totals come from collection metadata instead of a full scan
+    (total_users, total_jobs, pending_jobs, total_applications,
+     total_blogs, published_blogs) = await asyncio.gather(
+        db.users.estimated_document_count(),
+        db.jobs.estimated_document_count(),
+        db.jobs.count_documents({"is_approved": False}),
+        db.applications.estimated_document_count(),
+        db.blog_posts.estimated_document_count(),
+        db.blog_posts.count_documents({"is_published": True})
+    )
+    return {
+        "total_users": total_users,
+        "total_jobs": total_jobs,
+        "pending_jobs": pending_jobs,
+        "total_applications": total_applications,
+        "total_blogs": total_blogs,
+        "published_blogs": published_blogs
+    }
+
+
+async def refresh_admin_stats(db) -> Dict[str, int]:
+    """Recompute the admin stats and store them in the cache collection"""
+    stats = await compute_admin_stats(db)
+    await db[STATS_CACHE_COLLECTION].replace_one(
+        {"_id": ADMIN_STATS_ID},
+        {"stats": stats, "generated_at": datetime.now(timezone.utc)},
+        upsert=True
+    )
+    return stats
+
+
+async def get_admin_stats(db, refresh: bool = False) -> Dict[str, Any]:
+    """Cached admin stats (with generated_at), recomputed if missing, stale or refresh is set"""
+    if not refresh:
+        cached = await db[STATS_CACHE_COLLECTION].find_one({"_id": ADMIN_STATS_ID})
+        if cached:
+            generated_at = cached["generated_at"]
+            if generated_at.tzinfo is None:
+                generated_at = generated_at.replace(tzinfo=timezone.utc)
+            if datetime.now(timezone.utc) - generated_at < ADMIN_STATS_MAX_AGE:
+                _CACHE_HIT.inc()
+                return {**cached["stats"], "generated_at": generated_at}
+
+    _CACHE_MISS.inc()
+    stats = await refresh_admin_stats(db)
+    return {**stats, "generated_at": datetime.now(timezone.utc)}
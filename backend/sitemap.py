@@ -0,0 +1,132 @@
+"""
+Sitemap generation for HealthCare Jobs API.
+Builds sitemap.xml from approved jobs and published blog posts and keeps the
+latest copy in the `sitemap_cache` collection. The scheduler refreshes it
+periodically (and on request after content changes), so /sitemap.xml is
+served without scanning the jobs collection on every crawl.
+"""
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import Any, Dict, Tuple
+
+from metrics import CACHE_REQUESTS
+
+SITEMAP_CACHE_COLLECTION = "sitemap_cache"
+SITEMAP_CACHE_ID = "sitemap.xml"
+
+_CACHE_HIT = CACHE_REQUESTS.labels("sitemap", "hit")
+_CACHE_MISS = CACHE_REQUESTS.labels("sitemap", "miss")
+
+BASE_URL = 'https://jobslly.com'
+
+STATIC_PAGES = [
+    ('/', '1.0', 'daily'),
+    ('/jobs/', '0.9', 'daily'),
+    ('/blogs/', '0.8', 'daily'),
+    ('/login/', '0.7', 'weekly'),
+    ('/register/', '0.7', 'weekly'),
+    ('/dashboard/', '0.6', 'weekly'),
+    ('/contact-us/', '0.7', 'weekly'),
+    ('/privacy-policy/', '0.5', 'monthly'),
+    ('/terms-of-service/', '0.5', 'monthly'),
+    ('/cookies/', '0.5', 'monthly'),
+    ('/sitemap/', '0.5', 'monthly'),
+    ('/student-profiles/', '0.6', 'weekly'),
+    # Job Categories
+    ('/jobs/doctor/', '0.8', 'daily'),
+    ('/jobs/nursing/', '0.8', 'daily'),
+    ('/jobs/pharmacy/', '0.8', 'daily'),
+    ('/jobs/dentist/', '0.8', 'daily'),
+    ('/jobs/physiotherapy/', '0.8', 'daily'),
+    ('/jobs/medical-lab-technician/', '0.8', 'daily'),
+    ('/jobs/medical-science-liaison/', '0.8', 'daily'),
+    ('/jobs/pharmacovigilance/', '0.8', 'daily'),
+    ('/jobs/clinical-research/', '0.8', 'daily'),
+    ('/jobs/non-clinical-jobs/', '0.8', 'daily'),
+]
+
+
+def _lastmod(value) -> str:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            value = None
+    if not isinstance(value, datetime):
+        value = datetime.now(timezone.utc)
+    return value.strftime('%Y-%m-%d')
+
+
+def _add_url(urlset, loc: str, lastmod: str, changefreq: str, priority: str):
+    url_elem = ET.SubElement(urlset, "url")
+    ET.SubElement(url_elem, "loc").text = loc
+    ET.SubElement(url_elem, "lastmod").text = lastmod
+    ET.SubElement(url_elem, "changefreq").text = changefreq
+    ET.SubElement(url_elem, "priority").text = priority
+
+
+async def build_sitemap_xml(db) -> Tuple[str, int]:
+    """Build the sitemap from the database, returning the XML and the number of URLs"""
+    urlset = ET.Element("urlset")
+    urlset.set("xmlns", "http://www.sitemaps.org/schemas/sitemap/0.9")
+
+    # 1. Static Pages
+    today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+    for path, priority, changefreq in STATIC_PAGES:
+        _add_url(urlset, f"{BASE_URL}{path}", today, changefreq, priority)
+    url_count = len(STATIC_PAGES)
+
+    # 2. Dynamic Jobs (Approved, Not Deleted, Not Archived, Not Expired)
+    query = {
+        "is_approved": True,
+        "is_deleted": {"$ne": True},
+        "is_archived": {"$ne": True},
+        "$or": [
+            {"expires_at": None},
+            {"expires_at": {"$gt": datetime.now(timezone.utc)}}
+        ]
+    }
+    projection = {"_id": 0, "slug": 1, "updated_at": 1, "created_at": 1, "id": 1}
+    async for job in db.jobs.find(query, projection).sort("created_at", -1):
+        job_slug = job.get('slug') or job['id']
+        lastmod = job.get('updated_at') or job.get('created_at')
+        _add_url(urlset, f"{BASE_URL}/jobs/{job_slug}", _lastmod(lastmod), "daily", "0.8")
+        url_count += 1
+
+    # 3. Blog Posts
+    query = {"is_published": True, "published_at": {"$ne": None}}
+    projection = {"_id": 0, "slug": 1, "published_at": 1, "updated_at": 1}
+    async for post in db.blog_posts.find(query, projection).sort("published_at", -1):
+        lastmod = post.get('updated_at') or post.get('published_at')
+        _add_url(urlset, f"{BASE_URL}/blogs/{post['slug']}", _lastmod(lastmod), "daily", "0.8")
+        url_count += 1
+
+    sitemap_xml = ET.tostring(urlset, encoding="unicode", method="xml")
+    return f'<?xml version="1.0" encoding="UTF-8"?>\n{sitemap_xml}', url_count
+
+
+async def _store_sitemap(db, xml: str, url_count: int):
+    await db[SITEMAP_CACHE_COLLECTION].replace_one(
+        {"_id": SITEMAP_CACHE_ID},
+        {"xml": xml, "url_count": url_count, "generated_at": datetime.now(timezone.utc)},
+        upsert=True
+    )
+
+
+async def refresh_sitemap(db, read_db=None) -> Dict[str, Any]:
+    """Rebuild the sitemap (reading from read_db if given) and store it in the cache collection"""
+    xml, url_count = await build_sitemap_xml(read_db if read_db is not None else db)
+    await _store_sitemap(db, xml, url_count)
+    return {"urls": url_count, "bytes": len(xml)}
+
+
+async def get_sitemap_xml(db) -> str:
+    """Cached sitemap, built on the spot the first time (before the scheduler has run)"""
+    cached = await db[SITEMAP_CACHE_COLLECTION].find_one({"_id": SITEMAP_CACHE_ID}, {"xml": 1})
+    if cached:
+        _CACHE_HIT.inc()
+        return cached["xml"]
+    _CACHE_MISS.inc()
+    xml, url_count = await build_sitemap_xml(db)
+    await _store_sitemap(db, xml, url_count)
+    return xml
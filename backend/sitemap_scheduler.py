@@ -3,24 +3,18 @@
 Sitemap Auto-Update Scheduler
 Runs continuously and updates sitemap every hour
 """
-import time
 import asyncio
 import os
 from datetime import datetime
-from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+from database import client, read_db
 
-MONGO_URL = os.environ.get('MONGO_URL')
-DB_NAME = os.environ.get('DB_NAME')
 FRONTEND_URL = os.environ.get('REACT_APP_BACKEND_URL', 'https://jobslly.com').replace('/api', '')
 
 async def generate_sitemap():
     """Generate sitemap XML from database"""
-    client = AsyncIOMotorClient(MONGO_URL, tlsAllowInvalidCertificates=True)
-    db = client[DB_NAME]
+    # Read-only scan: served by a secondary when there is one
+    db = read_db
     
     # Fetch all approved, non-deleted jobs
     jobs = await db.jobs.find({
@@ -33,8 +27,6 @@ async def generate_sitemap():
         "is_published": True
     }).to_list(None)
     
-    client.close()
-    
     # Generate XML
     xml_content = '<?xml version="1.0" encoding="UTF-8"?>\n'
     xml_content += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
@@ -66,34 +58,40 @@ async def generate_sitemap():
     
     return len(jobs) + len(blogs)
 
-def update_sitemap():
+async def update_sitemap():
     """Run sitemap update"""
     try:
         print(f"[{datetime.now()}] Starting sitemap update...", flush=True)
-        count = asyncio.run(generate_sitemap())
+        count = await generate_sitemap()
         print(f"[{datetime.now()}] ✓ Sitemap updated with {count} entries", flush=True)
     except Exception as e:
         print(f"[{datetime.now()}] ❌ Error updating sitemap: {e}", flush=True)
 
-if __name__ == "__main__":
+async def run_forever():
+    # One event loop for the whole run, so every update reuses the client's pooled connections
     print(f"[{datetime.now()}] Starting sitemap scheduler...", flush=True)
     print("Will update sitemap every hour", flush=True)
     
     # Update immediately on start
-    update_sitemap()
+    await update_sitemap()
     
     while True:
         try:
             # Wait 1 hour (3600 seconds)
             print(f"[{datetime.now()}] Sleeping for 1 hour...", flush=True)
-            time.sleep(3600)
+            await asyncio.sleep(3600)
             
             # Then update again
-            update_sitemap()
-        except KeyboardInterrupt:
-            print(f"\n[{datetime.now()}] Sitemap scheduler stopped")
-            break
+            await update_sitemap()
         except Exception as e:
             print(f"[{datetime.now()}] ❌ Scheduler error: {e}")
             # Wait 5 minutes before retrying on error
-            time.sleep(300)
+            await asyncio.sleep(300)
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(run_forever())
+    except KeyboardInterrupt:
+        print(f"\n[{datetime.now()}] Sitemap scheduler stopped")
+    finally:
+        client.close()
@@ -0,0 +1,163 @@
+"""
+Slug generation and allocation for HealthCare Jobs API.
+Builds SEO-friendly slugs, finds the next free "-N" suffix for a slug with a
+single indexed range query, and inserts/updates documents with insert-and-retry
+on the unique slug index so concurrent writers never end up with the same slug.
+"""
+import random
+import re
+import uuid
+from typing import Any, Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+
+def generate_slug(title: str, company: str = None, location: str = None, job_id: str = None) -> str:
+    """Generate SEO-friendly slug from job title, company, location, and job ID"""
+    
+    def clean_text(text: str, max_length: int = None) -> str:
+        """Clean and convert text to slug format"""
+        if not text:
+            return ""
+        text = text.lower()
+        text = re.sub(r'[^a-z0-9\s-]', '', text)
+        text = re.sub(r'[\s-]+', '-', text)
+        text = text.strip('-')
+        
+        if max_length and len(text) > max_length:
+            text = text[:max_length].rsplit('-', 1)[0]
+        
+        return text
+    
+    title_slug = clean_text(title, max_length=80)
+    company_slug = clean_text(company, max_length=50) if company else ""
+    location_slug = clean_text(location, max_length=40) if location else ""
+    
+    slug_parts = [title_slug]
+    
+    if company_slug:
+        slug_parts.extend(["job-at", company_slug])
+    
+    if location_slug:
+        slug_parts.extend(["in", location_slug])
+    
+    if job_id:
+        slug_parts.append(job_id[:8])
+    
+    slug = "-".join(slug_parts)
+    
+    if not slug:
+        slug = f"job-{job_id[:8]}" if job_id else "job"
+    elif len(slug) > 200:
+        slug = slug[:200].rsplit('-', 1)[0]
+        if job_id:
+            slug = f"{slug}-{job_id[:8]}"
+    
+    return slug
+
+
+# Retries before falling back to a random suffix (only reachable under extreme contention)
+MAX_SLUG_ATTEMPTS = 20
+
+
+def _slug_family_query(base_slug: str) -> Dict[str, Any]:
+    """
+    Match base_slug itself and every slug starting with "base_slug-".
+    Both halves are tight bounds on the slug index ('.' sorts right after '-').
+    """
+    return {"$or": [
+        {"slug": base_slug},
+        {"slug": {"$gt": f"{base_slug}-", "$lt": f"{base_slug}."}}
+    ]}
+
+
+async def allocate_slug(collection, base_slug: str, exclude_id: str = None) -> str:
+    """
+    Return base_slug if it is free, otherwise base_slug-N where N is one more
+    than the highest suffix in use. Suffixes of deleted documents are never
+    reused, so an old URL cannot start pointing at different content.
+    If exclude_id already owns a slug in the family, that slug is kept.
+    """
+    suffix_pattern = re.compile(rf"^{re.escape(base_slug)}(?:-(\d+))?$")
+
+    taken = False
+    highest = 0
+    cursor = collection.find(_slug_family_query(base_slug), {"_id": 0, "slug": 1, "id": 1})
+    async for doc in cursor:
+        match = suffix_pattern.match(doc.get("slug") or "")
+        if not match:
+            continue
+        if exclude_id and doc.get("id") == exclude_id:
+            return doc["slug"]
+        taken = True
+        if match.group(1):
+            highest = max(highest, int(match.group(1)))
+
+    if not taken:
+        return base_slug
+    return f"{base_slug}-{highest + 1}"
+
+
+def _is_slug_conflict(error: DuplicateKeyError) -> bool:
+    """True if the duplicate key error came from the slug index"""
+    key_pattern = (error.details or {}).get("keyPattern") or {}
+    return "slug" in key_pattern or "slug" in str(error)
+
+
+def _spread(slug: str, base_slug: str, attempt: int) -> str:
+    """
+    After a collision, jump ahead by a random offset so that many concurrent
+    writers racing for the same title fan out instead of colliding again.
+    """
+    if attempt == 0:
+        return slug
+    if attempt >= MAX_SLUG_ATTEMPTS - 1:
+        return f"{base_slug}-{uuid.uuid4().hex[:6]}"
+    suffix = 0
+    if slug != base_slug:
+        suffix = int(slug.rsplit("-", 1)[1])
+    return f"{base_slug}-{suffix + random.randrange(attempt * attempt * 4) + 1}"
+
+
+async def insert_with_unique_slug(collection, document: Dict[str, Any], base_slug: str) -> str:
+    """
+    Insert document with the first free slug derived from base_slug.
+    Relies on the unique slug index: a DuplicateKeyError means another writer
+    took the candidate first, so a new one is allocated and the insert retried.
+    Returns the slug that was stored (also set on document).
+    """
+    for attempt in range(MAX_SLUG_ATTEMPTS):
+        slug = _spread(await allocate_slug(collection, base_slug), base_slug, attempt)
+        document["slug"] = slug
+        document.pop("_id", None)
+        try:
+            await collection.insert_one(document)
+            return slug
+        except DuplicateKeyError as e:
+            if not _is_slug_conflict(e):
+                raise
+    raise RuntimeError(f"Could not allocate a unique slug for '{base_slug}'")
+
+
+async def update_with_unique_slug(
+    collection,
+    doc_id: str,
+    base_slug: str,
+    extra_fields: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Set a slug derived from base_slug on the document with the given id,
+    retrying on slug collisions like insert_with_unique_slug.
+    Returns the slug that was stored.
+    """
+    for attempt in range(MAX_SLUG_ATTEMPTS):
+        slug = _spread(await allocate_slug(collection, base_slug, exclude_id=doc_id), base_slug, attempt)
+        update = dict(extra_fields or {})
+        update["slug"] = slug
+        try:
+            await collection.update_one({"id": doc_id}, {"$set": update})
+            return slug
+        except DuplicateKeyError as e:
+            if not _is_slug_conflict(e):
+                raise
+    raise RuntimeError(f"Could not allocate a unique slug for '{base_slug}'")
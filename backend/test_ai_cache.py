@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+AI response cache test
+Runs the cached AI endpoints' flow against a local MongoDB with a fake
+LlmChat that sleeps like the real model and counts calls, and checks that:
+- a repeated request is served without calling the LLM (memory, then MongoDB)
+- inputs differing only in whitespace share an entry; other endpoints do not
+- ?refresh=true calls the LLM again and replaces the entry
+- ai_cache_stats() reports the hit ratio and the latency saved
+
+Usage: MONGO_URL=mongodb://localhost:27017 python test_ai_cache.py
+"""
+import asyncio
+import os
+import time
+import uuid
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from ai_cache import ai_cache_stats, cached_completion, clear_memory
+from indexes import ensure_indexes
+
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = f"ai_cache_test_{uuid.uuid4().hex[:8]}"
+LLM_SECONDS = 0.3
+
+DESCRIPTION = "Staff Nurse for the ICU at Apollo Hospitals, Chennai. 2+ years experience."
+
+
+class FakeLlmChat:
+    """Stand-in for LlmChat: a fixed delay and a numbered answer per call"""
+    calls = 0
+
+    async def send_message(self, message: str) -> str:
+        FakeLlmChat.calls += 1
+        await asyncio.sleep(LLM_SECONDS)
+        return f"answer {FakeLlmChat.calls} to: {message[:40]}"
+
+
+def ask(db, endpoint: str, text: str, refresh: bool = False):
+    async def generate():
+        return await FakeLlmChat().send_message(f"Enhance: {text}")
+    return cached_completion(db, endpoint, text, generate, refresh=refresh)
+
+
+async def timed(awaitable):
+    start = time.perf_counter()
+    result = await awaitable
+    return result, (time.perf_counter() - start) * 1000
+
+
+def check(name: str, ok: bool, detail: str = "") -> bool:
+    print(f"{'✅ PASS' if ok else '❌ FAIL'}: {name}{f' - {detail}' if detail else ''}")
+    return ok
+
+
+async def run_ai_cache_test():
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+
+    print("=" * 80)
+    print("AI RESPONSE CACHE TEST")
+    print("=" * 80)
+
+    try:
+        await ensure_indexes(db, log=lambda message: None)
+        clear_memory()
+        results = []
+
+        first, miss_ms = await timed(ask(db, "enhance-job-description", DESCRIPTION))
+        again, memory_ms = await timed(ask(db, "enhance-job-description", DESCRIPTION))
+        results.append(check("repeat served from memory", again == first and FakeLlmChat.calls == 1,
+                             f"miss {miss_ms:.0f} ms, hit {memory_ms:.1f} ms"))
+
+        # Another worker: empty memory, same MongoDB
+        clear_memory()
+        shared, mongo_ms = await timed(ask(db, "enhance-job-description", f"  {DESCRIPTION.replace(' ', '   ')}\n"))
+        results.append(check("whitespace variant served from MongoDB", shared == first and FakeLlmChat.calls == 1,
+                             f"hit {mongo_ms:.1f} ms"))
+
+        await ask(db, "suggest-job-requirements", DESCRIPTION)
+        results.append(check("other endpoint is a separate entry", FakeLlmChat.calls == 2))
+
+        refreshed = await ask(db, "enhance-job-description", DESCRIPTION, refresh=True)
+        served = await ask(db, "enhance-job-description", DESCRIPTION)
+        results.append(check("refresh replaces the entry", refreshed != first and served == refreshed
+                             and FakeLlmChat.calls == 3))
+
+        stats = {row["endpoint"]: row for row in await ai_cache_stats(db)}
+        enhance = stats.get("enhance-job-description", {})
+        # 3 hits and 2 LLM calls for the description, each hit saving ~LLM_SECONDS
+        results.append(check("stats report hit ratio and saved latency",
+                             enhance.get("hits") == 3 and enhance.get("llm_calls") == 2
+                             and enhance.get("hit_ratio") == 0.6 and enhance.get("saved_seconds", 0) >= 0.8,
+                             f"{enhance}"))
+
+        print("\n" + ("✓ AI cache OK" if all(results) else "✗ AI cache checks failed"))
+        return all(results)
+    finally:
+        await client.drop_database(DB_NAME)
+        client.close()
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_ai_cache_test())
+    raise SystemExit(0 if success else 1)
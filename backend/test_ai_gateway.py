@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+AI gateway test
+Drives the gateway with a fake LLM call (a sleep that counts concurrent and
+total upstream calls) and checks admission control, per-IP fairness,
+single-flight coalescing, timeouts and cancellation. No MongoDB or API key
+needed.
+
+Usage: python test_ai_gateway.py
+"""
+import asyncio
+import time
+
+from fastapi import HTTPException
+
+from ai_gateway import AIGateway, AILimit
+
+LIMITS = {
+    "cms": AILimit(concurrency=4, queue=8, timeout=5),
+    "chat": AILimit(concurrency=8, queue=16, timeout=5, per_ip=2),
+    "slow": AILimit(concurrency=2, queue=2, timeout=0.2),
+}
+
+
+class FakeLLM:
+    """Upstream stand-in: sleeps `seconds`, tracks concurrency and cancellations"""
+
+    def __init__(self, seconds: float = 0.2):
+        self.seconds = seconds
+        self.calls = self.active = self.peak = self.cancelled = 0
+
+    def call(self, answer: str):
+        async def send():
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            try:
+                await asyncio.sleep(self.seconds)
+                return answer
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+            finally:
+                self.active -= 1
+        return send
+
+
+async def outcome(awaitable):
+    try:
+        return await awaitable
+    except HTTPException as e:
+        return e.status_code
+
+
+def check(name: str, ok: bool, detail: str = "") -> bool:
+    print(f"{'✅ PASS' if ok else '❌ FAIL'}: {name}{f' - {detail}' if detail else ''}")
+    return ok
+
+
+async def run_ai_gateway_test():
+    print("=" * 80)
+    print("AI GATEWAY TEST")
+    print("=" * 80)
+    results = []
+
+    # Burst of distinct prompts: 4 run, 8 wait, the rest are turned away at once
+    gateway, llm = AIGateway(LIMITS), FakeLLM()
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*[
+        outcome(gateway.call("cms", f"prompt {i}", llm.call(f"answer {i}"))) for i in range(100)
+    ])
+    elapsed = time.perf_counter() - start
+    served = sum(isinstance(o, str) for o in outcomes)
+    rejected = outcomes.count(429)
+    results.append(check("burst: bounded concurrency and queue, fast 429",
+                         served == 12 and rejected == 88 and llm.peak == 4,
+                         f"{served} served, {rejected} rejected, peak {llm.peak} upstream, {elapsed:.2f}s"))
+
+    # Identical prompts in flight share one upstream call
+    gateway, llm = AIGateway(LIMITS), FakeLLM()
+    outcomes = await asyncio.gather(*[outcome(gateway.call("cms", "same prompt", llm.call("shared"))) for _ in range(50)])
+    results.append(check("single-flight: one upstream call for 50 identical prompts",
+                         llm.calls == 1 and outcomes == ["shared"] * 50, f"{llm.calls} upstream calls"))
+
+    # Per-IP fairness on the anonymous chat
+    gateway, llm = AIGateway(LIMITS), FakeLLM()
+    busy = [outcome(gateway.call("chat", f"a{i}", llm.call("ok"), ip="10.0.0.1")) for i in range(5)]
+    other = [outcome(gateway.call("chat", f"b{i}", llm.call("ok"), ip="10.0.0.2")) for i in range(2)]
+    outcomes = await asyncio.gather(*busy, *other)
+    results.append(check("per-IP cap on chat", outcomes[:5].count(429) == 3 and outcomes[5:] == ["ok", "ok"],
+                         f"first IP {outcomes[:5]}, second IP {outcomes[5:]}"))
+
+    # Timeout: 504, upstream cancelled, slot released
+    gateway, llm = AIGateway(LIMITS), FakeLLM(seconds=1)
+    timed_out = await outcome(gateway.call("slow", "long prompt", llm.call("late")))
+    await asyncio.sleep(0)
+    gate = gateway.gate("slow")
+    results.append(check("timeout cancels the upstream call", timed_out == 504 and llm.cancelled == 1
+                         and gate.semaphore._value == 2, f"status {timed_out}, {llm.cancelled} cancelled"))
+
+    # The only waiter goes away (client disconnect): upstream cancelled
+    gateway, llm = AIGateway(LIMITS), FakeLLM(seconds=1)
+    waiter = asyncio.ensure_future(gateway.call("cms", "abandoned", llm.call("unused")))
+    await asyncio.sleep(0.05)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    await asyncio.sleep(0)
+    results.append(check("abandoned call is cancelled", llm.cancelled == 1 and not gateway._flights
+                         and gateway.gate("cms").semaphore._value == 4))
+
+    print("\n" + ("✓ AI gateway OK" if all(results) else "✗ AI gateway checks failed"))
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_ai_gateway_test())
+    raise SystemExit(0 if success else 1)
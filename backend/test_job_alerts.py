@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Job alert percolator test
+Stores ALERT_SEARCHES synthetic saved searches (1,000,000 by default) in a
+local MongoDB, then percolates 1,000 generated jobs one at a time and checks:
+- per-job match time (candidate query + full checks), p95 under 5 ms
+- the matches equal a brute-force check of every saved search (sample)
+- queued jobs end up in one pending digest per user, ready after the window
+
+Usage: MONGO_URL=mongodb://localhost:27017 ALERT_SEARCHES=1000000 python test_job_alerts.py
+"""
+import asyncio
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from benchmark.dataset import CATEGORY_MIX, CITIES, JOB_TYPES, TITLES, DatasetGenerator, DatasetSpec
+from indexes import ensure_indexes
+from job_alerts import (
+    OUTBOX_COLLECTION, SAVED_SEARCHES_COLLECTION, brute_force_matches, close_digests, enqueue_job,
+    match_jobs, normalize_search, process_alert_queue
+)
+
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = f"job_alerts_test_{uuid.uuid4().hex[:8]}"
+SAVED_SEARCHES = int(os.environ.get('ALERT_SEARCHES', 1_000_000))
+JOBS = 1000
+BRUTE_FORCE_SAMPLE = 20
+INSERT_BATCH = 10_000
+P95_BUDGET_MS = 5.0
+
+ALL_TITLES = sorted({title for titles in TITLES.values() for title in titles})
+SALARY_FLOORS = [20000, 40000, 60000, 100000]
+
+
+def make_search(rng: random.Random, index: int) -> dict:
+    """A saved search like the alert form produces: a job title or a word of one, usually a city"""
+    criteria = {}
+    if rng.random() < 0.9:
+        title = rng.choice(ALL_TITLES)
+        criteria["keywords"] = title if rng.random() < 0.5 else rng.choice(title.split())
+    if rng.random() < 0.8:
+        criteria["location"] = rng.choice(CITIES)
+    if rng.random() < 0.25 or not criteria:
+        criteria["category"] = rng.choice(list(CATEGORY_MIX))
+    if rng.random() < 0.2:
+        criteria["job_type"] = rng.choice(JOB_TYPES)
+    if rng.random() < 0.2:
+        criteria["salary_min"] = rng.choice(SALARY_FLOORS)
+    return {"id": f"search-{index}", "user_id": f"user-{index // 5}", "email": f"user{index // 5}@example.com",
+            **normalize_search(**criteria)}
+
+
+async def seed_searches(db):
+    rng = random.Random(7)
+    start = time.perf_counter()
+    for batch_start in range(0, SAVED_SEARCHES, INSERT_BATCH):
+        batch = [make_search(rng, index) for index in range(batch_start, min(batch_start + INSERT_BATCH, SAVED_SEARCHES))]
+        await db[SAVED_SEARCHES_COLLECTION].insert_many(batch, ordered=False)
+    print(f"Stored {SAVED_SEARCHES:,} saved searches in {time.perf_counter() - start:.1f}s")
+
+
+def check(name: str, ok: bool, detail: str = "") -> bool:
+    print(f"{'✅ PASS' if ok else '❌ FAIL'}: {name}{f' - {detail}' if detail else ''}")
+    return ok
+
+
+async def run_job_alerts_test():
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+
+    print("=" * 80)
+    print("JOB ALERT PERCOLATOR TEST")
+    print("=" * 80)
+
+    try:
+        await ensure_indexes(db, log=lambda message: None)
+        await seed_searches(db)
+
+        jobs = DatasetGenerator(DatasetSpec(jobs=JOBS, seed=11)).jobs(0, JOBS)
+        for job in jobs:
+            job.update(is_approved=True, is_deleted=False)
+
+        # Per-job latency: each job percolated on its own, as when an admin approves one
+        timings, matched = [], {}
+        for job in jobs:
+            start = time.perf_counter()
+            matches = await match_jobs(db, [job])
+            timings.append((time.perf_counter() - start) * 1000)
+            matched[job["id"]] = {search_id for match in matches.values() for search_id in match["search_ids"]}
+        timings.sort()
+        p50 = statistics.median(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        total = sum(len(ids) for ids in matched.values())
+        results = [check("per-job match latency", p95 < P95_BUDGET_MS,
+                         f"p50 {p50:.2f} ms, p95 {p95:.2f} ms over {JOBS} jobs, {total:,} matches")]
+
+        # Exactness: compare a sample with a scan of every saved search
+        searches = await db[SAVED_SEARCHES_COLLECTION].find({}, {"_id": 0}).to_list(length=None)
+        sample = random.Random(3).sample(jobs, BRUTE_FORCE_SAMPLE)
+        mismatched = [job["id"] for job in sample if brute_force_matches(job, searches) != matched[job["id"]]]
+        results.append(check("matches equal brute force", not mismatched,
+                             f"{BRUTE_FORCE_SAMPLE - len(mismatched)}/{BRUTE_FORCE_SAMPLE} jobs agree"))
+        del searches
+
+        # Digests: queue a few jobs, drain the queue, close the window
+        queued = jobs[:50]
+        await db.jobs.insert_many([dict(job) for job in queued])
+        for job in queued:
+            await enqueue_job(db, job["id"])
+            await enqueue_job(db, job["id"])  # approving twice queues once
+        summary = await process_alert_queue(db)
+        expected_users = set()
+        for job in queued:
+            expected_users.update(f"user-{int(search_id.split('-')[1]) // 5}" for search_id in matched[job["id"]])
+        pending = await db[OUTBOX_COLLECTION].count_documents({"status": "pending"})
+        results.append(check("one pending digest per user", summary["jobs"] == len(queued) and pending == len(expected_users),
+                             f"{summary['jobs']} jobs, {pending} digests, {summary.get('match_ms_per_job')} ms/job"))
+
+        ready = await close_digests(db, datetime.now(timezone.utc) + timedelta(hours=2))
+        results.append(check("digests ready after the window", ready == pending, f"{ready} ready"))
+
+        print("\n" + ("✓ Job alerts OK" if all(results) else "✗ Job alert checks failed"))
+        return all(results)
+    finally:
+        await client.drop_database(DB_NAME)
+        client.close()
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_job_alerts_test())
+    raise SystemExit(0 if success else 1)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate job detection test
+Indexes DEDUP_JOBS distinct generated jobs (50,000 by default) plus
+reposted copies of some of them (reworded, re-formatted, with a source
+footer) and checks:
+- every copy is matched to its original, distinct jobs are not matched
+- the in-memory candidate check stays under a millisecond (p99)
+- the batch scan over a local MongoDB finds the same groups and, with
+  apply, soft deletes all but the oldest job of each group
+- the posting-time check ignores archived jobs, so an expired job can be
+  posted again
+
+Usage: MONGO_URL=mongodb://localhost:27017 DEDUP_JOBS=50000 python test_job_dedup.py
+"""
+import asyncio
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from benchmark.dataset import CITIES, TITLES
+from job_dedup import DedupIndex, find_duplicate, minhash, scan_duplicates
+
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = f"job_dedup_test_{uuid.uuid4().hex[:8]}"
+JOBS = int(os.environ.get('DEDUP_JOBS', 50_000))
+COPIES = 500
+SCAN_JOBS = 2000
+P99_BUDGET_MS = 1.0
+
+ALL_TITLES = sorted({title for titles in TITLES.values() for title in titles})
+COMPANIES = ["Apollo Hospitals", "Fortis Healthcare", "Max Healthcare", "Manipal Hospitals", "AIIMS",
+             "Narayana Health", "Medanta", "Kokilaben Hospital", "Aster DM", "Care Hospitals"]
+WORDS = ("patient care ward shift clinical team support duties experience registration degree diploma "
+         "assist doctors monitor records medication emergency protocols hygiene training salary benefits "
+         "rotational night day weekend allowance accommodation transport insurance leave growth "
+         "communication skills english hindi local language certification license council registered "
+         "icu opd ot casualty pharmacy laboratory radiology billing front desk coordination audit "
+         "quality accreditation nabh jci documentation handover rounds counselling discharge admission").split()
+
+
+def make_job(rng: random.Random, index: int):
+    sentences = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 16))) + "." for _ in range(rng.randint(6, 12))]
+    return {
+        "id": f"job-{index}",
+        "title": rng.choice(ALL_TITLES),
+        "company": rng.choice(COMPANIES),
+        "location": rng.choice(CITIES),
+        "description": "<p>" + " ".join(sentences) + "</p>",
+        "is_approved": True,
+        "created_at": datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=index),
+    }
+
+
+def repost(rng: random.Random, job, index: int):
+    """The same job as another source would post it"""
+    words = job["description"][3:-4].split()
+    for _ in range(max(1, len(words) // 50)):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    footer = rng.choice(["", " Apply now!", " Source: naukri.com", " Walk-in interviews this week."])
+    return {
+        **job,
+        "id": f"copy-{index}",
+        "title": job["title"].upper() if rng.random() < 0.3 else job["title"],
+        "description": "<div><b>Job description</b><br>" + " ".join(words) + footer + "</div>",
+        "created_at": job["created_at"] + timedelta(days=1),
+    }
+
+
+def check(name: str, ok: bool, detail: str = "") -> bool:
+    print(f"{'✅ PASS' if ok else '❌ FAIL'}: {name}{f' - {detail}' if detail else ''}")
+    return ok
+
+
+async def run_job_dedup_test():
+    print("=" * 80)
+    print("NEAR-DUPLICATE JOB DETECTION TEST")
+    print("=" * 80)
+    results = []
+    rng = random.Random(7)
+    jobs = [make_job(rng, i) for i in range(JOBS)]
+    originals = rng.sample(jobs, COPIES)
+    copies = [repost(rng, job, i) for i, job in enumerate(originals)]
+
+    index = DedupIndex()
+    start = time.perf_counter()
+    for job in jobs:
+        index.add(job["id"], minhash(job))
+    print(f"Indexed {JOBS:,} jobs in {time.perf_counter() - start:.1f}s")
+
+    # Copies find their original; unseen distinct jobs find nothing
+    timings, found = [], 0
+    for original, copy in zip(originals, copies):
+        signature = minhash(copy)
+        start = time.perf_counter()
+        candidates = index.candidates(signature)
+        timings.append((time.perf_counter() - start) * 1000)
+        found += bool(candidates) and candidates[0][0] == original["id"]
+    false_matches = sum(bool(index.candidates(minhash(make_job(rng, JOBS + i)))) for i in range(COPIES))
+    timings.sort()
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    results.append(check("copies matched to their original", found >= COPIES * 0.98, f"{found}/{COPIES}"))
+    results.append(check("distinct jobs not matched", false_matches == 0, f"{false_matches}/{COPIES} false matches"))
+    results.append(check(f"candidate check p99 under {P99_BUDGET_MS} ms", p99 < P99_BUDGET_MS,
+                         f"p50 {timings[len(timings) // 2]:.3f} ms, p99 {p99:.3f} ms"))
+
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+    try:
+        # Batch mode over an existing collection, then the posting-time check against it
+        scan_jobs, scan_copies = jobs[:SCAN_JOBS], [repost(rng, job, i) for i, job in enumerate(jobs[:50])]
+        await db.jobs.insert_many([dict(job) for job in scan_jobs + scan_copies])
+        scan_index = DedupIndex()
+        report = await scan_duplicates(db, index=scan_index)
+        results.append(check("batch scan finds the reposted groups", report["clusters"] == 50
+                             and report["duplicates"] == 50, f"{report['clusters']} groups, {report['duplicates']} duplicates"))
+
+        report = await scan_duplicates(db, apply=True, index=scan_index)
+        deleted = await db.jobs.count_documents({"is_deleted": True, "duplicate_of": {"$exists": True}})
+        kept = await db.jobs.count_documents({"id": {"$in": [job["id"] for job in scan_jobs[:50]]}, "is_deleted": {"$ne": True}})
+        results.append(check("apply soft deletes the newer copies", deleted == 50 and kept == 50,
+                             f"{deleted} deleted, {kept} originals kept"))
+
+        duplicate = await find_duplicate(db, repost(rng, scan_jobs[100], 999), index=scan_index)
+        results.append(check("posting-time check returns the live original",
+                             duplicate is not None and duplicate["id"] == scan_jobs[100]["id"]))
+
+        # An expired job re-posted is a new posting, not a duplicate of the archived one
+        await db.jobs.update_one({"id": scan_jobs[101]["id"]}, {"$set": {"is_archived": True}})
+        duplicate = await find_duplicate(db, repost(rng, scan_jobs[101], 1000), index=scan_index)
+        results.append(check("posting-time check ignores archived jobs", duplicate is None,
+                             f"matched {duplicate['id']}" if duplicate else ""))
+    finally:
+        await client.drop_database(DB_NAME)
+        client.close()
+
+    print("\n" + ("✓ Duplicate detection OK" if all(results) else "✗ Duplicate detection checks failed"))
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_job_dedup_test())
+    raise SystemExit(0 if success else 1)
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Query plan test for the index manifest
+Applies indexes.py to a scratch database on a local MongoDB, seeds sample
+data, then runs explain() on every query shape the endpoints and background
+jobs issue. Fails if a winning plan contains a COLLSCAN or an in-memory SORT,
+or if ensure_indexes is not idempotent.
+
+Usage: MONGO_URL=mongodb://localhost:27017 python test_query_plans.py
+"""
+import asyncio
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from bson import SON
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from blog_search import build_blog_facets_pipeline, build_blog_search_pipeline
+from deadline_queue import expired_jobs_query
+from indexes import ensure_indexes, missing_indexes
+from slug_allocator import _slug_family_query
+
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = f"query_plan_test_{uuid.uuid4().hex[:8]}"
+
+NOW = datetime.now(timezone.utc)
+LISTING = {"is_approved": True, "is_deleted": {"$ne": True}}
+LISTING_SORT = SON([("created_at", -1), ("is_archived", 1)])
+TITLE_REGEX = {"$regex": "clinical research|clinical trial|cra", "$options": "i"}
+
+# (name, collection, operation, spec) - one entry per query shape in server.py and the background jobs.
+# operation is find / count / aggregate / update / find_and_modify; allow lists stages accepted for that shape.
+QUERY_SHAPES = [
+    # Jobs: public listings
+    ("get_jobs", "jobs", "find", {"filter": LISTING, "sort": LISTING_SORT, "limit": 20}),
+    ("get_jobs by category", "jobs", "find",
+     {"filter": {**LISTING, "categories": "nurses"}, "sort": LISTING_SORT, "limit": 20}),
+    ("get_jobs (approved_only=false)", "jobs", "find",
+     {"filter": {"is_deleted": {"$ne": True}}, "sort": LISTING_SORT, "limit": 20}),
+    ("search_jobs q", "jobs", "find", {"filter": {**LISTING, "$or": [
+        {"title": {"$regex": "nurse", "$options": "i"}}, {"company": {"$regex": "nurse", "$options": "i"}},
+        {"location": {"$regex": "nurse", "$options": "i"}}, {"description": {"$regex": "nurse", "$options": "i"}}
+    ]}, "sort": LISTING_SORT, "limit": 20}),
+    ("search_jobs q count", "jobs", "count", {"filter": {**LISTING, "title": {"$regex": "nurse", "$options": "i"}}}),
+    ("search_jobs category+type", "jobs", "find",
+     {"filter": {**LISTING, "categories": {"$in": ["doctors", "doctor"]}, "job_type": "full_time"},
+      "sort": LISTING_SORT, "limit": 20}),
+    ("category page", "jobs", "find",
+     {"filter": {**LISTING, "categories": {"$in": ["nurses", "nursing"]}}, "sort": LISTING_SORT, "limit": 20}),
+    ("category page (title based)", "jobs", "find",
+     {"filter": {**LISTING, "title": TITLE_REGEX}, "sort": LISTING_SORT, "limit": 20}),
+    ("category count", "jobs", "count", {"filter": {**LISTING, "categories": {"$in": ["nurses", "nursing"]}}}),
+    ("category count (title based)", "jobs", "count", {"filter": {**LISTING, "title": TITLE_REGEX}}),
+    ("match_jobs", "jobs", "find", {"filter": {"is_approved": True}, "limit": 10}),
+
+    # Jobs: details and writes by id/slug
+    ("get_job by slug", "jobs", "find", {"filter": {"slug": "staff-nurse-1", "is_deleted": {"$ne": True}}, "limit": 1}),
+    ("get_job by id", "jobs", "find", {"filter": {"id": "job-1", "is_deleted": {"$ne": True}}, "limit": 1}),
+    ("approve/archive/update by id", "jobs", "update",
+     {"filter": {"id": "job-1"}, "update": {"$set": {"is_approved": True}}, "multi": False}),
+    ("slug allocation", "jobs", "find", {"filter": _slug_family_query("staff-nurse")}),
+
+    # Jobs: admin and dashboards
+    ("admin jobs", "jobs", "find",
+     {"filter": {"is_deleted": {"$ne": True}}, "sort": SON([("created_at", -1)]), "limit": 50}),
+    ("admin jobs (include deleted)", "jobs", "find", {"filter": {}, "sort": SON([("created_at", -1)]), "limit": 50}),
+    ("pending jobs", "jobs", "find", {"filter": {"is_approved": False}, "sort": SON([("created_at", -1)]), "limit": 50}),
+    ("pending jobs count", "jobs", "count", {"filter": {"is_approved": False}}),
+    ("employer dashboard", "jobs", "find", {"filter": {"employer_id": "employer-1"}}),
+
+    # Jobs: background jobs
+    ("archive sweep", "jobs", "update",
+     {"filter": expired_jobs_query(NOW), "update": {"$set": {"is_archived": True}}, "multi": True}),
+    ("deadline reload", "jobs", "find", {"filter": expired_jobs_query(NOW + timedelta(minutes=10))}),
+    ("deadline archive", "jobs", "find_and_modify",
+     {"filter": {"id": "job-1", **expired_jobs_query(NOW)}, "update": {"$set": {"is_archived": True}}}),
+    ("sitemap jobs", "jobs", "find", {"filter": {
+        **LISTING, "is_archived": {"$ne": True},
+        "$or": [{"expires_at": None}, {"expires_at": {"$gt": NOW}}]
+    }, "sort": SON([("created_at", -1)])}),
+    ("counter flush", "jobs", "update",
+     {"filter": {"id": "job-1"}, "update": {"$inc": {"view_count": 3}}, "multi": False}),
+
+    # Blog posts (the pipelines GET /api/blog runs, as blog_search.py builds them)
+    ("blog listing", "blog_posts", "aggregate", {"pipeline": build_blog_search_pipeline({"is_published": True})}),
+    ("blog listing page 3", "blog_posts", "aggregate",
+     {"pipeline": build_blog_search_pipeline({"is_published": True}, sort="recent", skip=20)}),
+    ("blog listing by category", "blog_posts", "aggregate",
+     {"pipeline": build_blog_search_pipeline({"is_published": True, "category": "careers"})}),
+    ("blog listing facets", "blog_posts", "aggregate", {"pipeline": build_blog_facets_pipeline({"is_published": True})}),
+    ("blog search", "blog_posts", "aggregate",
+     {"pipeline": build_blog_search_pipeline({"is_published": True}, q="nurse"),
+      "allow": ("SORT",), "reason": "ranked by text score"}),
+    ("blog search by date", "blog_posts", "aggregate",
+     {"pipeline": build_blog_search_pipeline({"is_published": True}, q="nurse", sort="recent"),
+      "allow": ("SORT",), "reason": "text matches sorted by date"}),
+    ("blog search facets", "blog_posts", "aggregate",
+     {"pipeline": build_blog_facets_pipeline({"is_published": True}, q="nurse")}),
+    ("admin blog list", "blog_posts", "aggregate", {"pipeline": [{"$sort": {"created_at": -1}}]}),
+    ("blog by id", "blog_posts", "find", {"filter": {"id": "post-1"}, "limit": 1}),
+    ("blog by slug", "blog_posts", "find", {"filter": {"slug": "post-1", "is_published": True}, "limit": 1}),
+    ("sitemap blog posts", "blog_posts", "find",
+     {"filter": {"is_published": True, "published_at": {"$ne": None}}, "sort": SON([("published_at", -1)])}),
+    ("published blog count", "blog_posts", "count", {"filter": {"is_published": True}}),
+
+    # Users and profiles
+    ("user by email", "users", "find", {"filter": {"email": "user1@example.com"}, "limit": 1}),
+    ("profile by user", "user_profiles", "find", {"filter": {"user_id": "user-1"}, "limit": 1}),
+    ("job seeker by email", "job_seekers", "find", {"filter": {"email": "user1@example.com"}, "limit": 1}),
+    ("admin job seekers", "job_seekers", "find", {"filter": {}, "sort": SON([("created_at", -1)])}),
+    ("job seeker stats", "job_seekers", "count", {"filter": {"is_registered": True}}),
+    ("job seeker totals", "job_seekers", "aggregate",
+     {"pipeline": [{"$group": {"_id": None, "total": {"$sum": "$total_applications"}}}],
+      "allow": ("COLLSCAN",), "reason": "whole-collection analytics"}),
+
+    # Applications and leads
+    ("duplicate application check", "applications", "find",
+     {"filter": {"job_id": "job-1", "applicant_id": "user-1"}, "limit": 1}),
+    ("applicant applications", "applications", "find", {"filter": {"applicant_id": "user-1"}}),
+    ("employer applications", "applications", "find", {"filter": {"job_id": {"$in": ["job-1", "job-2"]}}}),
+    ("leads by email", "job_leads", "find", {"filter": {"email": "user1@example.com"}}),
+    ("lead by job and email", "job_leads", "find",
+     {"filter": {"job_id": "job-1", "email": "user1@example.com"}, "limit": 1}),
+    ("employer leads", "job_leads", "find", {"filter": {"job_id": {"$in": ["job-1", "job-2"]}}}),
+    ("admin leads", "job_leads", "find", {"filter": {}, "sort": SON([("created_at", -1)])}),
+    ("saved jobs", "saved_jobs", "find", {"filter": {"user_id": "user-1"}}),
+    ("seo settings", "seo_settings", "find", {"filter": {"page_type": "home"}, "limit": 1}),
+
+    # Job alerts
+    ("job alert candidates", "saved_searches", "find",
+     {"filter": {"anchor": {"$in": ["*", "cat:nursing", "kw:nurse", "loc:mumbai", "type:full_time"]}}}),
+    ("job seeker alerts", "saved_searches", "find", {"filter": {"user_id": "user-1"}, "sort": SON([("created_at", -1)])}),
+    ("delete job alert", "saved_searches", "find", {"filter": {"id": "search-1", "user_id": "user-1"}}),
+    ("close digests", "alert_outbox", "update",
+     {"filter": {"status": "pending", "window_end": {"$lte": NOW}}, "update": {"$set": {"status": "ready"}},
+      "multi": True}),
+    # Chat logs
+    ("admin chat sessions", "chat_sessions", "find",
+     {"filter": {}, "sort": SON([("last_message_at", -1)]), "limit": 50}),
+    ("admin chat sessions by topic", "chat_sessions", "find",
+     {"filter": {"topics": "nursing"}, "sort": SON([("last_message_at", -1)]), "limit": 50}),
+    ("chat conversation", "chat_messages", "find",
+     {"filter": {"session_id": "session-1"}, "sort": SON([("created_at", 1)])}),
+    # Scheduler
+    ("recent scheduler runs", "scheduler_runs", "find", {"filter": {}, "sort": SON([("started_at", -1)]), "limit": 20}),
+    ("live worker metrics", "metrics_workers", "find",
+     {"filter": {"updated_at": {"$gte": NOW - timedelta(seconds=60)}, "_id": {"$ne": "worker-1"}}}),
+]
+
+
+async def seed(db):
+    """Enough documents per collection that the planner has real choices"""
+    categories = ["doctors", "nurses", "pharmacists", "dentists", "physiotherapists"]
+    jobs = []
+    for i in range(2000):
+        deadline = NOW + timedelta(days=random.randint(-30, 60))
+        jobs.append({
+            "id": f"job-{i}",
+            "slug": f"staff-nurse-{i}",
+            "title": random.choice(["Staff Nurse", "Medical Officer", "Clinical Research Associate", "Pharmacist"]),
+            "company": "Apollo Hospitals",
+            "location": random.choice(["Chennai", "Mumbai", "Delhi"]),
+            "description": "Sample job",
+            "categories": random.sample(categories, 2),
+            "job_type": random.choice(["full_time", "part_time"]),
+            "employer_id": f"employer-{i % 50}",
+            "is_approved": i % 10 != 0,
+            "is_deleted": i % 50 == 0,
+            "is_archived": i % 7 == 0,
+            "created_at": NOW - timedelta(minutes=i),
+            "application_deadline": deadline if i % 2 else None,
+            "expires_at": deadline if i % 3 == 0 else None,
+        })
+    await db.jobs.insert_many(jobs)
+
+    await db.blog_posts.insert_many([{
+        "id": f"post-{i}",
+        "slug": f"post-{i}",
+        "title": f"Career tips for nurses {i}",
+        "excerpt": "How to grow your nursing career",
+        "tags": ["nursing", "careers"],
+        "category": random.choice(["careers", "news"]),
+        "is_published": i % 4 != 0,
+        "published_at": NOW - timedelta(days=i) if i % 4 != 0 else None,
+        "created_at": NOW - timedelta(days=i),
+    } for i in range(300)])
+
+    await db.users.insert_many([{"id": f"user-{i}", "email": f"user{i}@example.com"} for i in range(500)])
+    await db.user_profiles.insert_many([{"user_id": f"user-{i}"} for i in range(500)])
+    await db.job_seekers.insert_many([{
+        "email": f"user{i}@example.com", "is_registered": i % 2 == 0,
+        "total_applications": i % 5, "created_at": NOW - timedelta(hours=i)
+    } for i in range(500)])
+    await db.applications.insert_many([{
+        "job_id": f"job-{i % 2000}", "applicant_id": f"user-{i % 500}"
+    } for i in range(3000)])
+    await db.job_leads.insert_many([{
+        "job_id": f"job-{i % 2000}", "email": f"user{i % 500}@example.com", "created_at": NOW - timedelta(hours=i)
+    } for i in range(3000)])
+    await db.saved_jobs.insert_many([{"user_id": f"user-{i % 500}", "job_id": f"job-{i}"} for i in range(1000)])
+    await db.seo_settings.insert_many([{"page_type": p} for p in ["home", "jobs", "blogs"]])
+    await db.metrics_workers.insert_many([{"_id": f"worker-{i}", "updated_at": NOW - timedelta(seconds=i)}
+                                          for i in range(300)])
+    await db.saved_searches.insert_many([
+        {"id": f"search-{i}", "user_id": f"user-{i % 500}", "anchor": ["kw:nurse", "kw:pharmacist", "loc:mumbai", "*"][i % 4],
+         "created_at": NOW - timedelta(minutes=i)}
+        for i in range(1000)
+    ])
+    await db.alert_outbox.insert_many([
+        {"_id": f"user-{i}:window", "status": "pending" if i % 3 else "ready", "window_end": NOW - timedelta(hours=i % 48)}
+        for i in range(300)
+    ])
+    await db.chat_messages.insert_many([{"session_id": f"session-{i % 300}", "message": "Any nursing jobs?",
+                                         "created_at": NOW - timedelta(minutes=i)} for i in range(1000)])
+    await db.chat_sessions.insert_many([{"_id": f"session-{i}", "topics": [random.choice(["nursing", "doctor"])],
+                                         "last_message_at": NOW - timedelta(minutes=i)} for i in range(300)])
+    await db.scheduler_runs.insert_many([{"job": "sitemap", "started_at": NOW - timedelta(minutes=i)} for i in range(300)])
+
+
+def explain_command(collection: str, operation: str, spec):
+    if operation == "find":
+        command = SON([("find", collection), ("filter", spec["filter"])])
+        for key in ("sort", "limit"):
+            if key in spec:
+                command[key] = spec[key]
+    elif operation == "count":
+        # count_documents() runs this aggregation
+        command = SON([("aggregate", collection), ("pipeline", [
+            {"$match": spec["filter"]}, {"$group": {"_id": 1, "n": {"$sum": 1}}}
+        ]), ("cursor", {})])
+    elif operation == "aggregate":
+        command = SON([("aggregate", collection), ("pipeline", spec["pipeline"]), ("cursor", {})])
+    elif operation == "update":
+        command = SON([("update", collection), ("updates", [
+            {"q": spec["filter"], "u": spec["update"], "multi": spec["multi"]}
+        ])])
+    elif operation == "find_and_modify":
+        command = SON([("findAndModify", collection), ("query", spec["filter"]), ("update", spec["update"])])
+    else:
+        raise ValueError(operation)
+    return SON([("explain", command), ("verbosity", "queryPlanner")])
+
+
+def winning_plans(explain):
+    """Every winningPlan in an explain result (aggregations nest them under $cursor / shards)"""
+    if isinstance(explain, dict):
+        if "winningPlan" in explain:
+            plan = explain["winningPlan"]
+            # Slot-based engine (6.0+) wraps the classic tree in queryPlan
+            yield plan.get("queryPlan", plan)
+        for key, value in explain.items():
+            if key not in ("winningPlan", "rejectedPlans"):
+                yield from winning_plans(value)
+    elif isinstance(explain, list):
+        for item in explain:
+            yield from winning_plans(item)
+
+
+def plan_stages(plan):
+    """(stage, indexName) pairs of a plan tree"""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"], plan.get("indexName")
+        for key in ("inputStage", "inputStages", "queryPlan"):
+            if key in plan:
+                yield from plan_stages(plan[key])
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from plan_stages(item)
+
+
+async def run_query_plan_test():
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+
+    print("=" * 80)
+    print("QUERY PLAN TEST")
+    print("=" * 80)
+
+    failures = 0
+    try:
+        await seed(db)
+
+        report = await ensure_indexes(db, log=lambda message: None)
+        if report["errors"]:
+            failures += 1
+            print(f"❌ FAIL: ensure_indexes errors: {report['errors']}")
+        again = await ensure_indexes(db, log=lambda message: None)
+        missing = await missing_indexes(db)
+        if again["created"] or again["replaced"] or missing:
+            failures += 1
+            print(f"❌ FAIL: ensure_indexes is not idempotent (second run {again}, missing {missing})")
+        else:
+            print(f"✅ PASS: ensure_indexes created {len(report['created'])} indexes, second run changed nothing")
+
+        for name, collection, operation, spec in QUERY_SHAPES:
+            explain = await db.command(explain_command(collection, operation, spec))
+            stages = [stage for plan in winning_plans(explain) for stage in plan_stages(plan)]
+            names = [stage for stage, _ in stages]
+            indexes = sorted({index for _, index in stages if index})
+
+            bad = [stage for stage in ("COLLSCAN", "SORT") if stage in names and stage not in spec.get("allow", ())]
+            if not stages:
+                bad = ["no plan"]
+            if bad:
+                failures += 1
+                print(f"❌ FAIL: {name} ({collection}): {', '.join(bad)} - plan {' <- '.join(names)}")
+            else:
+                note = f" ({spec['reason']})" if spec.get("reason") else ""
+                print(f"✅ PASS: {name} ({collection}) via {', '.join(indexes) or '-'}{note}")
+    finally:
+        await client.drop_database(DB_NAME)
+        client.close()
+
+    print("=" * 80)
+    print(f"{len(QUERY_SHAPES)} query shapes, {failures} failures")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(run_query_plan_test()) else 1)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Read routing test for the shared connection manager (database.py)
+Starts a local three-node replica set (or uses RS_URL), then checks that:
+- writes and primary reads go to the primary
+- read_db reads (listing, search, sitemap) go to secondaries
+- reads fall back to the primary when no secondary is readable
+- every handle shares one client, and pool wait metrics are recorded per server
+
+Usage: python test_read_routing.py
+       RS_URL="mongodb://h1,h2,h3/?replicaSet=rs0" python test_read_routing.py
+"""
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+from pymongo import monitoring
+from pymongo.write_concern import WriteConcern
+
+from benchmark.mongod import LocalReplicaSet
+
+DB_NAME = f"read_routing_test_{uuid.uuid4().hex[:8]}"
+JOBS = 200
+
+
+class CommandLog(monitoring.CommandListener):
+    """(command name, server) of every command sent"""
+
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        host, port = event.connection_id
+        self.commands.append((event.command_name, f"{host}:{port}"))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def servers(self, *names):
+        return {server for name, server in self.commands if name in names}
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✅ PASS' if ok else '❌ FAIL'}: {message}")
+    return ok
+
+
+async def run_read_routing_test(url: str, replica_set=None) -> bool:
+    # config.py reads these at import time
+    os.environ["MONGO_URL"] = url
+    os.environ["DB_NAME"] = DB_NAME
+    import database
+    from metrics import POOL_CHECKOUTS, POOL_WAIT
+    from sitemap import refresh_sitemap
+
+    log = CommandLog()
+    # Same settings as the API client, plus a command log (small pool so checkouts have to wait)
+    client = database.create_client(url, maxPoolSize=2, minPoolSize=0,
+                                    event_listeners=[database.pool_metrics, log])
+    db = client[DB_NAME]
+    read_db = database.secondary(db)
+
+    print("=" * 80)
+    print("READ ROUTING TEST")
+    print("=" * 80)
+
+    results = []
+    try:
+        hello = await db.command("hello")
+        primary = hello["primary"]
+        secondaries = set(hello.get("hosts", [])) - {primary}
+
+        # Acknowledged by every member so any secondary has the data when we read it back
+        jobs = db.get_collection("jobs", write_concern=WriteConcern(w=len(hello["hosts"])))
+        now = datetime.now(timezone.utc)
+        await jobs.insert_many([
+            {"id": str(uuid.uuid4()), "slug": f"job-{i}", "title": "Staff Nurse", "is_approved": True,
+             "is_deleted": False, "created_at": now}
+            for i in range(JOBS)
+        ])
+        results.append(check(log.servers("insert") == {primary}, f"writes went to the primary ({primary})"))
+
+        # Listing and count reads, concurrently so the 2-connection pools are contended
+        query = {"is_approved": True, "is_deleted": {"$ne": True}}
+        pages = await asyncio.gather(*[
+            read_db.jobs.find(query).sort("created_at", -1).skip(skip).limit(20).to_list(None)
+            for skip in range(0, JOBS, 20)
+        ])
+        total = await read_db.jobs.count_documents(query)
+        results.append(check(sum(len(page) for page in pages) == JOBS and total == JOBS,
+                             f"read_db sees all {JOBS} jobs"))
+        read_servers = log.servers("find", "aggregate")
+        results.append(check(bool(read_servers) and read_servers <= secondaries,
+                             f"read_db reads went to secondaries ({', '.join(sorted(read_servers))})"))
+
+        log.commands.clear()
+        await refresh_sitemap(db, read_db=read_db)
+        sitemap_servers = log.servers("find")
+        results.append(check(bool(sitemap_servers) and sitemap_servers <= secondaries
+                             and log.servers("update") == {primary},
+                             "sitemap scanned a secondary and stored the cache on the primary"))
+
+        log.commands.clear()
+        await db.jobs.find_one({"slug": "job-0"})
+        results.append(check(log.servers("find") == {primary}, "db reads went to the primary"))
+
+        # Module-level handles: one client, both read preferences
+        results.append(check(database.db.client is database.read_db.client, "db and read_db share one client"))
+        preference = database.read_db.read_preference
+        results.append(check(preference.mongos_mode == "secondaryPreferred"
+                             and preference.max_staleness == database.READ_MAX_STALENESS_SECONDS,
+                             f"read_db is secondaryPreferred, max staleness {preference.max_staleness}s"))
+
+        checkouts = {labels[0] for labels, _ in POOL_CHECKOUTS.samples() if labels[1] == "ok"}
+        waits = {labels[0]: value["count"] for labels, value in POOL_WAIT.samples()}
+        results.append(check(primary in checkouts and bool(checkouts & secondaries),
+                             f"pool checkouts recorded per server ({len(checkouts)} servers)"))
+        results.append(check(all(waits.get(server, 0) > 0 for server in checkouts),
+                             "pool wait time recorded for every server"))
+
+        # secondaryPreferred falls back to the primary when no secondary is available. Stopping
+        # two of three members would cost the primary its majority, so hide them instead:
+        # they keep voting but drop out of the hosts the driver reads from.
+        if replica_set:
+            config = (await client.admin.command("replSetGetConfig"))["config"]
+            for member in config["members"]:
+                if member["host"] != primary:
+                    member.update(priority=0, hidden=True)
+            config["version"] += 1
+            await client.admin.command("replSetReconfig", config)
+            deadline = time.monotonic() + 30
+            while {f"{host}:{port}" for host, port in client.nodes} != {primary} and time.monotonic() < deadline:
+                await asyncio.sleep(0.5)
+            log.commands.clear()
+            fallback = await read_db.jobs.count_documents(query)
+            results.append(check(fallback == JOBS and log.servers("aggregate") == {primary},
+                                 "read_db falls back to the primary without secondaries"))
+
+        ok = all(results)
+        print("\n" + ("✓ Read routing works" if ok else "✗ Read routing problems detected"))
+        return ok
+    finally:
+        try:
+            await client.drop_database(DB_NAME)
+        except Exception:
+            pass
+        client.close()
+
+
+async def main() -> bool:
+    url = os.environ.get("RS_URL")
+    if url:
+        return await run_read_routing_test(url)
+    async with LocalReplicaSet(members=3) as replica_set:
+        return await run_read_routing_test(replica_set.url, replica_set)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    raise SystemExit(0 if success else 1)
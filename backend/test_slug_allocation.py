@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Concurrency test for slug allocation
+Creates 1,000 same-titled jobs (and blog posts) in parallel against a local
+MongoDB and verifies that every document got its own slug.
+
+Usage: MONGO_URL=mongodb://localhost:27017 python test_slug_allocation.py
+"""
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from indexes import ensure_indexes
+from slug_allocator import insert_with_unique_slug
+
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = f"slug_allocation_test_{uuid.uuid4().hex[:8]}"
+PARALLEL_WRITES = 1000
+
+
+async def create_same_titled(collection, base_slug: str, make_doc):
+    """Insert PARALLEL_WRITES documents concurrently, all derived from base_slug"""
+    start = time.perf_counter()
+    slugs = await asyncio.gather(*[
+        insert_with_unique_slug(collection, make_doc(), base_slug)
+        for _ in range(PARALLEL_WRITES)
+    ])
+    elapsed = time.perf_counter() - start
+
+    stored = await collection.distinct("slug")
+    count = await collection.count_documents({})
+
+    ok = len(set(slugs)) == PARALLEL_WRITES and len(stored) == PARALLEL_WRITES and count == PARALLEL_WRITES
+    status = "✅ PASS" if ok else "❌ FAIL"
+    print(f"{status}: {collection.name} - {count} docs, {len(set(slugs))} unique slugs in {elapsed:.2f}s")
+    return ok
+
+
+async def run_slug_allocation_test():
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+
+    print("=" * 80)
+    print("SLUG ALLOCATION CONCURRENCY TEST")
+    print("=" * 80)
+
+    try:
+        await ensure_indexes(db, log=lambda message: None)
+
+        # Jobs: deliberately use a base slug without the job ID suffix so
+        # every writer contends for exactly the same candidates
+        def make_job():
+            return {
+                "id": str(uuid.uuid4()),
+                "title": "Staff Nurse",
+                "company": "Apollo Hospitals",
+                "location": "Chennai",
+                "description": "Staff nurse opening",
+                "employer_id": "test",
+                "is_approved": True,
+                "is_deleted": False,
+                "created_at": datetime.now(timezone.utc)
+            }
+
+        def make_post():
+            return {
+                "id": str(uuid.uuid4()),
+                "title": "Career Tips for Nurses",
+                "excerpt": "",
+                "content": "",
+                "author_id": "test",
+                "is_published": True,
+                "created_at": datetime.now(timezone.utc).isoformat()
+            }
+
+        jobs_ok = await create_same_titled(db.jobs, "staff-nurse-job-at-apollo-hospitals-in-chennai", make_job)
+        blogs_ok = await create_same_titled(db.blog_posts, "career-tips-for-nurses", make_post)
+
+        print("\n" + ("✓ All slugs unique" if jobs_ok and blogs_ok else "✗ Slug collisions detected"))
+        return jobs_ok and blogs_ok
+    finally:
+        await client.drop_database(DB_NAME)
+        client.close()
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_slug_allocation_test())
+    raise SystemExit(0 if success else 1)
@@ -0,0 +1,394 @@
+"""
+Request tracing for HealthCare Jobs API.
+/api/admin/perf says which routes are slow; a trace says where one slow
+request spent its time. TracingMiddleware opens a server span per request
+and everything underneath opens child spans through a contextvar:
+- MongoDB commands (TracingCommandListener, registered in database.py;
+  Motor copies the context into its executor threads)
+- LLM calls (send_ai_message)
+- functions wrapped with @traced: image compression, background tasks
+- span() blocks in route code, e.g. get_job's lookup / has-applied / serialize
+- scheduled job runs, which start their own trace
+asyncio.to_thread, create_task and FastAPI BackgroundTasks copy the
+context, so their spans join the request's trace. Background tasks run
+after the response is sent: their spans are exported on their own, under
+the same trace id, if the request was.
+
+Every request is recorded (a span is a small object appended to a list);
+when the request span ends the trace is kept if it was head sampled
+(TRACE_SAMPLE_RATE, or the sampled flag of an incoming traceparent
+header) or took at least TRACE_SLOW_MS, and dropped otherwise. Kept traces
+are written by a background thread as OTLP/JSON (one
+ExportTraceServiceRequest per line, the format of the OpenTelemetry
+Collector's otlpjsonfile receiver) to TRACE_FILE, rotated at
+TRACE_FILE_MAX_BYTES. TRACING=0 turns it all off.
+"""
+import atexit
+import inspect
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from metrics import TRACES
+
+TRACING_ENABLED = os.environ.get("TRACING", "1") != "0"
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "0.01"))
+TRACE_SLOW_MS = float(os.environ.get("TRACE_SLOW_MS", "1000"))
+TRACE_FILE = Path(os.environ.get("TRACE_FILE") or Path(__file__).parent / "data" / "traces" / "traces.jsonl")
+TRACE_FILE_MAX_BYTES = int(os.environ.get("TRACE_FILE_MAX_BYTES", 50 * 1024 * 1024))
+TRACE_FILE_BACKUPS = 5
+
+SERVICE_NAME = "healthcare-jobs-api"
+# Spans kept per trace (a runaway loop of queries shouldn't hold the whole request in memory)
+MAX_SPANS = 1000
+# Traces waiting for the writer thread; more are dropped
+QUEUE_SIZE = 1000
+
+# OTLP span kinds
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+
+
+class _Trace:
+    __slots__ = ("trace_id", "sampled", "spans", "dropped", "kept")
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List["Span"] = []
+        self.dropped = 0
+        # None until the local root span ends, then whether the trace was exported
+        self.kept: Optional[bool] = None
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error",
+                 "is_root")
+
+    def __init__(self, trace: _Trace, name: str, kind: int, parent_id: Optional[str], attributes: Dict[str, Any],
+                 is_root: bool):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.is_root = is_root
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def end(self, end_ns: Optional[int] = None):
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns or time.time_ns()
+        trace = self.trace
+        if trace.kept is not None:
+            # Finished after the request (a background task): follows the request's decision
+            if trace.kept:
+                exporter.export([self])
+            return
+        if len(trace.spans) < MAX_SPANS:
+            trace.spans.append(self)
+        else:
+            trace.dropped += 1
+        if self.is_root:
+            _finish_trace(trace, self)
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+def start_span(name: str, kind: int = INTERNAL, remote: Optional[Tuple[str, str, bool]] = None,
+               **attributes) -> Optional[Span]:
+    """
+    A child of the current span, or the root of a new trace (continuing
+    `remote` = (trace id, parent span id, sampled) if given). The span is
+    not made current; end() it when done. None when tracing is off.
+    """
+    if not TRACING_ENABLED:
+        return None
+    parent = _current_span.get()
+    if parent is not None:
+        return Span(parent.trace, name, kind, parent.span_id, attributes, is_root=False)
+    if remote is not None:
+        trace_id, parent_id, sampled = remote
+        return Span(_Trace(trace_id, sampled), name, kind, parent_id, attributes, is_root=True)
+    trace = _Trace(os.urandom(16).hex(), random.random() < TRACE_SAMPLE_RATE)
+    return Span(trace, name, kind, None, attributes, is_root=True)
+
+
+@contextmanager
+def span(name: str, kind: int = INTERNAL, **attributes):
+    """Run the block in a span (a new trace if there is no current one)"""
+    current = start_span(name, kind, **attributes)
+    if current is None:
+        yield None
+        return
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def traced(name: str, kind: int = INTERNAL):
+    """Decorator: each call of the (sync or async) function is a span"""
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _finish_trace(trace: _Trace, root: Span):
+    duration_ms = (root.end_ns - root.start_ns) / 1e6
+    if trace.sampled:
+        reason = "sampled"
+    elif duration_ms >= TRACE_SLOW_MS:
+        reason = "slow"
+    else:
+        trace.kept = False
+        trace.spans = []
+        TRACES.labels("skipped").inc()
+        return
+    trace.kept = True
+    root.attributes["sampling.reason"] = reason
+    if trace.dropped:
+        root.attributes["trace.dropped_spans"] = trace.dropped
+    spans, trace.spans = trace.spans, []
+    exporter.export(spans)
+    TRACES.labels(reason).inc()
+
+
+# W3C trace context
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace id, parent span id, sampled) from a traceparent header, or None if malformed"""
+    parts = (value or "").strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+class TracingMiddleware:
+    """
+    Server span per request, named by route template once routed. It ends
+    when the last body chunk is sent, so background tasks don't count
+    towards the request; the trace id is returned in X-Trace-Id.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not TRACING_ENABLED:
+            return await self.app(scope, receive, send)
+
+        remote = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                remote = parse_traceparent(value.decode("latin-1"))
+                break
+        root = start_span(f"{scope['method']} {scope['path']}", SERVER, remote,
+                          **{"http.method": scope["method"], "http.target": scope["path"]})
+        token = _current_span.set(root)
+
+        def finish(status_code: Optional[int] = None):
+            if root.end_ns is not None:
+                return
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                root.name = f"{scope['method']} {route}"
+                root.attributes["http.route"] = route
+            if status_code is not None:
+                root.attributes["http.status_code"] = status_code
+                if status_code >= 500:
+                    root.error = f"HTTP {status_code}"
+            root.end()
+
+        status = [None]
+
+        async def send_with_trace(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-trace-id", root.trace_id.encode())]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish(status[0])
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        except BaseException as e:
+            root.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            finish(status[0])
+
+
+class TracingCommandListener(monitoring.CommandListener):
+    """A client span per MongoDB command issued under a span"""
+
+    def __init__(self):
+        # Started commands waiting for their reply, keyed by (connection, request id)
+        self._pending: Dict[Any, Span] = {}
+
+    def started(self, event):
+        parent = _current_span.get()
+        if parent is None:
+            return
+        command = event.command
+        collection = command.get(event.command_name)
+        host, port = event.connection_id
+        attributes = {"db.system": "mongodb", "db.name": event.database_name, "db.operation": event.command_name,
+                      "net.peer.name": host, "net.peer.port": port}
+        if isinstance(collection, str):
+            attributes["db.mongodb.collection"] = collection
+        name = f"{event.command_name} {collection}" if isinstance(collection, str) else event.command_name
+        self._pending[(event.connection_id, event.request_id)] = Span(
+            parent.trace, name, CLIENT, parent.span_id, attributes, is_root=False)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event, error=str(event.failure.get("errmsg", "failed")) if event.failure else "failed")
+
+    def _finish(self, event, error: Optional[str] = None):
+        command_span = self._pending.pop((event.connection_id, event.request_id), None)
+        if command_span is None:
+            return
+        command_span.error = error
+        command_span.end(command_span.start_ns + event.duration_micros * 1000)
+
+
+tracing_listener = TracingCommandListener()
+
+
+# OTLP/JSON export
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+_RESOURCE = {"attributes": [_attribute("service.name", SERVICE_NAME), _attribute("host.name", socket.gethostname()),
+                            _attribute("process.pid", os.getpid())]}
+
+
+def otlp_json(spans: List[Span]) -> Dict[str, Any]:
+    """An ExportTraceServiceRequest in the OTLP/JSON encoding"""
+    encoded = []
+    for item in spans:
+        entry = {
+            "traceId": item.trace_id,
+            "spanId": item.span_id,
+            "name": item.name,
+            "kind": item.kind,
+            "startTimeUnixNano": str(item.start_ns),
+            "endTimeUnixNano": str(item.end_ns),
+            "attributes": [_attribute(key, value) for key, value in item.attributes.items() if value is not None],
+            "status": {"code": 2, "message": item.error} if item.error else {},
+        }
+        if item.parent_id:
+            entry["parentSpanId"] = item.parent_id
+        encoded.append(entry)
+    return {"resourceSpans": [{"resource": _RESOURCE,
+                               "scopeSpans": [{"scope": {"name": "tracing"}, "spans": encoded}]}]}
+
+
+class _OtlpFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(otlp_json(record.msg), separators=(",", ":"), default=str)
+
+
+class FileSpanExporter:
+    """Writes traces from a background thread (encoding included) to a rotating file"""
+
+    def __init__(self, path: Path = TRACE_FILE, max_bytes: int = TRACE_FILE_MAX_BYTES,
+                 backups: int = TRACE_FILE_BACKUPS):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue: queue.Queue = queue.Queue(QUEUE_SIZE)
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._listener is not None:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(self.path, maxBytes=self.max_bytes,
+                                                           backupCount=self.backups, encoding="utf-8", delay=True)
+            handler.setFormatter(_OtlpFormatter())
+            self._listener = logging.handlers.QueueListener(self._queue, handler)
+            self._listener.start()
+
+    def export(self, spans: List[Span]):
+        if not spans:
+            return
+        if self._listener is None:
+            self._start()
+        try:
+            self._queue.put_nowait(logging.makeLogRecord({"msg": spans}))
+        except queue.Full:
+            TRACES.labels("dropped").inc()
+
+    def stop(self):
+        """Write what is queued and stop the writer thread"""
+        with self._lock:
+            if self._listener is not None:
+                self._listener.stop()
+                for handler in self._listener.handlers:
+                    handler.close()
+                self._listener = None
+
+
+exporter = FileSpanExporter()
+atexit.register(exporter.stop)
@@ -4,21 +4,15 @@ Auto-update sitemap.xml when jobs are added/updated/deleted
 This script should be called after any job database operation
 """
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timezone
 import xml.etree.ElementTree as ET
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
-
-MONGO_URL = os.environ.get('MONGO_URL')
-DB_NAME = os.environ.get('DB_NAME')
+from database import client, read_db
 
 async def update_sitemap():
     """Generate and save sitemap.xml to frontend public folder"""
-    client = AsyncIOMotorClient(MONGO_URL)
-    db = client[DB_NAME]
+    # Read-only scan: served by a secondary when there is one
+    db = read_db
     
     urlset = ET.Element("urlset")
     urlset.set("xmlns", "http://www.sitemaps.org/schemas/sitemap/0.9")
@@ -100,8 +94,6 @@ async def update_sitemap():
         ET.SubElement(url_elem, "changefreq").text = "monthly"
         ET.SubElement(url_elem, "priority").text = "0.7"
     
-    client.close()
-    
     # Format and save
     xml_str = ET.tostring(urlset, encoding='unicode', method='xml')
     xml_formatted = f'<?xml version="1.0" encoding="UTF-8"?>\n{xml_str}'
@@ -123,5 +115,8 @@ async def update_sitemap():
     return len(jobs)
 
 if __name__ == "__main__":
-    job_count = asyncio.run(update_sitemap())
+    try:
+        job_count = asyncio.run(update_sitemap())
+    finally:
+        client.close()
     print(f"✓ Sitemap updated with {job_count} jobs")
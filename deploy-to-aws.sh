@@ -171,6 +171,10 @@ EOF
         log_warn "Please update .env file with your actual credentials"
     fi
     
+    # Apply the index manifest once per deploy (workers only warn about missing indexes)
+    log_info "Applying database indexes..."
+    python migrate.py indexes || log_warn "Index migration failed - run 'python migrate.py indexes' once MongoDB is reachable"
+    
     deactivate
     log_info "Backend setup complete"
 }
@@ -210,8 +214,15 @@ EOF
 configure_supervisor() {
     log_info "Configuring Supervisor..."
     
+    # Release id for run-once boot tasks (boot_tasks.py hashes the sources when this is not a git checkout)
+    BACKEND_ENV="PYTHONUNBUFFERED=1"
+    DEPLOY_ID=$(git -C /var/www/jobslly rev-parse HEAD 2>/dev/null || true)
+    if [ -n "$DEPLOY_ID" ]; then
+        BACKEND_ENV="${BACKEND_ENV},DEPLOY_ID=\"${DEPLOY_ID}\""
+    fi
+    
     # Backend supervisor config
-    sudo tee /etc/supervisor/conf.d/jobslly-backend.conf > /dev/null << 'EOF'
+    sudo tee /etc/supervisor/conf.d/jobslly-backend.conf > /dev/null << EOF
 [program:jobslly-backend]
 command=/var/www/jobslly/backend/venv/bin/uvicorn server:app --host 0.0.0.0 --port 8001
 directory=/var/www/jobslly/backend
@@ -220,7 +231,7 @@ autostart=true
 autorestart=true
 stderr_logfile=/var/log/supervisor/jobslly-backend.err.log
 stdout_logfile=/var/log/supervisor/jobslly-backend.out.log
-environment=PYTHONUNBUFFERED=1
+environment=${BACKEND_ENV}
 EOF
     
     # Frontend supervisor config
@@ -8,23 +8,6 @@ import { Select } from './ui/select';
 import { MapPin, Briefcase, DollarSign, Clock, ChevronLeft, ChevronRight } from 'lucide-react';
 import { API_BASE } from '../config/api';
 
-// Helper function to check if salary value should show currency symbol
-const shouldShowCurrency = (value) => {
-  if (!value) return false;
-  // Check if value contains any digit
-  return /\d/.test(value);
-};
-
-// Helper function to format salary with currency
-const formatSalary = (value, currency) => {
-  if (!value) return '';
-  if (shouldShowCurrency(value)) {
-    const symbol = currency === 'USD' ? '$' : '₹';
-    return `${symbol}${value}`;
-  }
-  return value; // Return as-is for pure text like "Negotiable"
-};
-
 const CategoryPage = () => {
   const navigate = useNavigate();
   const [searchParams, setSearchParams] = useSearchParams();
@@ -246,10 +229,9 @@ const CategoryPage = () => {
                               ARCHIVED
                             </Badge>
                           )}
-                          {job.salary_min && (
+                          {job.salary && (
                             <span className="text-sm font-semibold text-green-600">
-                              {formatSalary(job.salary_min, job.currency)}
-                              {job.salary_max && ` - ${formatSalary(job.salary_max, job.currency)}`}
+                              {job.salary}
                             </span>
                           )}
                           <span className="text-xs text-gray-500 ml-auto md:ml-0">
@@ -277,9 +259,9 @@ const CategoryPage = () => {
                         )}
 
                         {/* Description */}
-                        {job.description && (
+                        {job.snippet && (
                           <p className="text-gray-600 mb-3 line-clamp-2">
-                            {job.description.replace(/<[^>]*>/g, '').substring(0, 200)}...
+                            {job.snippet}
                           </p>
                         )}
                       </div>
@@ -23,6 +23,8 @@ const ChatBot = () => {
   const [inputMessage, setInputMessage] = useState('');
   const [isTyping, setIsTyping] = useState(false);
   const messagesEndRef = useRef(null);
+  // One conversation per page visit, so the admin side sees whole sessions
+  const sessionIdRef = useRef(`chat_${Date.now().toString(36)}_${Math.random().toString(36).slice(2, 10)}`);
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
@@ -50,7 +52,8 @@ const ChatBot = () => {
 
     try {
       const response = await axios.post(`${API}/chat`, {
-        text: inputMessage
+        text: inputMessage,
+        session_id: sessionIdRef.current
       });
 
       const botMessage = {
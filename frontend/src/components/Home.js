@@ -709,7 +709,7 @@ const Home = () => {
                       </p>
 
                       <p className="text-gray-600 mb-4 line-clamp-2 text-sm">
-                        {stripHtml(job.description).substring(0, 100)}...
+                        {job.snippet.substring(0, 100)}...
                       </p>
 
                       <div className="flex flex-wrap gap-1 mb-4">
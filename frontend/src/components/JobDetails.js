@@ -1,5 +1,5 @@
 import React, { useState, useEffect, useContext } from 'react';
-import { useParams, useNavigate } from 'react-router-dom';
+import { useParams, useNavigate, Link } from 'react-router-dom';
 import { AuthContext } from '../App';
 import { Button } from './ui/button';
 import { Card, CardContent, CardHeader, CardTitle } from './ui/card';
@@ -452,6 +452,29 @@ const JobDetails = () => {
               </CardContent>
             </Card>
 
+            {/* Similar Jobs */}
+            {job.similar_jobs && job.similar_jobs.length > 0 && (
+              <Card className="card">
+                <CardHeader>
+                  <CardTitle className="text-lg text-gray-800">Similar Jobs</CardTitle>
+                </CardHeader>
+                <CardContent className="space-y-3">
+                  {job.similar_jobs.map((similar) => (
+                    <Link
+                      key={similar.id}
+                      to={`/jobs/${similar.slug || similar.id}`}
+                      className="block rounded-lg border border-gray-100 p-3 hover:border-emerald-200 hover:bg-emerald-50"
+                    >
+                      <div className="font-medium text-gray-800">{similar.title}</div>
+                      <div className="text-sm text-gray-500">
+                        {similar.company} · {similar.location}
+                      </div>
+                    </Link>
+                  ))}
+                </CardContent>
+              </Card>
+            )}
+
             {/* Share section removed */}
           </div>
         </div>
@@ -13,30 +13,6 @@ import { ChevronLeft, ChevronRight } from 'lucide-react';
 
 const API = API_BASE;
 
-// Helper function to strip HTML tags from text
-const stripHtml = (html) => {
-  const tmp = document.createElement('DIV');
-  tmp.innerHTML = html;
-  return tmp.textContent || tmp.innerText || '';
-};
-
-// Helper function to check if salary value should show currency symbol
-const shouldShowCurrency = (value) => {
-  if (!value) return false;
-  // Check if value contains any digit
-  return /\d/.test(value);
-};
-
-// Helper function to format salary with currency
-const formatSalary = (value, currency) => {
-  if (!value) return '';
-  if (shouldShowCurrency(value)) {
-    const symbol = currency === 'USD' ? '$' : '₹';
-    return `${symbol}${value}`;
-  }
-  return value; // Return as-is for pure text like "Negotiable"
-};
-
 const JobListing = () => {
   const { user, isAuthenticated } = useContext(AuthContext);
   const [jobs, setJobs] = useState([]);
@@ -314,10 +290,9 @@ const JobListing = () => {
                               ARCHIVED
                             </Badge>
                           )}
-                          {job.salary_min && (
+                          {job.salary && (
                             <span className="text-sm font-semibold text-green-600">
-                              {formatSalary(job.salary_min, job.currency)}
-                              {job.salary_max && ` - ${formatSalary(job.salary_max, job.currency)}`}
+                              {job.salary}
                             </span>
                           )}
                           <span className="text-xs text-gray-500 ml-auto md:ml-0">
@@ -336,7 +311,7 @@ const JobListing = () => {
                         </p>
 
                         <p className="text-gray-600 mb-3 line-clamp-2">
-                          {stripHtml(job.description).substring(0, 200)}...
+                          {job.snippet}
                         </p>
 
                         {job.requirements && job.requirements.length > 0 && (
@@ -346,9 +321,9 @@ const JobListing = () => {
                                 {req}
                               </Badge>
                             ))}
-                            {job.requirements.length > 4 && (
+                            {job.requirements_count > 4 && (
                               <Badge variant="outline" className="text-xs border-gray-200 text-gray-600">
-                                +{job.requirements.length - 4} more
+                                +{job.requirements_count - 4} more
                               </Badge>
                             )}
                           </div>